@@ -0,0 +1,105 @@
+"""
+Data 시트 로드 성능 비교 (파싱 시간 / 최대 메모리)
+
+    python benchmarks/bench_xlsx_loader.py [--rows 50000] [--repeat 3] [--keep]
+
+합성 워크북을 임시 폴더에 만들고 다음 로더를 비교합니다.
+  - pandas.read_excel (openpyxl 기본 엔진)
+  - storage.xlsx_reader (openpyxl read_only/values_only 스트리밍)
+  - storage.xlsx_reader (calamine, python-calamine 설치 시)
+최대 메모리는 tracemalloc 기준(파이썬 할당, calamine의 네이티브 메모리 제외)입니다.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from config import Config
+from storage.preprocess import NUMERIC_DATA_COLUMNS
+from storage.xlsx_reader import CALAMINE_AVAILABLE, read_xlsx_sheets
+
+
+def make_workbook(path, rows):
+    rnd = random.Random(0)
+    base = datetime(2023, 1, 1)
+    records = []
+    for i in range(rows):
+        qty = rnd.randint(1, 100)
+        price = rnd.choice([1200, 35000, 480000, 1250.5])
+        day = base + timedelta(days=rnd.randint(0, 700))
+        rec = {col: "-" for col in Config.DATA_COLUMNS}
+        rec.update({
+            "관리번호": f"O{day:%y%m%d}-{i % 1000:03d}",
+            "업체명": f"업체{rnd.randint(1, 800)}",
+            "모델명": f"MODEL-{rnd.randint(1, 300)}",
+            "품목명": f"품목 {i}",
+            "수량": qty, "단가": price, "환율": 1, "세율(%)": 10,
+            "공급가액": qty * price, "세액": qty * price * 0.1, "합계금액": qty * price * 1.1,
+            "기수금액": 0, "미수금액": qty * price * 1.1,
+            "Status": rnd.choice(["주문", "생산중", "완료", "취소"]),
+            "수주일": day, "출고예정일": (day + timedelta(days=14)).strftime("%Y-%m-%d"),
+        })
+        records.append(rec)
+    df = pd.DataFrame(records, columns=Config.DATA_COLUMNS)
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        df.to_excel(writer, sheet_name=Config.SHEET_DATA, index=False)
+
+
+def measure(func, repeat):
+    # tracemalloc은 할당마다 추적하여 매우 느려지므로 시간과 메모리는 따로 측정
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="생성한 워크북을 지우지 않음")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench_data.xlsx")
+    print(f"워크북 생성 중... ({args.rows:,}행) {path}")
+    make_workbook(path, args.rows)
+    print(f"파일 크기: {os.path.getsize(path) / 1024 / 1024:.1f} MB\n")
+
+    sheet = Config.SHEET_DATA
+    numeric = {sheet: NUMERIC_DATA_COLUMNS}
+    loaders = [
+        ("pandas.read_excel", lambda: pd.read_excel(path, sheet_name=sheet)),
+        ("streaming (openpyxl)", lambda: read_xlsx_sheets(path, [sheet], numeric, engine="openpyxl")[sheet]),
+    ]
+    if CALAMINE_AVAILABLE:
+        loaders.append(("streaming (calamine)", lambda: read_xlsx_sheets(path, [sheet], numeric, engine="calamine")[sheet]))
+    else:
+        print("python-calamine 미설치: calamine 측정 생략\n")
+
+    baseline = None
+    print(f"{'로더':<24}{'시간(s)':>10}{'최대 메모리(MB)':>18}{'배속':>8}")
+    for label, func in loaders:
+        elapsed, peak, df = measure(func, args.repeat)
+        if baseline is None: baseline = elapsed
+        print(f"{label:<24}{elapsed:>10.2f}{peak / 1024 / 1024:>18.1f}{baseline / elapsed:>8.2f}")
+        assert len(df) == args.rows, f"{label}: 행 수 불일치 ({len(df)})"
+
+    if not args.keep: os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
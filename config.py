@@ -16,6 +16,7 @@ class Config:
             pass
 
     CONFIG_FILENAME = os.path.join(APP_DIR, "config.json")
+    CACHE_DIR = os.path.join(APP_DIR, "cache") # [NEW] 로컬 시트 캐시 폴더
     APP_VERSION = "1.2.2" # 버전 업데이트
     DEV_PASSWORD = "admin" 
 
@@ -33,6 +34,16 @@ class Config:
     
     # 출고요청서 저장 폴더 기본값
     DEFAULT_ORDER_REQUEST_DIR = r"\\cox_biz\business\SalesManager\출고요청서"
+
+    # [NEW] 데이터 저장소 백엔드 ("excel": SalesList.xlsx 직접 사용, "sqlite": SalesList.db)
+    DEFAULT_STORAGE_BACKEND = "excel"
+    STORAGE_BACKENDS = ["excel", "sqlite"]
+
+    # [NEW] 로그 보관 기간 (일). 이보다 오래된 Log / Memo Log 항목은 로그 정리 시 보관 파일로 이동
+    LOG_RETENTION_DAYS = 365
+
+    # [NEW] 지난 연도에 이 상태로 끝난 주문은 주문 보관 시 연도별 보관 파일로 이동 (필요할 때만 읽음)
+    ARCHIVE_CLOSED_STATUS = ["완료", "취소"]
     
     if not os.path.exists(DEFAULT_ATTACHMENT_ROOT):
         try:
@@ -100,4 +111,15 @@ class Config:
         "수량", "합계금액", "출고예정일", "Status"
     ]
     
-    SEARCH_TARGET_COLS = ["관리번호", "업체명", "프로젝트명", "모델명", "품목명", "계산서번호", "수출신고번호", "송장번호", "발주서번호"]
\ No newline at end of file
+    SEARCH_TARGET_COLS = ["관리번호", "업체명", "프로젝트명", "모델명", "품목명", "계산서번호", "수출신고번호", "송장번호", "발주서번호"]
+
+    # [NEW] 시트 키 -> (시트명, 컬럼) 매핑. 저장소 백엔드와 트랜잭션의 dfs 키로 사용
+    SHEET_SCHEMAS = {
+        "clients": (SHEET_CLIENTS, CLIENT_COLUMNS),
+        "data": (SHEET_DATA, DATA_COLUMNS),
+        "payment": (SHEET_PAYMENT, PAYMENT_COLUMNS),
+        "delivery": (SHEET_DELIVERY, DELIVERY_COLUMNS),
+        "log": (SHEET_LOG, LOG_COLUMNS),
+        "memo": (SHEET_MEMO, MEMO_COLUMNS),
+        "memo_log": (SHEET_MEMO_LOG, MEMO_LOG_COLUMNS),
+    }
@@ -5,12 +5,27 @@ import shutil
 from datetime import datetime
 
 import pandas as pd
-import openpyxl
 
 from config import Config
+from engines import (SEQUENCE_COLUMNS, SequenceRegistry, apply_deliveries, apply_payment_plan, plan_payment,
+                     reconcile_payments, recalc_payment_status_bulk)
+from production_request import ProductionRequestMixin
+from storage import (ArchiveMixin, ExcelBackend, FrameCache, LockTimeout, SQLiteBackend, TransactionFrames,
+                     TransactionMixin, WriteQueue, append_rows, claim_backend_marker, create_backend, find_client,
+                     mgmt_index, preprocess_frames, read_backend_marker, signature_changed, typed_data_frame,
+                     write_backend_marker)
 
 
-class DataManager:
+STALE_SNAPSHOT_MSG = "불러오는 동안 데이터가 변경되어 읽은 내용을 적용하지 않았습니다. 다시 새로고침해주세요."
+
+# 시트 키 -> DataManager 속성명
+FRAME_ATTRS = {
+    "clients": "df_clients", "data": "df_data", "payment": "df_payment", "delivery": "df_delivery",
+    "log": "df_log", "memo": "df_memo", "memo_log": "df_memo_log"
+}
+
+
+class DataManager(TransactionMixin, ArchiveMixin, ProductionRequestMixin):
     # ... (기존 __init__, load_config, save_config 메서드 유지) ...
     def __init__(self):
         self.df_clients = pd.DataFrame(columns=Config.CLIENT_COLUMNS)
@@ -25,12 +40,21 @@ class DataManager:
         self.attachment_root = Config.DEFAULT_ATTACHMENT_ROOT
         self.production_request_path = Config.DEFAULT_PRODUCTION_REQUEST_PATH
         self.order_request_dir = Config.DEFAULT_ORDER_REQUEST_DIR 
+        self.storage_backend = Config.DEFAULT_STORAGE_BACKEND
+        self.log_retention_days = Config.LOG_RETENTION_DAYS
         
         self.current_theme = "Dark"
         self.is_dev_mode = False
-        self.last_file_timestamp = 0.0
+        self.last_signature = None # 마지막으로 읽은 저장소 파일의 서명 (변경 감지용)
+        self.data_version = 0 # 메모리 데이터가 교체될 때마다 증가
+        self._typed_data = (None, None) # (data_version, typed_data() 결과)
+        self.write_queue = WriteQueue(self._run_batch)
+        self._confirmed = (self._get_frames(), None) # (시트들, 서명): 저장소에 기록된 상태 (낙관적 변경 제외)
+        self._archived_data = {} # (저장소 경로, 연도) -> (파일 크기, 전처리된 보관 주문 DataFrame)
+        self._pending_ops = [] # save_async()로 화면에 먼저 반영하고 아직 기록 결과를 받지 못한 작업들
         
         self.load_config()
+        self.storage = self._create_storage()
 
     def load_config(self):
         if os.path.exists(Config.CONFIG_FILENAME):
@@ -42,21 +66,27 @@ class DataManager:
                     self.attachment_root = data.get("attachment_root", Config.DEFAULT_ATTACHMENT_ROOT)
                     self.production_request_path = data.get("production_request_path", Config.DEFAULT_PRODUCTION_REQUEST_PATH)
                     self.order_request_dir = data.get("order_request_dir", Config.DEFAULT_ORDER_REQUEST_DIR)
+                    self.storage_backend = data.get("storage_backend", Config.DEFAULT_STORAGE_BACKEND)
+                    self.log_retention_days = data.get("log_retention_days", Config.LOG_RETENTION_DAYS)
             except: pass
 
-    def save_config(self, new_path=None, new_theme=None, new_attachment_dir=None, new_prod_path=None, new_order_req_dir=None):
+    def save_config(self, new_path=None, new_theme=None, new_attachment_dir=None, new_prod_path=None, new_order_req_dir=None, new_backend=None):
         if new_path: self.current_excel_path = new_path
         if new_theme: self.current_theme = new_theme
         if new_attachment_dir: self.attachment_root = new_attachment_dir
         if new_prod_path: self.production_request_path = new_prod_path
         if new_order_req_dir: self.order_request_dir = new_order_req_dir
+        if new_backend: self.storage_backend = new_backend
+        self.storage = self._create_storage()
         
         data = {
             "excel_path": self.current_excel_path,
             "theme": self.current_theme,
             "attachment_root": self.attachment_root,
             "production_request_path": self.production_request_path,
-            "order_request_dir": self.order_request_dir
+            "order_request_dir": self.order_request_dir,
+            "storage_backend": self.storage_backend,
+            "log_retention_days": self.log_retention_days
         }
         try:
             with open(Config.CONFIG_FILENAME, "w", encoding="utf-8") as f:
@@ -64,198 +94,266 @@ class DataManager:
         except Exception as e:
             print(f"설정 저장 실패: {e}")
 
+    # ==========================================================================
+    # 저장소 백엔드
+    # ==========================================================================
+    def _backend_for(self, name):
+        if name == SQLiteBackend.name:
+            return create_backend(SQLiteBackend.name, os.path.splitext(self.current_excel_path)[0] + ".db")
+        return create_backend(ExcelBackend.name, self.current_excel_path)
+
+    def _create_storage(self):
+        backend = self._backend_for(self.storage_backend)
+        self.cache = FrameCache(backend.path)
+        self.sequences = SequenceRegistry() # 저장소가 바뀌면 번호 최댓값도 새로 집계
+        return backend
+
+    def _check_backend(self, storage):
+        """
+        [NEW] 데이터 파일 옆에 기록된 백엔드와 설정의 백엔드가 다르면 오류 메시지를 반환합니다. (같으면 None)
+        사용자마다 다른 백엔드로 열어 엑셀/DB 내용이 서로 갈라지는 것을 막습니다. 기록이 없으면 처음 연 백엔드를 기록합니다.
+        """
+        marked = read_backend_marker(self.current_excel_path)
+        if marked is None and storage.exists(): marked = claim_backend_marker(self.current_excel_path, storage.name)
+        if marked in (None, storage.name): return None
+        return (f"이 데이터는 '{marked}' 저장소로 운영 중이지만 설정은 '{storage.name}'입니다.\n"
+                f"설정에서 저장소 형식을 '{marked}'(으)로 바꾼 뒤 다시 여세요.")
+
+    def switch_backend(self, name):
+        """
+        [NEW] 이 데이터의 저장소 백엔드를 바꿉니다. 데이터 파일 옆 기록을 먼저 바꿔 이전 백엔드로의 저장을 막고,
+        기록되어 있던 백엔드의 내용을 새 백엔드로 옮긴 뒤 설정에 저장합니다.
+        다른 사용자는 설정을 같은 백엔드로 바꿀 때까지 데이터를 열지 못합니다. 반환: (success, msg)
+        """
+        marked = read_backend_marker(self.current_excel_path) or self.storage_backend
+        if name != marked:
+            source, target = self._backend_for(marked), self._backend_for(name)
+            if not source.exists(): return False, f"'{marked}' 저장소 파일이 존재하지 않습니다."
+            try:
+                write_backend_marker(self.current_excel_path, name)
+                target.write_frames(source.read_frames())
+            except Exception as e:
+                try: write_backend_marker(self.current_excel_path, marked)
+                except OSError: pass
+                return False, f"저장소 전환 실패: {e}"
+        self.save_config(new_backend=name)
+        return True, f"저장소를 '{name}'(으)로 전환했습니다."
+
+    def _get_frames(self):
+        return {key: getattr(self, attr) for key, attr in FRAME_ATTRS.items()}
+
+    def _set_frames(self, frames):
+        for key, attr in FRAME_ATTRS.items():
+            setattr(self, attr, frames[key])
+
+    def get_rows(self, key, mgmt_nos, include_archive=False):
+        """
+        메모리 시트(key)에서 관리번호(하나 또는 목록)에 해당하는 행들을 반환합니다. (인덱스 라벨 유지)
+        시트별 관리번호 해시 인덱스를 사용하며, 인덱스는 시트가 다시 로드/커밋되었을 때만 새로 만듭니다.
+        include_archive=True이면 Data 시트에 없는 관리번호를 보관된 주문에서도 찾습니다. (보관 행의 인덱스는 Data 시트와 무관)
+        """
+        rows = mgmt_index.rows(getattr(self, FRAME_ATTRS[key]), mgmt_nos)
+        if not include_archive or key != "data": return rows
+        wanted = {str(m) for m in ([mgmt_nos] if isinstance(mgmt_nos, str) else mgmt_nos)}
+        missing = wanted - set(rows["관리번호"].astype(str))
+        years = self.open_archive().years("data", missing) if missing else []
+        if not years: return rows
+        archived = self.archived_data(years)
+        return pd.concat([rows, archived[archived["관리번호"].astype(str).isin(missing)]])
+
+    def get_client(self, client_name, fuzzy=False):
+        """
+        업체명으로 고객 정보(Series)를 찾습니다. 없으면 None. (업체명 해시 인덱스, Customers 시트가 바뀔 때만 재구성)
+        fuzzy=True이면 공백/대소문자/법인 표기 차이를 무시하고 찾습니다.
+        """
+        return find_client(self.df_clients, client_name, fuzzy)
+
+    def typed_data(self):
+        """
+        날짜 컬럼이 datetime64인 Data 시트를 반환합니다. 데이터 버전마다 한 번만 파싱하여 모든 뷰가 공유하므로
+        반환된 DataFrame은 수정하지 말고, 컬럼을 추가하려면 필터링한 결과나 copy()에 하세요.
+        """
+        version, df = self._typed_data
+        if version != self.data_version:
+            df = typed_data_frame(self.df_data)
+            self._typed_data = (self.data_version, df)
+        return df
+
+    def prepare_storage(self, recover=True):
+        """
+        [NEW] 읽기 전에 저장소에 써야 하는 준비 작업 (UI 스레드에서 호출, 로더 스레드의 read_snapshot()은 읽기만 함)
+        SQLite 저장소를 처음 쓰면 기존 엑셀 워크북에서 이관하고, recover=True이면 저장 도중 종료되어
+        저널에 미완료로 남은 트랜잭션을 마무리합니다. (다른 사용자가 저장 중이면 다음에)
+        반환: (success, msg)
+        """
+        storage = self.storage
+        mismatch = self._check_backend(storage)
+        if mismatch: return False, mismatch
+        if not storage.exists() and storage.name == SQLiteBackend.name and os.path.exists(self.current_excel_path):
+            success, msg = self.import_from_excel()
+            if not success: return False, msg
+            claim_backend_marker(self.current_excel_path, storage.name)
+        if recover and storage.exists():
+            try: storage.recover()
+            except LockTimeout: pass
+        return True, ""
+
+    def read_snapshot(self, full=True):
+        """
+        저장소를 읽고 전처리한 새 DataFrame 묶음을 만듭니다. 현재 메모리 데이터는 건드리지 않으므로
+        작업 스레드에서 호출할 수 있으며, 결과는 UI 스레드에서 apply_snapshot()으로 교체합니다.
+        full=False이면 마지막 로드 이후 내용이 바뀐 시트만 다시 읽고 나머지는 현재 DataFrame을 재사용합니다.
+        반환: (success, msg, snapshot)
+        """
+        # 데이터 버전을 먼저 읽음: 이후 UI 스레드가 교체하면 apply_snapshot()이 이 결과를 버림
+        storage, cache, version = self.storage, self.cache, self.data_version
+        base_frames, base_signature = self._confirmed # 읽기 전용 (메모리 데이터는 UI 스레드에서만 바꿈)
+        mismatch = self._check_backend(storage)
+        if mismatch: return False, mismatch, None
+        # 저장소 이관/복구처럼 파일을 쓰는 준비 작업은 prepare_storage()에서 (이 함수는 읽기만 함)
+        if not storage.exists(): return False, "파일이 존재하지 않습니다.", None
+
+        stamp = storage.get_signature()
+        # 다른 사용자의 커밋은 가능하면 저널의 변경 행만 이어 적용 (워크북 재파싱 생략)
+        replayed = None if full else storage.replay_journal(base_signature, base_frames, stamp)
+        if replayed is not None:
+            keys = set(replayed)
+            frames = {**base_frames, **preprocess_frames(replayed)}
+        else:
+            keys = None if full else storage.changed_sheets(base_signature, stamp)
+            if keys is None:
+                frames = preprocess_frames(storage.read_frames())
+            else:
+                frames = {**base_frames, **(preprocess_frames(storage.read_frames(keys)) if keys else {})}
+        cache.save(frames, stamp, keys, base_signature)
+        snapshot = {"frames": frames, "stamp": stamp, "keys": keys, "version": version, "storage": storage}
+        return True, "데이터 로드 완료", snapshot
+
+    def apply_snapshot(self, snapshot):
+        """
+        read_snapshot() 결과를 메모리 데이터로 통째로 교체합니다. (UI 스레드 전용)
+        읽는 동안 커밋 등으로 데이터가 이미 바뀌었다면 더 오래된 스냅샷이므로 버리고 False를 반환합니다.
+        """
+        if snapshot["version"] != self.data_version or snapshot["storage"] is not self.storage:
+            return False
+        self._swap_frames(snapshot["frames"], snapshot["stamp"])
+        return True
+
+    def load_cached(self):
+        """
+        로컬 캐시에서 즉시 로드합니다. (원격 파일은 읽지 않음)
+        캐시가 최신인지는 이후 check_for_external_changes()가 파일 서명을 비교하여 판단합니다.
+        """
+        cached = self.cache.load()
+        if cached is None: return False, "캐시 없음"
+        frames, stamp = cached
+        self._swap_frames(frames, stamp)
+        return True, "캐시 로드 완료"
+
+    def import_from_excel(self, excel_path=None):
+        """엑셀 워크북 내용을 현재 저장소로 가져옵니다. (SQLite 전환 시 최초 이관)"""
+        src = excel_path or self.current_excel_path
+        if not os.path.exists(src): return False, "엑셀 파일이 존재하지 않습니다."
+        try:
+            frames = ExcelBackend(src).read_frames()
+            self.storage.write_frames(frames)
+            return True, "엑셀 가져오기 완료"
+        except PermissionError:
+            return False, "저장소 파일이 사용 중입니다."
+        except Exception as e:
+            return False, f"가져오기 실패: {e}"
+
+    def export_to_excel(self, excel_path):
+        """현재 저장소 내용(보관된 주문 포함)을 엑셀 워크북으로 내보냅니다."""
+        try:
+            frames = self.storage.read_frames()
+            archived = self.archived_data()
+            if not archived.empty: frames["data"] = pd.concat([frames["data"], archived], ignore_index=True)
+            ExcelBackend(excel_path).write_frames(frames)
+            return True, "엑셀 내보내기 완료"
+        except PermissionError:
+            return False, "엑셀 파일이 열려있습니다."
+        except Exception as e:
+            return False, f"내보내기 실패: {e}"
+
     # ... (기존 load_data, check_for_external_changes 등 메서드 유지) ...
     def load_data(self):
-        if not os.path.exists(self.current_excel_path):
-            return False, "파일이 존재하지 않습니다."
-
         try:
-            current_mtime = os.path.getmtime(self.current_excel_path)
-            
-            with pd.ExcelFile(self.current_excel_path) as xls:
-                if Config.SHEET_CLIENTS in xls.sheet_names:
-                    self.df_clients = pd.read_excel(xls, Config.SHEET_CLIENTS)
-                    self.df_clients.columns = self.df_clients.columns.str.strip()
-                
-                if Config.SHEET_DATA in xls.sheet_names:
-                    self.df_data = pd.read_excel(xls, Config.SHEET_DATA)
-                    self.df_data.columns = self.df_data.columns.str.strip()
-                
-                if Config.SHEET_PAYMENT in xls.sheet_names:
-                    self.df_payment = pd.read_excel(xls, Config.SHEET_PAYMENT)
-                else:
-                    self.df_payment = pd.DataFrame(columns=Config.PAYMENT_COLUMNS)
-
-                if Config.SHEET_DELIVERY in xls.sheet_names:
-                    self.df_delivery = pd.read_excel(xls, Config.SHEET_DELIVERY)
-                else:
-                    self.df_delivery = pd.DataFrame(columns=Config.DELIVERY_COLUMNS)
-
-                if Config.SHEET_LOG in xls.sheet_names:
-                    self.df_log = pd.read_excel(xls, Config.SHEET_LOG)
-                else:
-                    self.df_log = pd.DataFrame(columns=Config.LOG_COLUMNS)
-
-                if Config.SHEET_MEMO in xls.sheet_names:
-                    self.df_memo = pd.read_excel(xls, Config.SHEET_MEMO)
-                else:
-                    self.df_memo = pd.DataFrame(columns=Config.MEMO_COLUMNS)
-
-                if Config.SHEET_MEMO_LOG in xls.sheet_names:
-                    self.df_memo_log = pd.read_excel(xls, Config.SHEET_MEMO_LOG)
-                else:
-                    self.df_memo_log = pd.DataFrame(columns=Config.MEMO_LOG_COLUMNS)
-
-            self._preprocess_data()
-            self.last_file_timestamp = current_mtime
-            
-            return True, "데이터 로드 완료"
+            success, msg = self.prepare_storage()
+            if not success: return False, msg
+            success, msg, snapshot = self.read_snapshot()
+            if not success: return False, msg
+            if not self.apply_snapshot(snapshot): return False, STALE_SNAPSHOT_MSG
+            return True, msg
         except Exception as e:
             return False, f"오류 발생: {e}"
 
     def check_for_external_changes(self):
-        if not os.path.exists(self.current_excel_path): return False
+        if not self.storage.exists(): return False
         try:
-            current_mtime = os.path.getmtime(self.current_excel_path)
-            if current_mtime > self.last_file_timestamp: return True
+            # stat 1회 + 파일 꼬리(또는 헤더) 소량 읽기. 내용이 같으면 mtime만 바뀐 경우 재로드하지 않음
+            return signature_changed(self.last_signature, self.storage.get_signature())
         except OSError: pass
         return False
 
-    def _execute_transaction(self, update_logic_func):
-        if not os.path.exists(self.current_excel_path):
-            return False, "엑셀 파일이 존재하지 않습니다."
-
-        try:
-            with pd.ExcelFile(self.current_excel_path) as xls:
-                # ... (시트 로드 로직 동일) ...
-                if Config.SHEET_CLIENTS in xls.sheet_names:
-                    temp_clients = pd.read_excel(xls, Config.SHEET_CLIENTS)
-                    temp_clients.columns = temp_clients.columns.str.strip()
-                else: temp_clients = pd.DataFrame(columns=Config.CLIENT_COLUMNS)
-
-                if Config.SHEET_DATA in xls.sheet_names:
-                    temp_data = pd.read_excel(xls, Config.SHEET_DATA)
-                    temp_data.columns = temp_data.columns.str.strip()
-                else: temp_data = pd.DataFrame(columns=Config.DATA_COLUMNS)
-
-                if Config.SHEET_PAYMENT in xls.sheet_names:
-                    temp_payment = pd.read_excel(xls, Config.SHEET_PAYMENT)
-                else: temp_payment = pd.DataFrame(columns=Config.PAYMENT_COLUMNS)
-
-                if Config.SHEET_DELIVERY in xls.sheet_names:
-                    temp_delivery = pd.read_excel(xls, Config.SHEET_DELIVERY)
-                else: temp_delivery = pd.DataFrame(columns=Config.DELIVERY_COLUMNS)
-
-                if Config.SHEET_LOG in xls.sheet_names:
-                    temp_log = pd.read_excel(xls, Config.SHEET_LOG)
-                else: temp_log = pd.DataFrame(columns=Config.LOG_COLUMNS)
-
-                if Config.SHEET_MEMO in xls.sheet_names:
-                    temp_memo = pd.read_excel(xls, Config.SHEET_MEMO)
-                else: temp_memo = pd.DataFrame(columns=Config.MEMO_COLUMNS)
-                
-                if Config.SHEET_MEMO_LOG in xls.sheet_names:
-                    temp_memo_log = pd.read_excel(xls, Config.SHEET_MEMO_LOG)
-                else: temp_memo_log = pd.DataFrame(columns=Config.MEMO_LOG_COLUMNS)
-
-            # 컬럼 보정
-            for col in Config.DATA_COLUMNS:
-                if col not in temp_data.columns: temp_data[col] = "-"
-            temp_data = temp_data.fillna("-")
-            temp_clients = temp_clients.fillna("-")
-            
-            # [수정] Delivery 시트 컬럼 보정 (출고번호 추가 대응)
-            for col in Config.DELIVERY_COLUMNS:
-                if col not in temp_delivery.columns: temp_delivery[col] = "-"
-            temp_delivery = temp_delivery.fillna("-")
-
-            dfs = {
-                "clients": temp_clients, "data": temp_data, 
-                "payment": temp_payment, "delivery": temp_delivery,
-                "log": temp_log, "memo": temp_memo, "memo_log": temp_memo_log
-            }
-            
-            success, msg = update_logic_func(dfs)
-            if not success: return False, msg
-
-            with pd.ExcelWriter(self.current_excel_path, engine="openpyxl") as writer:
-                dfs["clients"].to_excel(writer, sheet_name=Config.SHEET_CLIENTS, index=False)
-                dfs["data"].to_excel(writer, sheet_name=Config.SHEET_DATA, index=False)
-                dfs["payment"].to_excel(writer, sheet_name=Config.SHEET_PAYMENT, index=False)
-                dfs["delivery"].to_excel(writer, sheet_name=Config.SHEET_DELIVERY, index=False)
-                dfs["log"].to_excel(writer, sheet_name=Config.SHEET_LOG, index=False)
-                dfs["memo"].to_excel(writer, sheet_name=Config.SHEET_MEMO, index=False)
-                dfs["memo_log"].to_excel(writer, sheet_name=Config.SHEET_MEMO_LOG, index=False)
+    # ... (기존 recalc_payment_status, _create_log_entry 등 유지) ...
+    def recalc_payment_status(self, dfs, mgmt_no):
+        self.recalc_payment_status_bulk(dfs, [mgmt_no])
 
-            self.load_data()
-            return True, "저장되었습니다."
+    def recalc_payment_status_bulk(self, dfs, mgmt_nos):
+        """여러 관리번호의 입금 배분/상태를 한 번에 다시 계산합니다. (Payment groupby + 그룹별 누계 배분)"""
+        recalc_payment_status_bulk(dfs, mgmt_nos)
 
-        except PermissionError:
-            return False, "엑셀 파일이 열려있습니다. 파일을 닫고 다시 시도해주세요."
-        except Exception as e:
-            return False, f"트랜잭션 오류: {e}"
+    # [NEW] 일괄 납품 처리 (부분 출고 행 분리 포함)
+    def apply_deliveries(self, dfs, requests, shipped, record):
+        """
+        납품 요청 [{"key", "deliver_qty", "serial_no"}]을 한 번에 적용하고 Delivery 이력을 추가합니다. (트랜잭션 작업 함수 안에서 호출)
+        key는 engines.item_keys()로 만든 행 키이며, 대상 행이 바뀌었으면 (False, msg, None)을 반환합니다.
+        반환: (success, msg, 처리된 품목 DataFrame[관리번호, 품목명, 시리얼번호, 출고수량])
+        """
+        return apply_deliveries(dfs, requests, shipped, record)
 
-    # ... (기존 recalc_payment_status, _create_log_entry, _preprocess_data 등 유지) ...
-    def recalc_payment_status(self, dfs, mgmt_no):
-        pay_df = dfs["payment"]
-        if pay_df.empty:
-            total_paid = 0
-            last_pay_date = "-"
-        else:
-            target_pays = pay_df[pay_df["관리번호"].astype(str) == str(mgmt_no)]
-            paid_series = target_pays["입금액"].astype(str).str.replace(",", "").replace("nan", "0")
-            total_paid = pd.to_numeric(paid_series, errors='coerce').sum()
-            
-            if not target_pays.empty:
-                target_pays = target_pays.sort_values(by="일시", ascending=False)
-                last_pay_date = target_pays.iloc[0]["일시"].split(" ")[0]
-            else:
-                last_pay_date = "-"
+    # [NEW] 2단계 입금 처리
+    def plan_payment(self, mgmt_nos, amount):
+        """입금액 배분 계획을 현재 메모리 데이터로 만듭니다. (트랜잭션 밖, 수수료 처리 여부는 이 결과로 사용자에게 물음)"""
+        return plan_payment(self._get_frames(), mgmt_nos, amount)
 
-        data_df = dfs["data"]
-        mask = data_df["관리번호"] == mgmt_no
-        indices = data_df[mask].index
-        
-        if len(indices) == 0: return
+    def apply_payment_plan(self, dfs, plan, records):
+        """계획이 아직 유효한지 확인하고 Payment 기록을 추가합니다. (트랜잭션 작업 함수 안에서 호출)"""
+        return apply_payment_plan(dfs, plan, records)
 
-        amt_series = data_df.loc[mask, "합계금액"].astype(str).str.replace(",", "").replace("nan", "0")
-        total_contract_amt = pd.to_numeric(amt_series, errors='coerce').sum()
-        
-        remaining_to_allocate = total_paid
-        
-        for idx in indices:
-            val_str = str(data_df.at[idx, "합계금액"]).replace(",", "")
-            try: row_total = float(val_str)
-            except: row_total = 0
-            
-            if remaining_to_allocate >= row_total:
-                allocated = row_total
-            else:
-                allocated = remaining_to_allocate
-                if allocated < 0: allocated = 0
-            
-            data_df.at[idx, "기수금액"] = allocated
-            data_df.at[idx, "미수금액"] = row_total - allocated
-            
-            remaining_to_allocate -= allocated
-            
-            try: row_unpaid = float(data_df.at[idx, "미수금액"])
-            except: row_unpaid = 0
-            
-            current_status = str(data_df.at[idx, "Status"])
-            
-            if row_unpaid < 1:
-                if "납품" in current_status or "완료" in current_status:
-                    new_status = "완료"
-                else:
-                    new_status = "납품대기/입금완료"
-                data_df.at[idx, "입금완료일"] = last_pay_date
-            else:
-                if current_status == "완료": new_status = "납품완료/입금완료"
-                elif current_status == "납품대기/입금완료": new_status = current_status
-                else: new_status = current_status
-            
-            data_df.at[idx, "Status"] = new_status
+    # [NEW] 전체 입금 정합성 점검 (대량 가져오기 후 등)
+    def reconcile_payments(self, apply=False):
+        """
+        모든 주문의 기수금액/미수금액/입금완료일/Status를 Payment 시트로 다시 계산하여 저장된 값과 비교합니다.
+        apply=True이면 저장소의 최신 데이터로 다시 계산한 보정값을 하나의 트랜잭션으로 기록합니다.
+        Payment 이력이 없는 주문은 보정하지 않고 메시지에 건수만 알립니다.
+        반환: (success, msg, 불일치 목록 DataFrame)
+        """
+        if not apply:
+            report, _, skipped = reconcile_payments(self._get_frames())
+            msg = f"불일치 {len(report)}건 ({report['관리번호'].nunique()}개 관리번호)" if not report.empty else "불일치 항목이 없습니다."
+            return True, msg + self._skipped_note(skipped), report
+
+        result = {}
+        def update_logic(dfs):
+            report, fixed, skipped = reconcile_payments(dfs)
+            result["report"], result["skipped"] = report, skipped
+            if report.empty: return False, "보정할 항목이 없습니다." + self._skipped_note(skipped)
+            dfs["data"] = fixed
+            log_msg = f"입금 정합성 보정: {len(report)}건 ({report['관리번호'].nunique()}개 관리번호)"
+            self.append_log(dfs, "입금 정합성 보정", log_msg)
+            return True, "", ["data"]
+
+        success, msg = self._execute_transaction(update_logic)
+        report = result.get("report")
+        if success: msg = f"{len(report)}건을 보정했습니다." + self._skipped_note(result["skipped"])
+        return success, msg, report
+
+    def _skipped_note(self, skipped):
+        if not skipped: return ""
+        sample = ", ".join(skipped[:5]) + (" 등" if len(skipped) > 5 else "")
+        return f"\n입금 이력이 없어 제외한 관리번호 {len(skipped)}개: {sample}"
 
     def _create_log_entry(self, action, details):
         try: user = getpass.getuser()
@@ -267,45 +365,6 @@ class DataManager:
             "상세내용": details
         }
 
-    def _preprocess_data(self):
-        for col in Config.DATA_COLUMNS:
-            if col not in self.df_data.columns: self.df_data[col] = "-"
-        
-        self.df_data = self.df_data.fillna("-")
-        self.df_clients = self.df_clients.fillna("-")
-        
-        # [수정] Delivery 데이터프레임 전처리
-        if "출고번호" not in self.df_delivery.columns:
-            self.df_delivery["출고번호"] = "-"
-        self.df_delivery = self.df_delivery.fillna("-")
-        
-        num_cols = ["수량", "단가", "환율", "세율(%)", "공급가액", "세액", "합계금액", "기수금액", "미수금액"]
-        for col in num_cols:
-            if col in self.df_data.columns:
-                self.df_data[col] = pd.to_numeric(self.df_data[col], errors='coerce').fillna(0)
-
-        date_cols = ["견적일", "수주일", "출고예정일", "출고일", "선적일", "입금완료일", "세금계산서발행일"]
-        for col in date_cols:
-            if col in self.df_data.columns:
-                self.df_data[col] = pd.to_datetime(self.df_data[col], errors='coerce', format='mixed').dt.strftime("%Y-%m-%d")
-                self.df_data[col] = self.df_data[col].fillna("-")
-
-    def save_to_excel(self):
-        try:
-            with pd.ExcelWriter(self.current_excel_path, engine="openpyxl") as writer:
-                self.df_clients.to_excel(writer, sheet_name=Config.SHEET_CLIENTS, index=False)
-                self.df_data.to_excel(writer, sheet_name=Config.SHEET_DATA, index=False)
-                self.df_payment.to_excel(writer, sheet_name=Config.SHEET_PAYMENT, index=False)
-                self.df_delivery.to_excel(writer, sheet_name=Config.SHEET_DELIVERY, index=False)
-                self.df_log.to_excel(writer, sheet_name=Config.SHEET_LOG, index=False)
-                self.df_memo.to_excel(writer, sheet_name=Config.SHEET_MEMO, index=False)
-                self.df_memo_log.to_excel(writer, sheet_name=Config.SHEET_MEMO_LOG, index=False)
-            return True, "저장 완료"
-        except PermissionError:
-            return False, "엑셀 파일이 열려있습니다."
-        except Exception as e:
-            return False, f"저장 실패: {e}"
-
     def save_attachment(self, source_path, company_name, file_prefix):
         if not os.path.exists(source_path): return None, "파일 없음"
         try:
@@ -328,17 +387,16 @@ class DataManager:
         except Exception as e:
             return None, str(e)
 
-    def add_log(self, action, details):
-        try: user = getpass.getuser()
-        except: user = "Unknown"
-        new = {"일시": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "작업자": user, "구분": action, "상세내용": details}
-        new_df = pd.DataFrame([new])
-        if self.df_log.empty: self.df_log = new_df
-        else: self.df_log = pd.concat([self.df_log, new_df], ignore_index=True)
+    # [NEW] 로그는 모아 두었다가 한 번에 붙임 (행마다 Log 시트 전체를 복사하지 않음)
+    def append_log(self, dfs, action, details):
+        """트랜잭션 작업 함수 안에서 로그를 남깁니다. 작업이 끝난 뒤 트랜잭션마다 한 번만 dfs["log"]에 붙습니다."""
+        entry = self._create_log_entry(action, details)
+        if isinstance(dfs, TransactionFrames): dfs.logs.append(entry)
+        else: dfs["log"] = append_rows(dfs["log"], [entry])
     
     def get_status_by_req_no(self, req_no):
         if self.df_data.empty: return None
-        rows = self.df_data[self.df_data["관리번호"] == req_no]
+        rows = self.get_rows("data", req_no)
         return rows.iloc[0]["Status"] if not rows.empty else None
 
     def get_filtered_data(self, status_list=None, keyword=""):
@@ -356,238 +414,48 @@ class DataManager:
     def set_dev_mode(self, enabled): self.is_dev_mode = enabled
     
     def create_backup(self):
-        if not os.path.exists(self.current_excel_path): return False, "파일 없음"
+        """[수정] 현재 저장소 파일(엑셀 또는 DB)을 옆의 backup 폴더에 복사합니다. (DB는 SQLite 백업 API 사용)"""
+        path = self.storage.path
+        if not self.storage.exists(): return False, "파일 없음"
         try:
-            folder = os.path.dirname(self.current_excel_path)
-            backup_folder = os.path.join(folder, "backup")
+            backup_folder = os.path.join(os.path.dirname(path), "backup")
             if not os.path.exists(backup_folder): os.makedirs(backup_folder)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            fname = os.path.basename(self.current_excel_path)
-            shutil.copy2(self.current_excel_path, os.path.join(backup_folder, f"{fname}_{timestamp}.bak"))
+            self.storage.backup(os.path.join(backup_folder, f"{os.path.basename(path)}_{timestamp}.bak"))
             return True, "백업 완료"
         except Exception as e: return False, str(e)
 
-    def clean_old_logs(self): return True, "로그 정리 완료"
-
-    # ... (export_to_production_request, sync_production_dates 등 유지) ...
-    def export_to_production_request(self, rows_data):
-        prod_path = self.production_request_path
-        if not os.path.exists(prod_path):
-            return False, f"생산 요청 파일을 찾을 수 없습니다.\n경로: {prod_path}"
-
-        try:
-            wb = openpyxl.load_workbook(prod_path)
-            if "Data" not in wb.sheetnames:
-                return False, "'Data' 시트가 존재하지 않습니다."
-            ws = wb["Data"]
-
-            added_count = 0
-            updated_count = 0
-
-            for row_data in rows_data:
-                client_name = row_data.get("업체명", "")
-                client_note = "-"
-                if not self.df_clients.empty:
-                    c_row = self.df_clients[self.df_clients["업체명"] == client_name]
-                    if not c_row.empty:
-                        val = c_row.iloc[0].get("특이사항", "-")
-                        if str(val) != "nan" and val: client_note = str(val)
-
-                mgmt_no = str(row_data.get("관리번호", ""))
-                model_name = str(row_data.get("모델명", ""))
-                desc = str(row_data.get("Description", ""))
-                order_date = row_data.get("수주일", "-")
-                if not order_date or order_date == "nan": order_date = "-"
-
-                mapping_values = [
-                    mgmt_no,                    # A
-                    client_name,                # B
-                    model_name,                 # C
-                    desc,                       # D
-                    row_data.get("수량", 0),    # E
-                    row_data.get("주문요청사항", "-"), # F
-                    client_note,                # G (Customer DB)
-                    order_date,                 # H
-                    "-",                        # I
-                    "-",                        # J
-                    "-",                        # K
-                    "-",                        # L
-                    "-",                        # M
-                    "생산 접수",                # N (Default)
-                    "-",                        # O (Default)
-                    "-"                         # P (Default)
-                ]
-
-                target_row_idx = None
-                for i, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-                    curr_mgmt = str(row[0]) if row[0] else ""
-                    curr_model = str(row[2]) if row[2] else ""
-                    curr_desc = str(row[3]) if row[3] else ""
-                    
-                    if curr_mgmt == mgmt_no and curr_model == model_name and curr_desc == desc:
-                        target_row_idx = i
-                        break
-                
-                if target_row_idx:
-                    for col_idx, val in enumerate(mapping_values, start=1):
-                        ws.cell(row=target_row_idx, column=col_idx, value=val)
-                    updated_count += 1
-                else:
-                    ws.append(mapping_values)
-                    added_count += 1
-
-            wb.save(prod_path)
-            wb.close()
-            return True, f"신규: {added_count}건, 업데이트: {updated_count}건"
-
-        except PermissionError:
-            return False, "생산 요청 파일이 열려있습니다. 파일을 닫고 다시 시도해주세요."
-        except Exception as e:
-            return False, f"생산 요청 내보내기 실패: {e}"
-
-    def sync_production_dates(self):
-        if not os.path.exists(self.production_request_path):
-            return
-
-        try:
-            wb = openpyxl.load_workbook(self.production_request_path, data_only=True)
-            if "Data" not in wb.sheetnames: return
-            ws = wb["Data"]
-            
-            date_map = {}
-            for row in ws.iter_rows(min_row=2, values_only=True):
-                mgmt_no = str(row[0]) if row[0] else None
-                delivery_date = row[8]
-                
-                if mgmt_no and delivery_date:
-                    if isinstance(delivery_date, datetime):
-                        date_str = delivery_date.strftime("%Y-%m-%d")
-                    else:
-                        date_str = str(delivery_date).strip()
-                        if date_str.lower() == "nan" or date_str == "-" or not date_str:
-                            continue
-                            
-                    date_map[mgmt_no] = date_str
-            
-            wb.close()
-            
-            if not self.df_data.empty:
-                if '출고예정일' not in self.df_data.columns:
-                    self.df_data['출고예정일'] = "-"
-                
-                for mgmt_no, new_date in date_map.items():
-                    mask = self.df_data['관리번호'] == mgmt_no
-                    if mask.any():
-                        self.df_data.loc[mask, '출고예정일'] = new_date
-                        
-        except Exception as e:
-            print(f"생산 요청일 동기화 실패: {e}")
-
-    def get_production_status_map(self):
-        if not os.path.exists(self.production_request_path):
-            return {}
-
-        try:
-            wb = openpyxl.load_workbook(self.production_request_path, data_only=True, read_only=True)
-            if "Data" not in wb.sheetnames:
-                return {}
-            
-            ws = wb["Data"]
-            status_map = {}
-            
-            for row in ws.iter_rows(min_row=2, values_only=True):
-                if not row or len(row) < 14: continue
-                
-                mgmt_no = str(row[0]).strip() if row[0] else None
-                prod_status = str(row[13]).strip() if row[13] else "-"
-                
-                if mgmt_no:
-                    status_map[mgmt_no] = prod_status
-            
-            wb.close()
-            return status_map
-        except Exception as e:
-            print(f"생산 상태 로드 실패: {e}")
-            return {}
-
-    def get_serial_number_map(self):
-        if not os.path.exists(self.production_request_path):
-            return {}
-
-        try:
-            wb = openpyxl.load_workbook(self.production_request_path, data_only=True, read_only=True)
-            if "Data" not in wb.sheetnames:
-                return {}
-            
-            ws = wb["Data"]
-            serial_map = {}
-            
-            for row in ws.iter_rows(min_row=2, values_only=True):
-                if not row or len(row) < 11: continue
-                
-                mgmt_no = str(row[0]).strip() if row[0] else ""
-                model = str(row[2]).strip() if row[2] else ""
-                desc = str(row[3]).strip() if row[3] else ""
-                serial = str(row[10]).strip() if row[10] else "-"
-                
-                key = (mgmt_no, model, desc)
-                if mgmt_no: 
-                    serial_map[key] = serial
-            
-            wb.close()
-            return serial_map
-        except Exception as e:
-            print(f"시리얼 번호 로드 실패: {e}")
-            return {}
-
     def get_client_shipping_method(self, client_name):
-        if self.df_clients.empty:
-            return ""
-            
-        row = self.df_clients[self.df_clients["업체명"] == client_name]
-        if not row.empty:
-            val = row.iloc[0].get("운송방법", "")
+        row = self.get_client(client_name)
+        if row is not None:
+            val = row.get("운송방법", "")
             return str(val).strip() if str(val).lower() != "nan" else ""
         return ""
 
     def get_client_shipping_account(self, client_name):
-        if self.df_clients.empty:
-            return ""
-            
-        row = self.df_clients[self.df_clients["업체명"] == client_name]
-        if not row.empty:
-            val = row.iloc[0].get("운송계정", "")
+        row = self.get_client(client_name)
+        if row is not None:
+            val = row.get("운송계정", "")
             return str(val).strip() if str(val).lower() != "nan" else ""
         return ""
 
     # [NEW] 출고 번호 생성
+    def generate_mgmt_no(self, letter):
+        """새 관리번호를 만듭니다. 형식: {Q|O}{YYMMDD}-{Seq:03d} (저장 시 claim_id()로 확정)"""
+        return self.sequences.next_id(letter)
+
+    def claim_id(self, dfs, key, wanted):
+        """
+        트랜잭션 안에서 새 번호를 확정합니다. 다른 사용자가 같은 번호를 먼저 저장했으면 다음 번호를 반환합니다.
+        key: "data"(관리번호) | "delivery"(출고번호)
+        """
+        return self.sequences.claim(dfs[key], SEQUENCE_COLUMNS[key], wanted)
+
     def generate_delivery_no(self, delivery_df=None):
         """
         새로운 출고 번호를 생성합니다. 형식: CX{YYMMDD}-{Seq:03d}
         트랜잭션 중에는 트랜잭션 내의 delivery_df를 전달받아 중복을 피합니다.
         """
-        today_str = datetime.now().strftime("%y%m%d")
-        prefix = f"CX{today_str}"
-        
-        target_df = self.df_delivery if delivery_df is None else delivery_df
-        
-        # '출고번호' 컬럼이 없으면 빈 시리즈 처리
-        if "출고번호" not in target_df.columns:
-            existing_ids = []
-        else:
-            existing_ids = target_df[target_df["출고번호"].astype(str).str.startswith(prefix)]["출고번호"].unique()
-        
-        if len(existing_ids) == 0:
-            seq = 1
-        else:
-            max_seq = 0
-            for eid in existing_ids:
-                try:
-                    parts = str(eid).split("-")
-                    if len(parts) > 1:
-                        seq_num = int(parts[-1])
-                        if seq_num > max_seq: max_seq = seq_num
-                except: pass
-            seq = max_seq + 1
-            
-        return f"{prefix}-{seq:03d}"
\ No newline at end of file
+        new_no = self.sequences.next_id("CX")
+        if delivery_df is None: return new_no
+        return self.sequences.claim(delivery_df, SEQUENCE_COLUMNS["delivery"], new_no)
\ No newline at end of file
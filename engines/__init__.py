@@ -0,0 +1,4 @@
+from .delivery_engine import apply_deliveries, item_keys
+from .payment_engine import (RECONCILE_COLUMNS, apply_payment_plan, plan_payment, plan_records, reconcile_payments,
+                             recalc_payment_status_bulk)
+from .sequence import SEQUENCE_COLUMNS, SequenceRegistry
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from engines.payment_engine import _to_amount
+from storage import append_rows, mgmt_index
+
+QTY_TOLERANCE = 0.000001  # 출고수량이 잔여 수량과 이 차이 이내면 완전 출고
+# 납품 대상 행을 행 라벨 대신 이 값들로 지정 (다른 사용자의 커밋으로 행 번호가 바뀌어도 같은 행을 찾고, 내용이 바뀌었으면 거부)
+ITEM_KEY_COLUMNS = ["관리번호", "품목명", "모델명", "Description", "수량", "Status"]
+
+
+def item_keys(rows):
+    """
+    행별 납품 대상 키 (키 컬럼 값 튜플, 같은 관리번호 안에서 같은 값을 가진 몇 번째 행인지) Series (rows와 같은 인덱스)
+    rows는 대상 관리번호의 모든 행이어야 합니다. (get_rows 결과)
+    """
+    if rows.empty: return pd.Series([], index=rows.index, dtype=object)
+    # 수량은 화면용 전처리(preprocess_frames)와 같은 규칙으로 숫자화하여 메모리/저장소 값을 같게 비교
+    values = [pd.to_numeric(rows[col], errors="coerce").fillna(0).astype(np.float64) if col == "수량"
+              else rows[col].astype(str).str.strip() for col in ITEM_KEY_COLUMNS]
+    tuples = pd.Series(list(zip(*values)), index=rows.index)
+    nth = tuples.groupby(tuples).cumcount()
+    return pd.Series(list(zip(tuples, nth)), index=rows.index)
+
+
+def locate_items(data_df, keys):
+    """item_keys()로 지정한 행들의 현재 인덱스 라벨 목록. 하나라도 찾을 수 없으면 None (다른 사용자가 행을 바꾸거나 지움)"""
+    mgmt_nos = list(dict.fromkeys(key[0][0] for key in keys))
+    current = item_keys(mgmt_index.rows(data_df, mgmt_nos))
+    labels = dict(zip(current, current.index))
+    found = [labels.get(key) for key in keys]
+    return None if any(label is None for label in found) else found
+
+
+def _set_column(df, index, col, values):
+    # 정수 컬럼에 소수(부분 수량/금액)를 넣을 수 있도록 float로 변환 후 기록
+    if df[col].dtype.kind in "iu": df[col] = df[col].astype(np.float64)
+    df.loc[index, col] = values
+
+
+def _amounts(qty, price, tax_rate):
+    supply = qty * price
+    tax = supply * tax_rate
+    return {"수량": qty, "공급가액": supply, "세액": tax, "합계금액": supply + tax, "미수금액": supply + tax}
+
+
+def apply_deliveries(dfs, requests, shipped, record):
+    """
+    납품 요청들을 한 번에 적용합니다. (트랜잭션 작업 함수 안에서 호출)
+    완전 출고 행은 상태/출고 정보만 갱신하고, 부분 출고 행은 남은 수량으로 금액을 다시 계산한 뒤
+    출고분을 새 행으로 분리하여 Data 시트 끝에 (요청 순서대로) 한 번에 추가합니다. Delivery 시트 이력도 한 번에 추가합니다.
+    재시도마다 대상 행을 키로 다시 찾으며, 대상 행이 바뀌었으면 아무것도 바꾸지 않고 실패를 반환합니다.
+
+    requests: [{"key": item_keys() 값, "deliver_qty": 출고수량, "serial_no": 시리얼번호}]
+    shipped: 출고된 행에 기록할 값 {"출고일", "송장번호", "운송방법", "운송장경로"}
+    record: 납품 이력 공통 값 {"일시", "출고번호", "출고일", "송장번호", "운송방법", "작업자", "비고"}
+    반환: (success, msg, 처리된 품목 DataFrame[관리번호, 품목명, 시리얼번호, 출고수량] (요청 순서) 또는 None)
+    """
+    data_df = dfs["data"]
+    reqs = pd.DataFrame(requests, columns=["key", "deliver_qty", "serial_no"])
+    labels = locate_items(data_df, list(reqs["key"]))
+    if labels is None:
+        return False, "납품 처리 중 다른 사용자가 대상 품목을 변경했습니다. 내용을 다시 확인한 뒤 처리해주세요.", None
+    reqs["idx"] = labels
+    rows = data_df.loc[reqs["idx"]]
+
+    db_qty = _to_amount(rows["수량"])
+    qty = np.minimum(reqs["deliver_qty"].to_numpy(dtype=np.float64), db_qty)
+    full = np.abs(qty - db_qty) < QTY_TOLERANCE
+    price = _to_amount(rows["단가"])
+    tax_rate = _to_amount(rows["세율(%)"]) / 100
+    new_status = np.where(rows["Status"].to_numpy() == "납품대기/입금완료", "완료", "납품완료/입금대기").astype(object)
+
+    # 완전 출고: 행 그대로 출고 처리
+    full_idx = rows.index[full]
+    _set_column(data_df, full_idx, "Status", new_status[full])
+    for col, val in shipped.items():
+        _set_column(data_df, full_idx, col, val)
+    _set_column(data_df, full_idx, "미수금액", _to_amount(rows["합계금액"])[full])
+
+    # 부분 출고: 원래 행은 남은 수량, 출고분은 새 행
+    part = ~full
+    part_idx = rows.index[part]
+    for col, values in _amounts((db_qty - qty)[part], price[part], tax_rate[part]).items():
+        _set_column(data_df, part_idx, col, values)
+    new_rows = rows[part].assign(**_amounts(qty[part], price[part], tax_rate[part]), Status=new_status[part], **shipped)
+    if not new_rows.empty:
+        dfs["data"] = pd.concat([data_df, new_rows], ignore_index=True)
+
+    delivered = pd.DataFrame({
+        "관리번호": rows["관리번호"].to_numpy(), "품목명": rows["품목명"].to_numpy(),
+        "시리얼번호": reqs["serial_no"].to_numpy(), "출고수량": qty,
+    })
+    dfs["delivery"] = append_rows(dfs["delivery"], delivered.assign(**record).to_dict("records"))
+    return True, "", delivered
@@ -0,0 +1,233 @@
+import numpy as np
+import pandas as pd
+
+from storage import append_rows, mgmt_index
+
+MGMT_COL = "관리번호"
+
+
+def _to_amount(values):
+    """'1,200' 같은 문자열이 섞인 금액 컬럼을 float 배열로 변환합니다. (변환 불가 -> 0)"""
+    if not pd.api.types.is_numeric_dtype(values):
+        values = pd.to_numeric(values.astype(str).str.replace(",", ""), errors='coerce')
+    return values.fillna(0).to_numpy(dtype=np.float64)
+
+
+def payment_totals(pay_df, mgmt_nos):
+    """
+    관리번호별 (입금 합계, 마지막 입금일 'YYYY-MM-DD')을 한 번의 groupby로 계산합니다.
+    반환: (총 입금액 Series, 마지막 입금일 Series) - 인덱스는 관리번호 문자열, 입금 이력이 없는 번호는 빠짐
+    """
+    if pay_df.empty: return pd.Series(dtype=np.float64), pd.Series(dtype=object)
+    pays = pay_df.iloc[mgmt_index.positions(pay_df, mgmt_nos)]
+    keys = pays[MGMT_COL].astype(str).to_numpy()
+    paid = pd.Series(_to_amount(pays["입금액"]), index=pays.index).groupby(keys).sum()
+    # 일시는 'YYYY-MM-DD HH:MM:SS' 문자열이므로 문자열 최댓값이 가장 최근 입금
+    last = pays["일시"].where(pays["일시"].notna()).astype(object).groupby(keys).max()
+    return paid, last.map(lambda v: str(v).split(" ")[0], na_action='ignore')
+
+
+def _allocate_sequential(totals, paid):
+    # 음수 금액(할인/반품 행 등)이 섞인 그룹용: 행 순서대로 남은 입금액을 배분
+    allocated = np.zeros(len(totals))
+    remaining = paid
+    for i, row_total in enumerate(totals):
+        allocated[i] = row_total if remaining >= row_total else max(remaining, 0)
+        remaining -= allocated[i]
+    return allocated
+
+
+def allocate_payments(row_totals, group_keys, paid_by_key):
+    """
+    그룹(관리번호)별 입금 합계를 행 순서대로 합계금액에 채워 넣은 기수금액 배열을 반환합니다.
+    금액이 모두 0 이상이면 allocated = clip(입금 합계 - 앞 행들의 합계금액 누계, 0, 합계금액) 으로
+    행 단위 순차 배분과 같은 결과를 한 번에 계산합니다.
+    """
+    totals = pd.Series(row_totals)
+    paid = paid_by_key.reindex(group_keys).fillna(0).to_numpy(dtype=np.float64)
+    before = (totals.groupby(group_keys, sort=False).cumsum() - totals).to_numpy()
+    allocated = np.clip(paid - before, 0, None)
+    allocated = np.minimum(allocated, row_totals)
+
+    irregular = pd.Series((row_totals < 0) | (paid < 0)).groupby(group_keys, sort=False).transform("any").to_numpy()
+    if irregular.any():
+        for key in pd.unique(group_keys[irregular]):
+            idx = np.flatnonzero(group_keys == key)
+            allocated[idx] = _allocate_sequential(row_totals[idx], paid[idx[0]])
+    return allocated
+
+
+def save_status(status, paid_off):
+    """입금 저장 시의 상태 전환 (기존 recalc_payment_status 규칙 그대로)"""
+    delivered = pd.Series(status).str.contains("납품|완료").to_numpy()
+    return np.where(paid_off,
+                    np.where(delivered, "완료", "납품대기/입금완료"),
+                    np.where(status == "완료", "납품완료/입금완료", status))
+
+
+def paid_status(status):
+    """완납된 행의 상태: 납품까지 끝났으면 완료, 아니면 납품대기/입금완료"""
+    delivered = (status == "완료") | pd.Series(status).str.contains("납품완료").to_numpy()
+    return np.where(delivered, "완료", "납품대기/입금완료")
+
+
+def unpaid_status(status):
+    """미수금이 남은 행의 상태: 입금완료로 표시된 상태만 입금 전 상태로 되돌림"""
+    return np.select([status == "완료", status == "납품대기/입금완료"], ["납품완료/입금대기", "납품대기"], status)
+
+
+def reconcile_status(status, paid_off):
+    """
+    정합성 점검용 상태 전환. 다시 점검해도 같은 결과가 나오도록 납품대기/입금완료를 완료로 올리지 않고,
+    미수금이 남은 완료 건은 납품완료/입금대기로 되돌립니다.
+    """
+    return np.where(paid_off, paid_status(status), unpaid_status(status))
+
+
+def recalc_payment_status_bulk(dfs, mgmt_nos, status_rule=save_status):
+    """
+    여러 관리번호의 기수금액/미수금액/Status/입금완료일을 Payment 이력으로 한 번에 다시 계산합니다.
+    dfs["data"]를 직접 수정합니다. (트랜잭션 작업 함수 안에서 호출)
+    status_rule(status, paid_off)로 새 Status를 정합니다. (정합성 점검은 reconcile_status 사용)
+    """
+    if isinstance(mgmt_nos, str): mgmt_nos = [mgmt_nos]
+    mgmt_nos = list(dict.fromkeys(str(m) for m in mgmt_nos))
+    data_df = dfs["data"]
+    pos = mgmt_index.positions(data_df, mgmt_nos)
+    if not mgmt_nos or len(pos) == 0: return
+
+    paid_by_key, last_date_by_key = payment_totals(dfs["payment"], mgmt_nos)
+
+    keys = data_df[MGMT_COL].iloc[pos].astype(str).to_numpy()
+    row_totals = _to_amount(data_df["합계금액"].iloc[pos])
+    allocated = allocate_payments(row_totals, keys, paid_by_key)
+    unpaid = row_totals - allocated
+
+    status = data_df["Status"].iloc[pos].astype(str).to_numpy()
+    paid_off = unpaid < 1
+    new_status = status_rule(status, paid_off).astype(object)
+
+    for col, values in (("기수금액", allocated), ("미수금액", unpaid), ("Status", new_status)):
+        if data_df[col].dtype.kind in "iu": data_df[col] = data_df[col].astype(np.float64)
+        data_df.iloc[pos, data_df.columns.get_loc(col)] = values
+
+    if paid_off.any():
+        last_dates = last_date_by_key.reindex(keys[paid_off]).fillna("-").to_numpy(dtype=object)
+        data_df.iloc[pos[paid_off], data_df.columns.get_loc("입금완료일")] = last_dates
+
+
+RECONCILE_COLUMNS = ["기수금액", "미수금액", "입금완료일", "Status"]
+RECONCILE_EXCLUDED_STATUS = ["견적", "보류", "취소"]  # 입금 대상이 아닌 건
+AMOUNT_TOLERANCE = 0.5
+
+
+def reconcile_payments(dfs, tolerance=AMOUNT_TOLERANCE):
+    """
+    전체 장부의 입금 배분/상태를 Payment 시트 기준으로 한 번에 다시 계산하고 저장된 값과 비교합니다.
+    견적/보류/취소 행만 있는 관리번호는 제외합니다. dfs는 수정하지 않습니다.
+    Payment 이력이 하나도 없는 관리번호(시트 도입 전 주문 등)는 다시 계산하지 않고 제외 목록으로 돌려줍니다.
+    반환: (불일치 목록 DataFrame[관리번호, 행, 항목, 저장값, 계산값], 보정된 Data DataFrame, 제외된 관리번호 목록)
+    """
+    data_df = dfs["data"]
+    fixed = data_df.copy()
+    report = pd.DataFrame(columns=[MGMT_COL, "행", "항목", "저장값", "계산값"])
+    if data_df.empty: return report, fixed, []
+
+    active = ~data_df["Status"].astype(str).isin(RECONCILE_EXCLUDED_STATUS)
+    mgmt_nos = data_df.loc[active, MGMT_COL].astype(str).unique()
+    mgmt_nos = [m for m in mgmt_nos if m not in ("-", "nan", "")]
+    pay_df = dfs["payment"]
+    has_history = set(pay_df[MGMT_COL].astype(str)) if not pay_df.empty else set()
+    skipped = [m for m in mgmt_nos if m not in has_history]
+    mgmt_nos = [m for m in mgmt_nos if m in has_history]
+    if not mgmt_nos: return report, fixed, skipped
+
+    recalc_payment_status_bulk({"data": fixed, "payment": pay_df}, mgmt_nos, reconcile_status)
+
+    pos = mgmt_index.positions(fixed, mgmt_nos)
+    found = []
+    for col in RECONCILE_COLUMNS:
+        stored, expected = data_df[col].iloc[pos], fixed[col].iloc[pos]
+        if col in ("기수금액", "미수금액"):
+            diff = np.abs(_to_amount(stored) - _to_amount(expected)) > tolerance
+        else:
+            diff = (stored.astype(str) != expected.astype(str)).to_numpy()
+        if diff.any():
+            found.append(pd.DataFrame({MGMT_COL: data_df[MGMT_COL].iloc[pos[diff]].to_numpy(), "행": stored.index[diff],
+                                       "항목": col, "저장값": stored.to_numpy()[diff], "계산값": expected.to_numpy()[diff]}))
+    if found:
+        report = pd.concat(found, ignore_index=True).sort_values(["행", "항목"], kind="stable", ignore_index=True)
+    return report, fixed, skipped
+
+
+# ==========================================================================
+# [NEW] 2단계 입금 처리 (계획 -> 사용자 확인 -> 짧은 트랜잭션으로 기록)
+# ==========================================================================
+def write_off_threshold(currency):
+    """이 금액 이하로 남는 잔액은 수수료로 처리할지 묻습니다. (KRW 5,000 / 외화 200)"""
+    return 5000 if currency == "KRW" else 200
+
+
+def _unpaid_rows(data_df, mgmt_nos):
+    # 대상 행들의 [(관리번호, 품목명, 통화, 미수금액)] (시트 순서, 관리번호 인덱스로 찾음)
+    rows = mgmt_index.rows(data_df, mgmt_nos)
+    unpaid = _to_amount(rows["미수금액"])
+    return [(str(m), str(item), str(cur).upper(), float(u))
+            for m, item, cur, u in zip(rows[MGMT_COL], rows["품목명"], rows["통화"], unpaid)]
+
+
+def _same_rows(rows, planned, tolerance=AMOUNT_TOLERANCE):
+    if len(rows) != len(planned): return False
+    return all(r[:3] == p[:3] and abs(r[3] - p[3]) <= tolerance for r, p in zip(rows, planned))
+
+
+def plan_payment(dfs, mgmt_nos, amount):
+    """
+    1단계 (읽기 전용): 입금액을 대상 주문들의 미수금에 시트 순서대로 배분하는 계획을 만듭니다. dfs는 수정하지 않습니다.
+    잔액이 write_off_threshold() 이하로 남는 항목은 수수료 처리 여부를 물어야 하므로 plan["write_off"]에 담습니다.
+    반환: {"mgmt_nos", "rows"(계획 기준 미수금), "deposits"(관리번호별 입금액/통화), "write_off"} / 대상 행이 없으면 None
+    """
+    if isinstance(mgmt_nos, str): mgmt_nos = [mgmt_nos]
+    mgmt_nos = list(dict.fromkeys(str(m) for m in mgmt_nos))
+    work = {"data": dfs["data"].copy(), "payment": dfs["payment"]}
+    recalc_payment_status_bulk(work, mgmt_nos)
+    rows = _unpaid_rows(work["data"], mgmt_nos)
+    if not rows: return None
+
+    deposits, write_off, remaining = {}, None, amount
+    for mgmt_no, item, currency, unpaid in rows:
+        if remaining <= 0: break
+        entry = deposits.setdefault(mgmt_no, {"deposit": 0, "currency": currency})
+        if unpaid <= 0: continue
+        if remaining < unpaid and unpaid - remaining <= write_off_threshold(currency):
+            write_off = {"관리번호": mgmt_no, "품목명": item, "잔액": unpaid - remaining, "통화": currency}
+        pay = min(unpaid, remaining)
+        entry["deposit"] += pay
+        remaining -= pay
+    return {"mgmt_nos": mgmt_nos, "rows": rows, "deposits": deposits, "write_off": write_off}
+
+
+def plan_records(plan, write_off=False):
+    """계획을 Payment 시트 기록 목록 [{관리번호, 구분, 입금액, 통화}]으로 만듭니다. 수수료 처리는 write_off=True일 때만 포함"""
+    fee = plan["write_off"] if write_off else None
+    records = []
+    for mgmt_no, entry in plan["deposits"].items():
+        if entry["deposit"] > 0:
+            records.append({MGMT_COL: mgmt_no, "구분": "입금", "입금액": entry["deposit"], "통화": entry["currency"]})
+        if fee and fee[MGMT_COL] == mgmt_no:
+            records.append({MGMT_COL: mgmt_no, "구분": "수수료/조정", "입금액": fee["잔액"], "통화": fee["통화"]})
+    return records
+
+
+def apply_payment_plan(dfs, plan, records):
+    """
+    2단계 (트랜잭션 안): 계획 이후 대상 주문의 미수금이 그대로인지 확인하고 Payment 기록을 추가한 뒤 다시 계산합니다.
+    사용자에게 묻는 과정이 없어 트랜잭션이 짧게 끝납니다. 반환: (success, msg)
+    """
+    recalc_payment_status_bulk(dfs, plan["mgmt_nos"])
+    if not _same_rows(_unpaid_rows(dfs["data"], plan["mgmt_nos"]), plan["rows"]):
+        return False, "입금 처리 중 다른 사용자가 대상 주문을 변경했습니다. 내용을 다시 확인한 뒤 처리해주세요."
+    if records:
+        dfs["payment"] = append_rows(dfs["payment"], records)
+    recalc_payment_status_bulk(dfs, plan["mgmt_nos"])
+    return True, ""
@@ -0,0 +1,64 @@
+import re
+import threading
+import weakref
+from datetime import datetime
+
+# 관리번호(Q/O + YYMMDD-순번), 출고번호(CX + YYMMDD-순번)
+ID_PATTERN = r"^([A-Z]+\d{6})-(\d+)$"
+SEQUENCE_COLUMNS = {"data": "관리번호", "delivery": "출고번호"}
+
+
+def high_water_marks(values):
+    """번호 컬럼에서 {접두어(Q250101 등): 최대 순번}을 한 번의 정규식 추출 + groupby로 계산합니다."""
+    parts = values.astype(str).str.extract(ID_PATTERN).dropna()
+    if parts.empty: return {}
+    return parts[1].astype(int).groupby(parts[0]).max().to_dict()
+
+
+class SequenceRegistry:
+    """
+    접두어별 최대 순번(high-water mark) 레지스트리.
+    로드/커밋으로 시트가 바뀔 때만 observe()로 다시 집계하고, 새 번호는 사전 조회 한 번으로 만듭니다.
+    최댓값은 줄어들지 않으므로 삭제된 번호는 다시 쓰지 않습니다.
+    """
+
+    def __init__(self):
+        self._marks = {}
+        self._seen = {}  # 시트 키 -> 마지막으로 집계한 DataFrame (weakref)
+        self._lock = threading.Lock()
+
+    def observe(self, frames):
+        """로드/커밋된 시트들의 번호로 최댓값을 갱신합니다. (이미 집계한 DataFrame은 건너뜀)"""
+        for key, column in SEQUENCE_COLUMNS.items():
+            df = frames.get(key)
+            if df is None or column not in df.columns: continue
+            ref = self._seen.get(key)
+            if ref is not None and ref() is df: continue
+            marks = high_water_marks(df[column])
+            with self._lock:
+                for prefix, seq in marks.items():
+                    if seq > self._marks.get(prefix, 0): self._marks[prefix] = seq
+                self._seen[key] = weakref.ref(df)
+
+    def next_id(self, letter, when=None):
+        """오늘(또는 when) 날짜의 다음 번호. 예약하지 않으므로 창을 닫아도 번호가 비지 않습니다."""
+        prefix = f"{letter}{(when or datetime.now()).strftime('%y%m%d')}"
+        with self._lock:
+            return f"{prefix}-{self._marks.get(prefix, 0) + 1:03d}"
+
+    def claim(self, df, column, wanted):
+        """
+        트랜잭션 안에서 새 번호를 확정합니다. 저장소에서 방금 읽은 시트(df)에 wanted가 이미 있으면
+        (다른 사용자가 먼저 저장) 그 시트 기준 다음 순번으로 바꿔 반환합니다.
+        """
+        match = re.match(ID_PATTERN, str(wanted))
+        if not match or column not in df.columns: return wanted
+        prefix, seq = match.group(1), int(match.group(2))
+
+        values = df[column].astype(str)
+        taken = (values == wanted).any()
+        latest = high_water_marks(values[values.str.startswith(prefix)]).get(prefix, 0) if taken else 0
+        with self._lock:
+            if taken: seq = max(self._marks.get(prefix, 0), latest) + 1
+            if seq > self._marks.get(prefix, 0): self._marks[prefix] = seq
+        return f"{prefix}-{seq:03d}"
@@ -1,6 +1,8 @@
 import os
 import sys
+import threading
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import messagebox
 
 import customtkinter as ctk
@@ -12,7 +14,7 @@ except ImportError:
     DND_AVAILABLE = False
 
 from config import Config
-from data_manager import DataManager
+from data_manager import STALE_SNAPSHOT_MSG, DataManager
 from popup_manager import PopupManager
 from styles import COLORS, FONT_FAMILY, FONTS
 from views.calendar_view import CalendarView
@@ -56,31 +58,102 @@ class SalesManagerApp(BaseApp):
         self.current_view = None
         self.nav_buttons = {}
 
+        # [NEW] 백그라운드 데이터 로더 (파일 읽기/파싱은 작업 스레드, 교체는 UI 스레드)
+        self.loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="data-loader")
+        self._load_future = None
+        self._load_callback = None
+        self._loading_event = threading.Event()
+
         self.create_sidebar()
         self.create_content_area()
         
-        # 데이터 로드 시도
-        success, msg = self.dm.load_data()
-        if not success:
-            pass 
+        # 데이터 로드 시도 (로컬 캐시가 있으면 즉시 표시하고, 원격 파일 확인은 화면 표시 후 진행)
+        warm_start, _ = self.dm.load_cached()
+        if not warm_start:
+            self.request_reload(force=True)
             
         self.show_dashboard()
         
         # [신규] 자동 새로고침 시작
-        self.start_auto_refresh_loop()
+        self.after(100 if warm_start else 5000, self.start_auto_refresh_loop)
+        # [NEW] 쓰기 큐 결과 반영 시작
+        self.after(100, self._poll_writes)
 
     # [신규] 자동 새로고침 루프
     def start_auto_refresh_loop(self):
+        self.request_reload(force=False)
+        # 5초마다 체크
+        self.after(5000, self.start_auto_refresh_loop)
+
+    # [NEW] 쓰기 큐(dm.save_async)의 기록 결과를 UI 스레드에서 반영
+    def _poll_writes(self):
+        # 기록된 데이터(다른 사용자 변경 포함)나 실패로 되돌린 데이터를 현재 화면에 다시 표시
+        if self.dm.process_write_results() and self.current_view and hasattr(self.current_view, "refresh_data"):
+            self.current_view.refresh_data()
+        self.after(100, self._poll_writes)
+
+    # ==========================================================================
+    # [NEW] 백그라운드 로드
+    # ==========================================================================
+    def request_reload(self, force=False, callback=None):
+        """
+        작업 스레드에서 변경 확인 및 로드를 수행합니다. 이미 로드 중이면 무시합니다.
+        callback(success, msg)은 로드가 끝난 뒤 UI 스레드에서 호출됩니다.
+        """
+        if self._load_future is not None: return False
+        if force:
+            # 저장소 이관/중단된 저장 복구처럼 파일을 쓰는 작업은 UI 스레드에서 먼저 (로더 스레드는 읽기만 함)
+            success, msg = self.dm.prepare_storage()
+            if not success:
+                if callback: callback(False, msg)
+                return True
+        self._load_callback = callback
+        self._loading_event.clear()
+        if force: self._show_loading(True)
+        self._load_future = self.loader.submit(self._background_load, force)
+        self.after(100, self._poll_reload)
+        return True
+
+    def _background_load(self, force):
+        """작업 스레드: Tk 위젯이나 dm의 메모리 데이터는 건드리지 않습니다."""
+        if not force and not self.dm.check_for_external_changes(): return None
+        self._loading_event.set()
+        # 자동 새로고침은 바뀐 시트만, 수동 로드는 전체를 다시 읽음
+        return self.dm.read_snapshot(full=force)
+
+    def _poll_reload(self):
+        future = self._load_future
+        if not future.done():
+            if self._loading_event.is_set(): self._show_loading(True)
+            self.after(100, self._poll_reload)
+            return
+
+        self._load_future = None
+        callback, self._load_callback = self._load_callback, None
+        self._show_loading(False)
         try:
-            if self.dm.check_for_external_changes():
-                success, _ = self.dm.load_data()
-                if success:
-                    self.refresh_ui()
+            result = future.result()
         except Exception as e:
             print(f"Auto Refresh Error: {e}")
-        
-        # 5초마다 체크
-        self.after(5000, self.start_auto_refresh_loop)
+            if callback: callback(False, f"오류 발생: {e}")
+            return
+        if result is None: return
+
+        success, msg, snapshot = result
+        if success:
+            # 읽는 동안 커밋 등으로 데이터가 바뀌었으면 스냅샷을 버리므로 그 결과를 그대로 알림
+            success = self.dm.apply_snapshot(snapshot)
+            if success: self.refresh_ui()
+            else: msg = STALE_SNAPSHOT_MSG
+        if callback: callback(success, msg)
+
+    def _show_loading(self, visible):
+        if visible and not self.loading_frame.winfo_ismapped():
+            self.loading_frame.pack(fill="x", padx=20, pady=(0, 5), side="bottom")
+            self.loading_bar.start()
+        elif not visible and self.loading_frame.winfo_ismapped():
+            self.loading_bar.stop()
+            self.loading_frame.pack_forget()
 
     def create_sidebar(self):
         self.sidebar_frame = ctk.CTkFrame(self, width=240, corner_radius=0, fg_color=COLORS["bg_dark"])
@@ -142,6 +215,12 @@ class SalesManagerApp(BaseApp):
                       height=40, anchor="w", fg_color=COLORS["bg_medium"], text_color=COLORS["text"], 
                       hover_color=COLORS["bg_light"], font=FONTS["main"]).pack(fill="x", padx=10, pady=10, side="bottom")
 
+        # [NEW] 데이터 로드 진행 표시 (로드 중에만 표시)
+        self.loading_frame = ctk.CTkFrame(self.sidebar_frame, fg_color="transparent")
+        ctk.CTkLabel(self.loading_frame, text="데이터 불러오는 중...", font=FONTS["small"], text_color=COLORS["text_dim"]).pack(anchor="w")
+        self.loading_bar = ctk.CTkProgressBar(self.loading_frame, mode="indeterminate", height=6)
+        self.loading_bar.pack(fill="x", pady=(2, 0))
+
     def create_content_area(self):
         self.content_frame = ctk.CTkFrame(self, corner_radius=0, fg_color="transparent")
         self.content_frame.grid(row=0, column=1, sticky="nsew")
@@ -186,12 +265,12 @@ class SalesManagerApp(BaseApp):
     def show_table_view(self): self.switch_view("📊 테이블 뷰", self.view_table)
 
     def reload_all_data(self):
-        success, msg = self.dm.load_data()
-        if success:
-            messagebox.showinfo("완료", "데이터를 새로고침했습니다.")
-            self.refresh_ui()
-        else:
-            messagebox.showerror("오류", msg)
+        def on_done(success, msg):
+            if success: messagebox.showinfo("완료", "데이터를 새로고침했습니다.")
+            else: messagebox.showerror("오류", msg)
+
+        if not self.request_reload(force=True, callback=on_done):
+            messagebox.showinfo("알림", "데이터를 불러오는 중입니다. 잠시 후 다시 시도해주세요.")
 
     def refresh_ui(self):
         if self.dm.is_dev_mode:
@@ -205,6 +284,9 @@ class SalesManagerApp(BaseApp):
             self.current_view.refresh_data()
 
     def on_closing(self):
+        # 아직 기록하지 못한 편집이 있으면 마저 저장
+        self.dm.write_queue.join(timeout=30)
+        self.loader.shutdown(wait=False, cancel_futures=True)
         self.quit()
         self.destroy()
 
@@ -1,11 +1,31 @@
+import os
+import shutil
 import tkinter as tk
 from datetime import datetime
 from tkinter import messagebox
 
 import customtkinter as ctk
+from config import Config
 from styles import COLORS, FONT_FAMILY, FONTS
 from popups.client_popup import ClientPopup
 
+
+def copy_attachments(copies):
+    """
+    [NEW] 저장이 기록된 뒤 (원본, 대상) 목록대로 첨부 파일을 복사합니다. (save_async의 on_success에서 UI 스레드로 호출)
+    작업 함수는 여러 번 실행될 수 있으므로 복사는 여기서 한 번만 합니다. 실패한 파일은 알림으로 표시
+    """
+    failed = []
+    for src, target in copies:
+        if os.path.abspath(src) == os.path.abspath(target): continue
+        try:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(src, target)
+        except Exception as e:
+            failed.append(f"{os.path.basename(src)}: {e}")
+    if failed:
+        messagebox.showerror("첨부 파일 오류", "저장은 완료되었으나 첨부 파일 복사에 실패했습니다.\n" + "\n".join(failed))
+
 class BasePopup(ctk.CTkToplevel):
     def __init__(self, parent, data_manager, refresh_callback, popup_title="Popup", mgmt_no=None):
         super().__init__(parent)
@@ -160,6 +180,11 @@ class BasePopup(ctk.CTkToplevel):
                 entry.insert(0, os.path.basename(full_path))
             except: pass
 
+    def attachment_target(self, src_path, folder, name):
+        """[NEW] 첨부 파일을 보관할 경로 (첨부 루트/folder/name + 원본 확장자). 원본 파일이 없으면 ''"""
+        if not src_path or not os.path.exists(src_path): return ""
+        return os.path.join(Config.DEFAULT_ATTACHMENT_ROOT, folder, f"{name}{os.path.splitext(src_path)[1]}")
+
     def on_drop(self, filenames, col_name):
         """Common DnD handler."""
         if filenames:
@@ -211,8 +236,8 @@ class BasePopup(ctk.CTkToplevel):
         """Common logic for selecting a client."""
         if not client_name: return
 
-        df = self.dm.df_clients
-        if client_name not in df["업체명"].values:
+        row = self.dm.get_client(client_name)
+        if row is None:
             self.attributes("-topmost", False)
             if messagebox.askyesno("알림", f"'{client_name}'은(는) 등록되지 않은 업체입니다.\n신규 등록하시겠습니까?", parent=self):
                 self.attributes("-topmost", True)
@@ -227,17 +252,16 @@ class BasePopup(ctk.CTkToplevel):
                 self.attributes("-topmost", True)
             return
 
-        row = df[df["업체명"] == client_name]
-        if not row.empty:
+        if row is not None:
             # Handle currency if combo_currency exists
-            currency = row.iloc[0].get("통화", "KRW")
+            currency = row.get("통화", "KRW")
             if hasattr(self, "combo_currency") and hasattr(self, "on_currency_change"):
                 if currency and str(currency) != "nan":
                     self.combo_currency.set(currency)
                     self.on_currency_change(currency)
             
             # Handle client note if lbl_client_note exists
-            note = str(row.iloc[0].get("특이사항", "-"))
+            note = str(row.get("특이사항", "-"))
             if note == "nan" or not note: note = "-"
             if hasattr(self, "lbl_client_note"):
                 self.lbl_client_note.configure(text=f"업체 특이사항: {note}")
@@ -190,8 +190,7 @@ class ClientPopup(ctk.CTkToplevel):
     # --- Logic Methods ---
 
     def _load_data(self):
-        df = self.dm.df_clients
-        row = df[df["업체명"] == self.client_name].iloc[0]
+        row = self.dm.get_client(self.client_name)
         
         for key, widget in self.entries.items():
             val = str(row.get(key, ""))
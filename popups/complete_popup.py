@@ -168,15 +168,14 @@ class CompletePopup(BasePopup):
                       text_color=COLORS["text"]).pack(side="right")
 
     def _load_data(self):
-        df = self.dm.df_data
-        rows = df[df["관리번호"].astype(str) == str(self.mgmt_no)]
+        rows = self.dm.get_rows("data", self.mgmt_no, include_archive=True) # [수정] 보관된 주문도 조회
         if rows.empty: return
 
         # [수정] Delivery 시트 데이터 로드
         delivery_df = self.dm.df_delivery
         current_deliveries = pd.DataFrame()
         if not delivery_df.empty:
-            current_deliveries = delivery_df[delivery_df["관리번호"].astype(str) == str(self.mgmt_no)]
+            current_deliveries = self.dm.get_rows("delivery", self.mgmt_no)
 
         first = rows.iloc[0]
 
@@ -251,7 +250,7 @@ class CompletePopup(BasePopup):
         # 3. 입금 이력 로드
         for widget in self.scroll_payment.winfo_children(): widget.destroy()
         if not self.dm.df_payment.empty:
-            pay_rows = self.dm.df_payment[self.dm.df_payment["관리번호"].astype(str) == str(self.mgmt_no)]
+            pay_rows = self.dm.get_rows("payment", self.mgmt_no)
             if not pay_rows.empty:
                 pay_rows = pay_rows.sort_values(by="일시", ascending=False)
                 for _, p_row in pay_rows.iterrows():
@@ -264,7 +263,7 @@ class CompletePopup(BasePopup):
         # 4. 납품 이력 로드
         for widget in self.scroll_delivery.winfo_children(): widget.destroy()
         if not self.dm.df_delivery.empty:
-            del_rows = self.dm.df_delivery[self.dm.df_delivery["관리번호"].astype(str) == str(self.mgmt_no)]
+            del_rows = self.dm.get_rows("delivery", self.mgmt_no)
             if not del_rows.empty:
                 del_rows = del_rows.sort_values(by="일시", ascending=False)
                 for _, d_row in del_rows.iterrows():
@@ -286,7 +285,7 @@ class CompletePopup(BasePopup):
         added_paths = set()
         
         if not self.dm.df_payment.empty:
-            p_rows = self.dm.df_payment[self.dm.df_payment["관리번호"].astype(str) == str(self.mgmt_no)]
+            p_rows = self.dm.get_rows("payment", self.mgmt_no)
             for _, prow in p_rows.iterrows():
                 f_path = str(prow.get("외화입금증빙경로", "")).strip()
                 if f_path and f_path.lower() != "nan" and f_path != "-" and f_path not in added_paths:
@@ -302,9 +301,9 @@ class CompletePopup(BasePopup):
 
         # 5-3. 사업자등록증
         client_name = str(first.get("업체명", ""))
-        client_row = self.dm.df_clients[self.dm.df_clients["업체명"] == client_name]
-        if not client_row.empty:
-            if self._add_file_row("사업자등록증", client_row.iloc[0].get("사업자등록증경로")): has_files = True
+        client_row = self.dm.get_client(client_name)
+        if client_row is not None:
+            if self._add_file_row("사업자등록증", client_row.get("사업자등록증경로")): has_files = True
                 
         if not has_files:
             ctk.CTkLabel(self.files_scroll, text="첨부 파일 없음", font=FONTS["small"], text_color=COLORS["text_dim"]).pack(pady=20)
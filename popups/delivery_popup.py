@@ -1,14 +1,11 @@
-import os
-import shutil
 import tkinter as tk
 from datetime import datetime
 from tkinter import messagebox
 import getpass
 import customtkinter as ctk
-import pandas as pd
 
-from config import Config
-from popups.base_popup import BasePopup
+from engines import item_keys
+from popups.base_popup import BasePopup, copy_attachments
 from popups.packing_list_popup import PackingListPopup 
 from styles import COLORS, FONTS
 from export_manager import ExportManager 
@@ -28,6 +25,7 @@ class DeliveryPopup(BasePopup):
         self.item_widgets_map = {}
         self.export_manager = ExportManager() 
         self.current_delivery_no = ""
+        self.is_new_delivery_no = False # 이 창에서 새로 만든 출고번호인지 (저장 시 충돌 확인)
         self.cached_client_name = "" # UI Entry 대신 변수로 관리
         
         super().__init__(parent, data_manager, refresh_callback, popup_title="납품 처리", mgmt_no=self.mgmt_nos[0])
@@ -140,8 +138,7 @@ class DeliveryPopup(BasePopup):
                       font=FONTS["header"]).pack(side="right")
 
     def _load_data(self):
-        df = self.dm.df_data
-        rows = df[df["관리번호"].isin(self.mgmt_nos)].copy()
+        rows = self.dm.get_rows("data", self.mgmt_nos).copy()
         if rows.empty:
             messagebox.showinfo("정보", "데이터를 찾을 수 없습니다.", parent=self)
             self.after(100, self.destroy)
@@ -159,9 +156,9 @@ class DeliveryPopup(BasePopup):
 
         # 노트 정보 로드
         client_note = "-"
-        client_row = self.dm.df_clients[self.dm.df_clients["업체명"] == self.cached_client_name]
-        if not client_row.empty:
-             val = client_row.iloc[0].get("특이사항", "-")
+        client_row = self.dm.get_client(self.cached_client_name)
+        if client_row is not None:
+             val = client_row.get("특이사항", "-")
              if str(val) != "nan" and val: client_note = str(val)
         
         order_note = str(first.get("주문요청사항", "-"))
@@ -179,10 +176,11 @@ class DeliveryPopup(BasePopup):
             if path: self.update_file_entry("운송장경로", path)
 
         # 출고번호
-        d_rows = self.dm.df_delivery[self.dm.df_delivery["관리번호"].isin(self.mgmt_nos)]
+        d_rows = self.dm.get_rows("delivery", self.mgmt_nos)
         if not d_rows.empty:
             self.current_delivery_no = d_rows.sort_values("일시", ascending=False).iloc[0].get("출고번호", "")
-        if not self.current_delivery_no or self.current_delivery_no == "-":
+        self.is_new_delivery_no = not self.current_delivery_no or self.current_delivery_no == "-"
+        if self.is_new_delivery_no:
             self.current_delivery_no = self.dm.generate_delivery_no()
             
         self.entry_delivery_no.configure(state="normal")
@@ -190,13 +188,15 @@ class DeliveryPopup(BasePopup):
         self.entry_delivery_no.insert(0, self.current_delivery_no)
         self.entry_delivery_no.configure(state="readonly")
 
-        # 품목 리스트
+        # 품목 리스트 (저장 시 행 번호 대신 관리번호 + 행 내용 키로 대상을 찾음)
+        keys = item_keys(rows)
         target_rows = rows[~rows["Status"].isin(["납품완료/입금대기", "완료", "취소", "보류"])]
         for index, row_data in target_rows.iterrows():
             item_data = row_data.to_dict()
             key = (str(row_data.get("관리번호", "")).strip(), str(row_data.get("모델명", "")).strip(), str(row_data.get("Description", "")).strip())
             item_data["시리얼번호"] = serial_map.get(key, "-")
             self._add_delivery_item_row(index, item_data)
+            self.item_widgets_map[index]["key"] = keys[index]
 
     def _add_delivery_item_row(self, row_index, item_data):
         row_frame = ctk.CTkFrame(self.scroll_items, fg_color="transparent", height=40)
@@ -231,11 +231,10 @@ class DeliveryPopup(BasePopup):
         if not self.cached_client_name:
             messagebox.showwarning("경고", "고객사 정보가 없습니다.", parent=self)
             return None
-        client_row = self.dm.df_clients[self.dm.df_clients["업체명"] == self.cached_client_name]
-        if client_row.empty:
+        client_row = self.dm.get_client(self.cached_client_name)
+        if client_row is None:
             messagebox.showerror("오류", "고객 정보를 찾을 수 없습니다.", parent=self)
-            return None
-        return client_row.iloc[0]
+        return client_row
 
     def _collect_export_items(self):
         """출고 수량이 입력된 항목들을 수집합니다."""
@@ -271,7 +270,7 @@ class DeliveryPopup(BasePopup):
         if client_info is None: return
 
         main_mgmt_no = self.mgmt_nos[0]
-        rows = self.dm.df_data[self.dm.df_data["관리번호"] == main_mgmt_no]
+        rows = self.dm.get_rows("data", main_mgmt_no)
         if rows.empty: return
         first = rows.iloc[0]
 
@@ -304,7 +303,7 @@ class DeliveryPopup(BasePopup):
             messagebox.showwarning("경고", "출고 수량이 입력된 항목이 없습니다.", parent=self)
             return
 
-        rows = self.dm.df_data[self.dm.df_data["관리번호"].isin(self.mgmt_nos)]
+        rows = self.dm.get_rows("data", self.mgmt_nos)
         first = rows.iloc[0] if not rows.empty else {}
 
         order_info = {
@@ -316,35 +315,42 @@ class DeliveryPopup(BasePopup):
         self._execute_export(self.export_manager.export_ci_to_pdf, client_info, order_info, items, "CI")
 
     def export_pl(self):
+        open_pl = self._packing_list_opener()
+        if open_pl is None: return
+        open_pl(self, self.current_delivery_no) # PL 팝업이 닫힐 때 이 팝업의 항상 위 상태를 되돌리도록 먼저 띄움
+        self.attributes("-topmost", False)
+
+    def _packing_list_opener(self):
+        """
+        [NEW] 지금 입력된 출고 항목으로 PL 발행 팝업을 여는 함수 open_pl(parent, 출고번호)를 만듭니다. (항목이 없으면 None)
+        입력값을 미리 읽어 두므로 저장이 확정된 뒤 이 팝업을 닫은 상태에서도 확정된 출고번호로 열 수 있습니다.
+        """
         client_info = self._get_client_info()
-        if client_info is None: return
+        if client_info is None: return None
 
         items = self._collect_export_items()
         if not items:
             messagebox.showwarning("경고", "출고 수량이 입력된 항목이 없습니다.", parent=self)
-            return
+            return None
 
-        initial_data = {
-            "client_name": self.cached_client_name,
-            "mgmt_no": self.current_delivery_no,
-            "date": self.entry_delivery_date.get(),
-            "items": items
-        }
+        client_name, date = self.cached_client_name, self.entry_delivery_date.get()
+        export_manager, dm = self.export_manager, self.dm
 
-        def on_pl_confirm(pl_items, notes):
-            first_po = items[0].get("po_no", "") if items else ""
-            order_info = {
-                "client_name": self.cached_client_name,
-                "mgmt_no": self.current_delivery_no,
-                "date": self.entry_delivery_date.get(),
-                "po_no": first_po,
-                "notes": notes
-            }
-            success, result = self.export_manager.export_pl_to_pdf(client_info, order_info, pl_items)
-            return success, result 
+        def open_pl(parent, delivery_no):
+            initial_data = {"client_name": client_name, "mgmt_no": delivery_no, "date": date, "items": items}
 
-        self.attributes("-topmost", False)
-        PackingListPopup(self, self.dm, on_pl_confirm, initial_data)
+            def on_pl_confirm(pl_items, notes):
+                order_info = {
+                    "client_name": client_name,
+                    "mgmt_no": delivery_no,
+                    "date": date,
+                    "po_no": items[0].get("po_no", ""),
+                    "notes": notes
+                }
+                return export_manager.export_pl_to_pdf(client_info, order_info, pl_items)
+
+            PackingListPopup(parent, dm, on_pl_confirm, initial_data)
+        return open_pl
 
     def _execute_export(self, export_func, client_info, order_info, items, doc_name):
         self.attributes("-topmost", False)
@@ -377,7 +383,7 @@ class DeliveryPopup(BasePopup):
                 return
 
             update_requests.append({
-                "idx": index, "deliver_qty": deliver_qty,
+                "key": item_widget["key"], "deliver_qty": deliver_qty,
                 "serial_no": str(item_widget["row_data"].get("시리얼번호", "-"))
             })
         
@@ -390,96 +396,60 @@ class DeliveryPopup(BasePopup):
             path = self.full_paths.get("운송장경로", "")
             waybill_path = path if path else self.entry_waybill_file.get().strip()
 
+        # [수정] 작업 함수는 낙관적 반영/백그라운드 기록 때 여러 번 실행되므로 입력값과 파일 경로는 미리 정해 두고,
+        # 파일 복사와 팝업 상태 변경은 기록이 끝난 뒤 UI 스레드(on_saved)에서 한 번만 함
+        safe_client = "".join([c for c in self.cached_client_name if c.isalnum() or c in (' ', '_')]).strip()
+        final_waybill_path = self.attachment_target(waybill_path, "운송장", f"운송장_{safe_client}_{self.mgmt_nos[0]}")
+        invoice_no = self.entry_invoice_no.get()
+        shipping_method = self.entry_shipping_method.get()
+        now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        current_user = getpass.getuser()
+        is_new, requested_no = self.is_new_delivery_no, self.current_delivery_no
+        claimed = []
+
         def update_logic(dfs):
-            processed_items = []
-            new_delivery_records = []
-            final_waybill_path = "" 
-
-            # 운송장 파일 처리
-            if waybill_path and os.path.exists(waybill_path):
-                target_dir = os.path.join(Config.DEFAULT_ATTACHMENT_ROOT, "운송장")
-                if not os.path.exists(target_dir):
-                    try: os.makedirs(target_dir)
-                    except: pass
-                
-                safe_client = "".join([c for c in self.cached_client_name if c.isalnum() or c in (' ', '_')]).strip()
-                ext = os.path.splitext(waybill_path)[1]
-                target_path = os.path.join(target_dir, f"운송장_{safe_client}_{self.mgmt_nos[0]}{ext}")
-                
-                if os.path.abspath(waybill_path) != os.path.abspath(target_path):
-                    try: shutil.copy2(waybill_path, target_path); final_waybill_path = target_path
-                    except Exception as e: return False, f"운송장 파일 복사 실패: {e}"
-                else: final_waybill_path = waybill_path
-
-            current_user = getpass.getuser()
-            
-            for req in update_requests:
-                idx = req["idx"]
-                if idx not in dfs["data"].index: continue
-                
-                row_data = dfs["data"].loc[idx]
-                db_qty = float(str(row_data["수량"]).replace(",", "") or 0)
-                deliver_qty = min(req["deliver_qty"], db_qty)
-                
-                new_delivery_records.append({
-                    "일시": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "출고번호": self.current_delivery_no, "출고일": delivery_date,
-                    "관리번호": row_data.get("관리번호", ""), "품목명": row_data.get("품목명", ""),
-                    "시리얼번호": req["serial_no"], "출고수량": deliver_qty,
-                    "송장번호": self.entry_invoice_no.get(), "운송방법": self.entry_shipping_method.get(),
-                    "작업자": current_user, "비고": "일괄 납품 처리"
-                })
-
-                # 데이터 업데이트 (완전 출고 vs 부분 출고)
-                is_full = abs(deliver_qty - db_qty) < 0.000001
-                new_status = "완료" if row_data.get("Status") == "납품대기/입금완료" else "납품완료/입금대기"
-                
-                price = float(str(row_data.get("단가", 0)).replace(",", "") or 0)
-                tax_rate = float(str(row_data.get("세율(%)", 0)).replace(",", "") or 0) / 100
-
-                if is_full:
-                    dfs["data"].at[idx, "Status"] = new_status
-                    dfs["data"].at[idx, "출고일"] = delivery_date
-                    dfs["data"].at[idx, "송장번호"] = self.entry_invoice_no.get()
-                    dfs["data"].at[idx, "운송방법"] = self.entry_shipping_method.get()
-                    dfs["data"].at[idx, "운송장경로"] = final_waybill_path
-                    dfs["data"].at[idx, "미수금액"] = float(str(row_data.get("합계금액", 0)).replace(",", ""))
-                else:
-                    remain_qty = db_qty - deliver_qty
-                    supply = remain_qty * price
-                    tax = supply * tax_rate
-                    dfs["data"].at[idx, "수량"] = remain_qty
-                    dfs["data"].at[idx, "공급가액"] = supply
-                    dfs["data"].at[idx, "세액"] = tax
-                    dfs["data"].at[idx, "합계금액"] = supply + tax
-                    dfs["data"].at[idx, "미수금액"] = supply + tax
-                    
-                    new_supply = deliver_qty * price
-                    new_tax = new_supply * tax_rate
-                    new_row = row_data.copy()
-                    new_row.update({
-                        "수량": deliver_qty, "공급가액": new_supply, "세액": new_tax, "합계금액": new_supply + new_tax,
-                        "미수금액": new_supply + new_tax, "Status": new_status, "출고일": delivery_date,
-                        "송장번호": self.entry_invoice_no.get(), "운송방법": self.entry_shipping_method.get(),
-                        "운송장경로": final_waybill_path
-                    })
-                    dfs["data"] = pd.concat([dfs["data"], pd.DataFrame([new_row])], ignore_index=True)
-                
-                processed_items.append(f"{row_data.get('품목명','')} ({deliver_qty}개)")
-
-            if new_delivery_records:
-                dfs["delivery"] = pd.concat([dfs["delivery"], pd.DataFrame(new_delivery_records)], ignore_index=True)
-
-            log_msg = f"번호 [{self.mgmt_nos[0]}...] 납품 처리(출고번호: {self.current_delivery_no}) / {', '.join(processed_items)}"
-            new_log = self.dm._create_log_entry("납품 처리", log_msg)
-            dfs["log"] = pd.concat([dfs["log"], pd.DataFrame([new_log])], ignore_index=True)
+            # [NEW] 새 출고번호를 다른 사용자가 먼저 저장했으면 다음 번호로 확정
+            delivery_no = self.dm.claim_id(dfs, "delivery", requested_no) if is_new else requested_no
+            claimed.append(delivery_no)
+
+            # [수정] 전체 품목을 한 번에 처리 (Data/Delivery 시트 추가는 각각 한 번)
+            shipped = {
+                "출고일": delivery_date, "송장번호": invoice_no, "운송방법": shipping_method, "운송장경로": final_waybill_path
+            }
+            record = {
+                "일시": now_str, "출고번호": delivery_no,
+                "출고일": delivery_date, "송장번호": shipped["송장번호"], "운송방법": shipped["운송방법"],
+                "작업자": current_user, "비고": "일괄 납품 처리"
+            }
+            success, msg, delivered = self.dm.apply_deliveries(dfs, update_requests, shipped, record)
+            if not success: return False, msg
+            processed_items = [f"{item} ({qty}개)" for item, qty in zip(delivered["품목명"], delivered["출고수량"])]
+
+            log_msg = f"번호 [{self.mgmt_nos[0]}...] 납품 처리(출고번호: {delivery_no}) / {', '.join(processed_items)}"
+            self.dm.append_log(dfs, "납품 처리", log_msg)
             return True, ""
 
-        success, msg = self.dm._execute_transaction(update_logic)
+        # 저장 후 PL 발행 팝업은 기록이 확정된 출고번호로 띄움 (입력값은 팝업을 닫기 전에 읽어 둠)
+        open_pl, parent = self._packing_list_opener(), self.master
+
+        def on_saved():
+            if final_waybill_path: copy_attachments([(waybill_path, final_waybill_path)])
+            # 기록 시점에 다른 사용자가 같은 번호를 먼저 썼으면 다른 번호로 확정되었을 수 있음
+            rows = self.dm.get_rows("delivery", self.mgmt_nos)
+            committed = rows.loc[rows["일시"].astype(str) == now_str, "출고번호"]
+            delivery_no = str(committed.iloc[0]) if len(committed) else claimed[-1]
+            if delivery_no != str(claimed[0]):
+                messagebox.showinfo("출고번호 변경", f"다른 사용자가 먼저 저장하여 출고번호가 {delivery_no}(으)로 확정되었습니다.")
+            if open_pl: open_pl(parent, delivery_no)
+
+        # [수정] 화면에 바로 반영하고 기록은 백그라운드에서 (실패하면 되돌리고 알림)
+        success, msg = self.dm.save_async(
+            update_logic,
+            lambda msg: messagebox.showerror("저장 실패", f"납품 처리(출고번호: {claimed[0]}) 저장에 실패하여 되돌렸습니다.\n{msg}"),
+            on_saved)
         if success:
-            messagebox.showinfo("성공", "납품 처리가 완료되었습니다.\n(CI/PL 발행 가능)", parent=self)
+            self.current_delivery_no = claimed[0]
             self.refresh_callback()
-            self.export_pl() # 저장 후 바로 PL 발행 팝업 호출 (기존 로직 유지)
             self.destroy()
         else:
             messagebox.showerror("실패", f"저장에 실패했습니다: {msg}", parent=self)
@@ -211,8 +211,7 @@ class OrderPopup(BasePopup):
 
 
     def _load_data(self):
-        df = self.dm.df_data
-        rows = df[df["관리번호"] == self.mgmt_no]
+        rows = self.dm.get_rows("data", self.mgmt_no)
         if rows.empty: return
         
         first = rows.iloc[0]
@@ -256,8 +255,7 @@ class OrderPopup(BasePopup):
         for _, row in rows.iterrows(): self._add_item_row(row)
 
     def _load_copied_data(self):
-        df = self.dm.df_data
-        rows = df[df["관리번호"] == self.copy_src_no]
+        rows = self.dm.get_rows("data", self.copy_src_no)
         if rows.empty: return
         
         first = rows.iloc[0]
@@ -347,7 +345,17 @@ class OrderPopup(BasePopup):
             })
             new_rows.append(row_data)
 
+        claimed = {} # 새 번호: "shown" 저장 시 화면에 반영한 번호, "stored" 실제로 기록된 번호
+
         def update_logic(dfs):
+            nonlocal mgmt_no
+            if not self.mgmt_no:
+                # [NEW] 다른 사용자가 같은 번호를 먼저 저장했으면 다음 번호로 확정
+                mgmt_no = self.dm.claim_id(dfs, "data", mgmt_no)
+                for row in new_rows: row["관리번호"] = mgmt_no
+                if dfs.stored: claimed["stored"] = mgmt_no
+                else: claimed.setdefault("shown", mgmt_no)
+
             if self.mgmt_no:
                 mask = dfs["data"]["관리번호"] == self.mgmt_no
                 existing_rows = dfs["data"][mask]
@@ -372,15 +380,22 @@ class OrderPopup(BasePopup):
                 action = "수정" if self.mgmt_no else "등록"
                 log_msg = f"주문 {action}: 번호 [{mgmt_no}] / 업체 [{client}]"
                 
-            new_log = self.dm._create_log_entry(f"주문 {action}", log_msg)
-            dfs["log"] = pd.concat([dfs["log"], pd.DataFrame([new_log])], ignore_index=True)
+            self.dm.append_log(dfs, f"주문 {action}", log_msg)
             
             return True, ""
 
-        success, msg = self.dm._execute_transaction(update_logic)
+        def on_saved():
+            # 기록 시점에 다른 사용자가 같은 번호를 먼저 썼으면 다른 번호로 확정되었을 수 있음
+            if "stored" in claimed and claimed["stored"] != claimed.get("shown"):
+                messagebox.showinfo("관리번호 변경", f"다른 사용자가 먼저 저장하여 관리번호가 {claimed['stored']}(으)로 확정되었습니다.")
+
+        # [수정] 화면에 바로 반영하고 기록은 백그라운드에서 (실패하면 되돌리고 알림)
+        success, msg = self.dm.save_async(
+            update_logic,
+            lambda msg: messagebox.showerror("저장 실패", f"주문 [{mgmt_no}] 저장에 실패하여 되돌렸습니다.\n{msg}"),
+            on_saved)
         
         if success:
-            messagebox.showinfo("완료", "저장되었습니다.", parent=self)
             self.refresh_callback()
             self.destroy()
         else:
@@ -388,26 +403,13 @@ class OrderPopup(BasePopup):
 
 
     # BasePopup 추상 메서드 구현 (사용 안함)
-    def _generate_new_id(self): 
-        # BasePopup에서 호출하는 경우를 대비해 구현
-        today_str = datetime.now().strftime("%y%m%d")
-        prefix = f"O{today_str}"
-        
-        df = self.dm.df_data
-        existing_ids = df[df["관리번호"].str.startswith(prefix)]["관리번호"].unique()
-        
-        if len(existing_ids) == 0: seq = 1
-        else:
-            max_seq = 0
-            for eid in existing_ids:
-                try:
-                    parts = eid.split("-")
-                    if len(parts) > 1:
-                        seq_num = int(parts[-1])
-                        if seq_num > max_seq: max_seq = seq_num
-                except: pass
-            seq = max_seq + 1
-            
+    def _generate_new_id(self):
+        # BasePopup에서 호출 (접두어별 최대 순번 레지스트리에서 O(1) 조회)
+        new_id = self.dm.generate_mgmt_no("O")
+        self.entry_id.configure(state="normal")
+        self.entry_id.delete(0, "end")
+        self.entry_id.insert(0, new_id)
+        self.entry_id.configure(state="readonly")
 
 
 
@@ -418,8 +420,7 @@ class OrderPopup(BasePopup):
                 if mask.any():
                     dfs["data"] = dfs["data"][~mask]
                     log_msg = f"{self.popup_title} 삭제: 번호 [{self.mgmt_no}]"
-                    new_log = self.dm._create_log_entry("삭제", log_msg)
-                    dfs["log"] = pd.concat([dfs["log"], pd.DataFrame([new_log])], ignore_index=True)
+                    self.dm.append_log(dfs, "삭제", log_msg)
                     return True, ""
                 return False, "삭제할 데이터를 찾을 수 없습니다."
 
@@ -442,8 +443,8 @@ class OrderPopup(BasePopup):
             self.attributes("-topmost", True)
             return
 
-        client_row = self.dm.df_clients[self.dm.df_clients["업체명"] == client_name]
-        if client_row.empty:
+        client_row = self.dm.get_client(client_name)
+        if client_row is None:
             self.attributes("-topmost", False)
             messagebox.showerror("오류", "고객 정보를 찾을 수 없습니다.", parent=self)
             self.attributes("-topmost", True)
@@ -467,7 +468,7 @@ class OrderPopup(BasePopup):
             })
 
         success, result = self.export_manager.export_order_request_to_pdf(
-            client_row.iloc[0], order_info, items
+            client_row, order_info, items
         )
         
         self.attributes("-topmost", False)
@@ -485,8 +486,8 @@ class OrderPopup(BasePopup):
             self.attributes("-topmost", True)
             return
 
-        client_row = self.dm.df_clients[self.dm.df_clients["업체명"] == client_name]
-        if client_row.empty:
+        client_row = self.dm.get_client(client_name)
+        if client_row is None:
             self.attributes("-topmost", False)
             messagebox.showerror("오류", "고객 정보를 찾을 수 없습니다.", parent=self)
             self.attributes("-topmost", True)
@@ -511,7 +512,7 @@ class OrderPopup(BasePopup):
             })
 
         success, result = self.export_manager.export_pi_to_pdf(
-            client_row.iloc[0], order_info, items
+            client_row, order_info, items
         )
         
         self.attributes("-topmost", False)
@@ -16,6 +16,9 @@ class PackingListPopup(ctk.CTkToplevel):
         self.configure(fg_color=COLORS["bg_dark"])
         
         self.transient(parent)
+        # [수정] 닫을 때 부모의 항상 위 상태를 원래대로 (저장 후 메인 창 위에 띄운 경우 메인 창을 항상 위로 만들지 않음)
+        try: self.parent_topmost = bool(parent.attributes("-topmost"))
+        except Exception: self.parent_topmost = True
         self.attributes("-topmost", True)
         
         self.item_entries = []
@@ -215,7 +218,7 @@ class PackingListPopup(ctk.CTkToplevel):
     def on_close(self):
         if self.parent:
             try:
-                self.parent.attributes("-topmost", True)
+                self.parent.attributes("-topmost", self.parent_topmost)
                 self.parent.lift()
             except: pass
         self.destroy()
\ No newline at end of file
@@ -6,6 +6,8 @@ import customtkinter as ctk
 from config import Config
 from styles import COLORS, FONT_FAMILY, FONTS
 
+BACKEND_LABELS = {"excel": "Excel", "sqlite": "SQLite"}
+
 
 class SettingsPopup(ctk.CTkToplevel):
     def __init__(self, parent, data_manager, refresh_callback):
@@ -84,6 +86,21 @@ class SettingsPopup(ctk.CTkToplevel):
 
         ctk.CTkButton(path_frame, text="찾기", width=60, command=self.browse_excel, 
                       fg_color=COLORS["bg_medium"], text_color=COLORS["text"]).pack(side="right")
+
+        # [NEW] 데이터 저장 방식 (Excel 직접 / SQLite)
+        ctk.CTkLabel(parent, text="데이터 저장 방식", font=FONTS["header"]).pack(pady=(15, 5), anchor="w")
+
+        self.backend_var = ctk.StringVar(value=BACKEND_LABELS.get(self.dm.storage_backend, "Excel"))
+        ctk.CTkSegmentedButton(
+            parent,
+            values=list(BACKEND_LABELS.values()),
+            variable=self.backend_var,
+            font=(FONT_FAMILY, 12, "bold"),
+            selected_color=COLORS["primary"],
+            selected_hover_color=COLORS["primary_hover"]
+        ).pack(fill="x")
+        ctk.CTkLabel(parent, text="SQLite 선택 시 엑셀 파일과 같은 폴더의 .db 파일을 사용하며, 최초 로드 시 엑셀 데이터를 가져옵니다.",
+                     font=FONTS["small"], text_color=COLORS["text_dim"], wraplength=540, justify="left").pack(anchor="w", pady=(3, 0))
         
         # 3. 첨부 파일 저장 경로 설정 섹션
         ctk.CTkLabel(parent, text="첨부 파일 저장 폴더 (Root)", font=FONTS["header"]).pack(pady=(15, 5), anchor="w")
@@ -160,6 +177,21 @@ class SettingsPopup(ctk.CTkToplevel):
         ctk.CTkButton(self.dev_tools_frame, text="🧹 오래된 로그 정리", height=30,
                       fg_color=COLORS["warning"], hover_color="#D35400", command=self.do_clean_logs).pack(side="right", fill="x", expand=True, padx=(5, 0))
 
+        ctk.CTkButton(self.dev_tools_frame, text="📤 엑셀 내보내기", height=30,
+                      fg_color=COLORS["bg_medium"], text_color=COLORS["text"], command=self.do_export_excel).pack(side="right", fill="x", expand=True, padx=(5, 0))
+
+        # [NEW] 전체 입금 정합성 점검
+        ctk.CTkButton(self.dev_tools_frame, text="🧾 입금 정합성 점검", height=30,
+                      fg_color=COLORS["bg_medium"], text_color=COLORS["text"], command=self.do_reconcile_payments).pack(side="right", fill="x", expand=True, padx=(5, 0))
+
+        # [NEW] 지난 연도 종료 주문 보관
+        ctk.CTkButton(self.dev_tools_frame, text="📦 종료 주문 보관", height=30,
+                      fg_color=COLORS["bg_medium"], text_color=COLORS["text"], command=self.do_archive_orders).pack(side="right", fill="x", expand=True, padx=(5, 0))
+
+        # [NEW] 보관된 로그 검색
+        ctk.CTkButton(self.dev_tools_frame, text="🔎 보관 로그 검색", height=30,
+                      fg_color=COLORS["bg_medium"], text_color=COLORS["text"], command=self.do_search_archived_logs).pack(side="right", fill="x", expand=True, padx=(5, 0))
+
     def change_theme(self, new_theme):
         ctk.set_appearance_mode(new_theme)
 
@@ -225,9 +257,72 @@ class SettingsPopup(ctk.CTkToplevel):
 
     def do_clean_logs(self):
         self.attributes("-topmost", False)
-        if messagebox.askyesno("로그 정리", "오래된 로그 데이터를 정리하시겠습니까?", parent=self):
+        if messagebox.askyesno("로그 정리", f"{self.dm.log_retention_days}일보다 오래된 로그를 보관 파일로 옮기시겠습니까?\n"
+                                              "(보관된 로그는 저장소 옆 보관 폴더에 연도별로 저장되며 '보관 로그 검색'으로 찾을 수 있습니다)", parent=self):
             success, msg = self.dm.clean_old_logs()
-            messagebox.showinfo("완료", msg, parent=self)
+            if success:
+                messagebox.showinfo("완료", msg, parent=self)
+            else:
+                messagebox.showwarning("로그 정리", msg, parent=self)
+        self.attributes("-topmost", True)
+
+    # [NEW] 지난 연도 종료 주문 보관
+    def do_archive_orders(self):
+        self.attributes("-topmost", False)
+        statuses = "/".join(Config.ARCHIVE_CLOSED_STATUS)
+        if messagebox.askyesno("주문 보관", f"지난 연도에 {statuses} 처리된 주문을 보관 파일로 옮기시겠습니까?\n"
+                                             "(보관된 주문은 목록의 '보관 주문 포함'과 완료 주문 조회에서 볼 수 있습니다)", parent=self):
+            success, msg = self.dm.archive_closed_orders()
+            if success:
+                messagebox.showinfo("완료", msg, parent=self)
+                if self.refresh_callback: self.refresh_callback()
+            else:
+                messagebox.showwarning("주문 보관", msg, parent=self)
+        self.attributes("-topmost", True)
+
+    # [NEW] 보관된 로그 검색 (Log / Memo Log 보관 파일)
+    def do_search_archived_logs(self):
+        self.attributes("-topmost", False)
+        keyword = simpledialog.askstring("보관 로그 검색", "검색어를 입력하세요 (비우면 전체):", parent=self)
+        if keyword is not None:
+            logs = self.dm.search_archived_logs(keyword.strip())
+            memo_logs = self.dm.search_archived_logs(keyword.strip(), key="memo_log")
+            lines = [f"{r['일시']} [{r['구분']}] {r['상세내용']}" for _, r in logs.tail(15).iterrows()]
+            lines += [f"{r['일시']} [메모 {r['관리번호']}] {r['내용']}" for _, r in memo_logs.tail(5).iterrows()]
+            if lines:
+                summary = f"Log {len(logs):,}건 / Memo Log {len(memo_logs):,}건 (최근 항목만 표시)"
+                messagebox.showinfo("보관 로그 검색", summary + "\n\n" + "\n".join(lines), parent=self)
+            else:
+                messagebox.showinfo("보관 로그 검색", "검색 결과가 없습니다.", parent=self)
+        self.attributes("-topmost", True)
+
+    # [NEW] 입금 정합성 점검 및 보정
+    def do_reconcile_payments(self):
+        self.attributes("-topmost", False)
+        success, msg, report = self.dm.reconcile_payments()
+        if report.empty:
+            messagebox.showinfo("입금 정합성 점검", msg, parent=self)
+        else:
+            lines = [f"[{r['관리번호']}] {r['항목']}: {r['저장값']} → {r['계산값']}" for _, r in report.head(10).iterrows()]
+            if len(report) > 10: lines.append(f"... 외 {len(report) - 10}건")
+            if messagebox.askyesno("입금 정합성 점검", f"{msg}\n\n" + "\n".join(lines) + "\n\n계산값으로 보정하시겠습니까?", parent=self):
+                success, msg, _ = self.dm.reconcile_payments(apply=True)
+                if success:
+                    messagebox.showinfo("완료", msg, parent=self)
+                    if self.refresh_callback: self.refresh_callback()
+                else:
+                    messagebox.showerror("실패", msg, parent=self)
+        self.attributes("-topmost", True)
+
+    def do_export_excel(self):
+        self.attributes("-topmost", False)
+        file_path = filedialog.asksaveasfilename(parent=self, defaultextension=".xlsx", filetypes=[("Excel files", "*.xlsx")])
+        if file_path:
+            success, msg = self.dm.export_to_excel(file_path)
+            if success:
+                messagebox.showinfo("완료", msg, parent=self)
+            else:
+                messagebox.showerror("실패", msg, parent=self)
         self.attributes("-topmost", True)
 
     def save(self):
@@ -236,14 +331,30 @@ class SettingsPopup(ctk.CTkToplevel):
         new_attach = self.attach_path_entry.get()
         new_prod_path = self.prod_path_entry.get()
         new_order_req = self.order_req_path_entry.get() 
+        new_backend = next((k for k, v in BACKEND_LABELS.items() if v == self.backend_var.get()), None)
         
         if new_path:
+            if new_path != self.dm.current_excel_path: self.dm.save_config(new_path=new_path)
+            # [NEW] 저장소 형식 전환은 데이터 파일 옆 기록을 바꾸므로 모든 사용자에게 적용됨
+            if new_backend and new_backend != self.dm.storage_backend:
+                self.attributes("-topmost", False)
+                if not messagebox.askyesno("저장소 전환", f"저장소 형식을 {BACKEND_LABELS[new_backend]}(으)로 바꾸시겠습니까?\n"
+                                                          "다른 사용자도 설정을 같은 형식으로 바꿔야 데이터를 열 수 있습니다.", parent=self):
+                    self.attributes("-topmost", True)
+                    return
+                success, msg = self.dm.switch_backend(new_backend)
+                self.attributes("-topmost", True)
+                if not success:
+                    messagebox.showerror("저장소 전환 실패", msg, parent=self)
+                    return
+
             self.dm.save_config(
                 new_path=new_path, 
                 new_theme=new_theme, 
                 new_attachment_dir=new_attach,
                 new_prod_path=new_prod_path,
-                new_order_req_dir=new_order_req 
+                new_order_req_dir=new_order_req,
+                new_backend=new_backend
             )
             
             self.attributes("-topmost", False)
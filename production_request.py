@@ -0,0 +1,181 @@
+import os
+from datetime import datetime
+
+import openpyxl
+
+from storage import atomic_write, mgmt_index
+
+
+class ProductionRequestMixin:
+    """DataManager의 생산 요청 파일(생산 요청.xlsx) 연동 부분. production_request_path 속성과 get_client()를 사용합니다."""
+
+    def export_to_production_request(self, rows_data):
+        prod_path = self.production_request_path
+        if not os.path.exists(prod_path):
+            return False, f"생산 요청 파일을 찾을 수 없습니다.\n경로: {prod_path}"
+
+        try:
+            wb = openpyxl.load_workbook(prod_path)
+            if "Data" not in wb.sheetnames:
+                return False, "'Data' 시트가 존재하지 않습니다."
+            ws = wb["Data"]
+
+            added_count = 0
+            updated_count = 0
+
+            # [NEW] 기존 행 위치를 (관리번호, 모델명, Description) 키로 한 번만 모아 둠 (내보내는 행마다 시트 전체를 훑지 않음)
+            row_positions = {}
+            for i, row in enumerate(ws.iter_rows(min_row=2, max_col=4, values_only=True), start=2):
+                key = tuple(str(v) if v else "" for v in (row[0], row[2], row[3]))
+                row_positions.setdefault(key, i)
+
+            for row_data in rows_data:
+                client_name = row_data.get("업체명", "")
+                client_note = "-"
+                c_row = self.get_client(client_name, fuzzy=True)
+                if c_row is not None:
+                    val = c_row.get("특이사항", "-")
+                    if str(val) != "nan" and val: client_note = str(val)
+
+                mgmt_no = str(row_data.get("관리번호", ""))
+                model_name = str(row_data.get("모델명", ""))
+                desc = str(row_data.get("Description", ""))
+                order_date = row_data.get("수주일", "-")
+                if not order_date or order_date == "nan": order_date = "-"
+
+                mapping_values = [
+                    mgmt_no,                    # A
+                    client_name,                # B
+                    model_name,                 # C
+                    desc,                       # D
+                    row_data.get("수량", 0),    # E
+                    row_data.get("주문요청사항", "-"), # F
+                    client_note,                # G (Customer DB)
+                    order_date,                 # H
+                    "-",                        # I
+                    "-",                        # J
+                    "-",                        # K
+                    "-",                        # L
+                    "-",                        # M
+                    "생산 접수",                # N (Default)
+                    "-",                        # O (Default)
+                    "-"                         # P (Default)
+                ]
+
+                target_row_idx = row_positions.get((mgmt_no, model_name, desc))
+                if target_row_idx:
+                    for col_idx, val in enumerate(mapping_values, start=1):
+                        ws.cell(row=target_row_idx, column=col_idx, value=val)
+                    updated_count += 1
+                else:
+                    ws.append(mapping_values)
+                    row_positions.setdefault((mgmt_no, model_name, desc), ws.max_row)
+                    added_count += 1
+
+            with atomic_write(prod_path) as f:
+                wb.save(f)
+            wb.close()
+            return True, f"신규: {added_count}건, 업데이트: {updated_count}건"
+
+        except PermissionError:
+            return False, "생산 요청 파일이 열려있습니다. 파일을 닫고 다시 시도해주세요."
+        except Exception as e:
+            return False, f"생산 요청 내보내기 실패: {e}"
+
+    def sync_production_dates(self):
+        if not os.path.exists(self.production_request_path):
+            return
+
+        try:
+            wb = openpyxl.load_workbook(self.production_request_path, data_only=True)
+            if "Data" not in wb.sheetnames: return
+            ws = wb["Data"]
+            
+            date_map = {}
+            for row in ws.iter_rows(min_row=2, values_only=True):
+                mgmt_no = str(row[0]) if row[0] else None
+                delivery_date = row[8]
+                
+                if mgmt_no and delivery_date:
+                    if isinstance(delivery_date, datetime):
+                        date_str = delivery_date.strftime("%Y-%m-%d")
+                    else:
+                        date_str = str(delivery_date).strip()
+                        if date_str.lower() == "nan" or date_str == "-" or not date_str:
+                            continue
+                            
+                    date_map[mgmt_no] = date_str
+            
+            wb.close()
+            
+            if not self.df_data.empty and date_map:
+                # [수정] 확정본(작업 스레드가 읽음)과 공유하는 객체이므로 사본을 고쳐 교체 (관리번호 인덱스 캐시도 새 객체 기준)
+                positions = mgmt_index.positions(self.df_data, list(date_map))
+                df_data = self.df_data.copy()
+                if '출고예정일' not in df_data.columns:
+                    df_data['출고예정일'] = "-"
+                if len(positions):
+                    new_dates = df_data["관리번호"].iloc[positions].astype(str).map(date_map).to_numpy()
+                    df_data.iloc[positions, df_data.columns.get_loc('출고예정일')] = new_dates
+                self.df_data = df_data
+                self.data_version += 1
+                        
+        except Exception as e:
+            print(f"생산 요청일 동기화 실패: {e}")
+
+    def get_production_status_map(self):
+        if not os.path.exists(self.production_request_path):
+            return {}
+
+        try:
+            wb = openpyxl.load_workbook(self.production_request_path, data_only=True, read_only=True)
+            if "Data" not in wb.sheetnames:
+                return {}
+            
+            ws = wb["Data"]
+            status_map = {}
+            
+            for row in ws.iter_rows(min_row=2, values_only=True):
+                if not row or len(row) < 14: continue
+                
+                mgmt_no = str(row[0]).strip() if row[0] else None
+                prod_status = str(row[13]).strip() if row[13] else "-"
+                
+                if mgmt_no:
+                    status_map[mgmt_no] = prod_status
+            
+            wb.close()
+            return status_map
+        except Exception as e:
+            print(f"생산 상태 로드 실패: {e}")
+            return {}
+
+    def get_serial_number_map(self):
+        if not os.path.exists(self.production_request_path):
+            return {}
+
+        try:
+            wb = openpyxl.load_workbook(self.production_request_path, data_only=True, read_only=True)
+            if "Data" not in wb.sheetnames:
+                return {}
+            
+            ws = wb["Data"]
+            serial_map = {}
+            
+            for row in ws.iter_rows(min_row=2, values_only=True):
+                if not row or len(row) < 11: continue
+                
+                mgmt_no = str(row[0]).strip() if row[0] else ""
+                model = str(row[2]).strip() if row[2] else ""
+                desc = str(row[3]).strip() if row[3] else ""
+                serial = str(row[10]).strip() if row[10] else "-"
+                
+                key = (mgmt_no, model, desc)
+                if mgmt_no: 
+                    serial_map[key] = serial
+            
+            wb.close()
+            return serial_map
+        except Exception as e:
+            print(f"시리얼 번호 로드 실패: {e}")
+            return {}
@@ -0,0 +1,24 @@
+from .archive import LOG_ARCHIVE_SHEETS, SheetArchive, closed_order_years, split_by_age
+from .archive_jobs import ArchiveMixin
+from .atomic import atomic_write
+from .backend_marker import claim_backend_marker, read_backend_marker, write_backend_marker
+from .cache import FrameCache
+from .base import StorageBackend, empty_frames, normalize_frames
+from .change_detector import signature_changed
+from .excel_backend import ExcelBackend
+from .key_index import KeyIndex, find_client, mgmt_index, normalize_name
+from .lock import ConflictError, FileLease, LockTimeout, backoff
+from .log_buffer import TransactionFrames, append_rows, flush_logs
+from .preprocess import preprocess_frames, typed_data_frame
+from .sqlite_backend import SQLiteBackend
+from .transactions import MAX_TRANSACTION_RETRIES, TransactionMixin
+from .write_queue import WriteQueue
+
+BACKENDS = {
+    ExcelBackend.name: ExcelBackend,
+    SQLiteBackend.name: SQLiteBackend,
+}
+
+
+def create_backend(name, path):
+    return BACKENDS.get(name, ExcelBackend)(path)
@@ -0,0 +1,233 @@
+import gzip
+import json
+import os
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from storage.atomic import atomic_write
+from storage.lock import FileLease
+from storage.preprocess import parse_dates
+
+ARCHIVE_DIR_SUFFIX = "_archive"  # 워크북 옆 '<파일명>_archive' 폴더
+INDEX_FILENAME = "index.json"
+ARCHIVE_FILE_PREFIX = {"log": "Log", "memo_log": "MemoLog", "data": "Data"}  # 시트 키 -> 보관 파일 접두어
+LOG_ARCHIVE_SHEETS = ["log", "memo_log"]
+ORDER_DATE_COLUMNS = ["견적일", "수주일", "출고일", "입금완료일"]  # 주문 보관 연도 = 이 날짜들 중 가장 늦은 날짜의 연도
+ARCHIVE_ROW_KEYS = {"data": "관리번호"}  # 같은 키의 행은 보관소에 한 벌만 (다시 보관하면 새 행으로 교체)
+STAGE_SUFFIX = ".staged"
+STALE_STAGE_SECONDS = 24 * 3600  # 커밋 기록이 없는 임시 파일을 버리기까지의 시간 (진행 중인 다른 사용자의 묶음 보호)
+
+
+def split_by_age(df, cutoff):
+    """일시가 cutoff 이전인 행과 나머지 행으로 나눕니다. 일시를 해석할 수 없는 행은 남김. 반환: (보관할 행, 남길 행)"""
+    old = (parse_dates(df["일시"]) < cutoff).to_numpy()
+    return df[old], df[~old]
+
+
+def closed_order_years(df, statuses, before_year):
+    """
+    [NEW] Data 시트 행별 보관 연도 (보관 대상이 아니면 NaN)
+    관리번호의 모든 행이 statuses 상태이고, 그 주문의 가장 늦은 날짜가 before_year 이전 연도인 행만 대상입니다.
+    """
+    keys = df["관리번호"].astype(str).to_numpy()
+    closed = df["Status"].astype(str).isin(statuses).groupby(keys).transform("all")
+    dates = pd.concat([parse_dates(df[col]) for col in ORDER_DATE_COLUMNS if col in df.columns], axis=1).max(axis=1)
+    years = dates.groupby(keys).transform("max").dt.year
+    return years.where(closed & (years < before_year))
+
+
+def _records(df):
+    # JSON으로 기록할 수 있는 값으로 정규화 (Timestamp 등 -> 문자열)
+    rows = df.astype(object).where(df.notna(), None).to_dict("records")
+    return json.loads(json.dumps(rows, ensure_ascii=False, default=str))
+
+
+def _read_rows(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _write_rows(path, rows):
+    with atomic_write(path) as f, gzip.GzipFile(fileobj=f, mode="wb") as gz:
+        for r in rows:
+            gz.write((json.dumps(r, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+class SheetArchive:
+    """
+    시트 보관소 (Log / Memo Log의 오래된 항목, Data의 지난 연도 종료 주문).
+    워크북 옆 '<파일명>_archive' 폴더에 시트별/연도별 압축 JSONL 파일('Log_2024.jsonl.gz')과
+    색인(index.json: 파일별 행 수, 크기, 첫/마지막 일시 또는 관리번호 목록)을 둡니다.
+    읽기/검색은 색인으로 필요한 연도 파일만 엽니다.
+    """
+
+    def __init__(self, workbook_path):
+        self.dir = os.path.splitext(workbook_path)[0] + ARCHIVE_DIR_SUFFIX
+        self.index_path = os.path.join(self.dir, INDEX_FILENAME)
+
+    def _path(self, key, year):
+        return os.path.join(self.dir, f"{ARCHIVE_FILE_PREFIX[key]}_{year}.jsonl.gz")
+
+    def read_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def read_year(self, key, year):
+        try: return _read_rows(self._path(key, year))
+        except OSError: return []
+
+    def read_frame(self, key, year):
+        """연도 파일을 시트 컬럼 순서의 DataFrame으로 읽습니다. (전처리 전)"""
+        return pd.DataFrame(self.read_year(key, year), columns=Config.SHEET_SCHEMAS[key][1])
+
+    def years(self, key, mgmt_nos=None):
+        """보관된 연도 목록. mgmt_nos를 주면 그 관리번호가 들어 있는 연도만 (Data 색인의 관리번호 목록 사용)"""
+        entries = self.read_index().get(key, {})
+        if mgmt_nos is None: return sorted(int(y) for y in entries)
+        wanted = {str(m) for m in ([mgmt_nos] if isinstance(mgmt_nos, str) else mgmt_nos)}
+        return sorted(int(y) for y, entry in entries.items() if wanted & set(entry.get("keys", [])))
+
+    def batch(self):
+        """[NEW] 한 트랜잭션에서 보관할 행 묶음을 만듭니다. (ArchiveBatch 참고)"""
+        return ArchiveBatch(self)
+
+    def pending_batches(self):
+        """[NEW] 게시되지 않고 남은 임시 파일들을 묶음 id별 ArchiveBatch로 모읍니다. 반환: {묶음 id: ArchiveBatch}"""
+        try: names = os.listdir(self.dir)
+        except OSError: return {}
+        prefixes = {prefix: key for key, prefix in ARCHIVE_FILE_PREFIX.items()}
+        batches = {}
+        for name in sorted(names):
+            if not name.endswith(STAGE_SUFFIX): continue
+            base, _, batch_id = name[:-len(STAGE_SUFFIX)].rpartition(".")
+            prefix, _, year = base.replace(".jsonl.gz", "").rpartition("_")
+            if prefix not in prefixes or not year.isdigit(): continue
+            batch = batches.setdefault(batch_id, ArchiveBatch(self, batch_id))
+            batch.staged.append((prefixes[prefix], int(year), os.path.join(self.dir, name)))
+        return batches
+
+    def _write_year(self, index, key, year, rows, batches):
+        path = self._path(key, year)
+        if rows and "일시" in rows[0]: rows.sort(key=lambda r: str(r.get("일시") or ""))
+        _write_rows(path, rows)
+        entry = {"file": os.path.basename(path), "rows": len(rows), "bytes": os.path.getsize(path), "batches": batches}
+        if rows and "일시" in rows[0]: entry.update(first=rows[0].get("일시"), last=rows[-1].get("일시"))
+        if rows and "관리번호" in rows[0]: entry["keys"] = sorted({str(r.get("관리번호")) for r in rows})
+        index.setdefault(key, {})[str(year)] = entry
+
+    def _remove_year(self, index, key, year):
+        try: os.remove(self._path(key, year))
+        except OSError: pass
+        index.get(key, {}).pop(str(year), None)
+
+    def search(self, key, keyword="", start=None, end=None):
+        """
+        보관된 행 중 일시가 [start, end] 범위('YYYY-MM-DD' 문자열, 생략 가능)이고 keyword가 포함된 행을 찾습니다.
+        반환: DataFrame (시트 컬럼 순서)
+        """
+        columns = Config.SHEET_SCHEMAS[key][1]
+        found = []
+        for year, entry in sorted(self.read_index().get(key, {}).items()):
+            if start and str(entry.get("last") or "") < start: continue
+            if end and str(entry.get("first") or "")[:len(end)] > end: continue
+            for r in self.read_year(key, year):
+                ts = str(r.get("일시") or "")
+                if start and ts < start: continue
+                if end and ts[:len(end)] > end: continue
+                if keyword and not any(keyword.lower() in str(v).lower() for v in r.values() if v is not None): continue
+                found.append(r)
+        return pd.DataFrame(found, columns=columns)
+
+    def total_bytes(self):
+        return sum(entry.get("bytes", 0) for years in self.read_index().values() for entry in years.values())
+
+
+class ArchiveBatch:
+    """
+    [NEW] 한 트랜잭션에서 보관할 행 묶음.
+    트랜잭션 중에는 stage()로 새 행만 임시 파일('<연도 파일>.<묶음 id>.staged')에 기록하고 보관 파일/색인은 건드리지 않습니다.
+    워크북 커밋이 끝난 뒤 publish()로 연도 파일에 합치고 색인을 갱신하며, 커밋하지 못했으면 discard()로 임시 파일을 지웁니다.
+    게시한 묶음 id는 색인에 남아 같은 묶음을 두 번 합치지 않고, ARCHIVE_ROW_KEYS의 키(관리번호)가 같은 행은 새 행으로 교체합니다.
+    커밋과 게시 사이에 중단되면 임시 파일이 남으므로, 같은 트랜잭션의 Log 항목에 tag를 남겨 두고
+    다음에 보관소를 열 때 커밋된 묶음인지 확인해 게시합니다. (ArchiveMixin.recover_archive)
+    """
+
+    def __init__(self, archive, batch_id=None):
+        self.archive = archive
+        self.id = batch_id or uuid.uuid4().hex
+        self.staged = []  # [(시트 키, 연도, 임시 파일 경로)]
+
+    @property
+    def tag(self):
+        """커밋 여부를 확인할 수 있도록 같은 트랜잭션의 Log 상세내용에 붙이는 표시"""
+        return f"[보관 {self.id}]"
+
+    def age(self):
+        """가장 최근에 기록한 임시 파일 이후 지난 시간(초)"""
+        mtimes = [os.path.getmtime(path) for _, _, path in self.staged if os.path.exists(path)]
+        return time.time() - max(mtimes) if mtimes else 0
+
+    def stage(self, key, df, years=None):
+        """df 행들을 연도별 임시 파일에 기록합니다. years(행별 연도)를 생략하면 일시 컬럼의 연도를 씁니다. 반환: 행 수"""
+        if df.empty: return 0
+        if years is None: years = parse_dates(df["일시"]).dt.year
+        years = np.asarray(years, dtype=np.float64)
+        if np.isnan(years).any():
+            raise ValueError(f"{ARCHIVE_FILE_PREFIX[key]} 보관 연도를 알 수 없는 행이 있습니다.")
+        os.makedirs(self.archive.dir, exist_ok=True)
+        for year in sorted({int(y) for y in years}):
+            path = f"{self.archive._path(key, year)}.{self.id}{STAGE_SUFFIX}"
+            _write_rows(path, _records(df[years == year]))
+            self.staged.append((key, year, path))
+        return len(df)
+
+    def discard(self):
+        """기록해 둔 임시 파일을 지웁니다. (커밋 실패, 트랜잭션 재시도 전)"""
+        for _, _, path in self.staged:
+            try: os.remove(path)
+            except OSError: pass
+        self.staged = []
+
+    def publish(self):
+        """
+        커밋이 끝난 뒤 임시 파일을 연도 파일에 합치고(os.replace) 색인을 갱신합니다.
+        여러 사용자가 동시에 게시하지 않도록 색인 잠금을 잡습니다. 반환: 새로 보관한 행 수
+        """
+        if not self.staged: return 0
+        added = 0
+        with FileLease(self.archive.index_path):
+            index = self.archive.read_index()
+            for key in dict.fromkeys(k for k, _, _ in self.staged):
+                added += self._merge(index, key)
+            with atomic_write(self.archive.index_path) as f:
+                f.write(json.dumps(index, ensure_ascii=False, indent=2).encode("utf-8"))
+        self.discard()
+        return added
+
+    def _merge(self, index, key):
+        entries = index.get(key, {})
+        new_by_year = {}
+        for k, year, path in self.staged:
+            if k != key or self.id in entries.get(str(year), {}).get("batches", []): continue
+            new_by_year.setdefault(year, []).extend(_read_rows(path))
+        if not new_by_year: return 0
+
+        row_key = ARCHIVE_ROW_KEYS.get(key)
+        replaced = {str(r.get(row_key)) for rows in new_by_year.values() for r in rows} if row_key else set()
+        # 새로 보관하는 키가 들어 있던 다른 연도 파일에서도 그 행을 빼서 한 벌만 남김
+        years = set(new_by_year) | {int(y) for y, e in entries.items() if replaced & set(e.get("keys", []))}
+        for year in sorted(years):
+            rows = self.archive.read_year(key, year)
+            if replaced: rows = [r for r in rows if str(r.get(row_key)) not in replaced]
+            batches = entries.get(str(year), {}).get("batches", [])
+            if year in new_by_year: rows, batches = rows + new_by_year[year], batches + [self.id]
+            if rows: self.archive._write_year(index, key, year, rows, batches)
+            else: self.archive._remove_year(index, key, year)
+        return sum(len(rows) for rows in new_by_year.values())
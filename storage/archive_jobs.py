@@ -0,0 +1,170 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from config import Config
+from storage.archive import LOG_ARCHIVE_SHEETS, STALE_STAGE_SECONDS, SheetArchive, closed_order_years, split_by_age
+from storage.preprocess import preprocess_frames
+
+
+class ArchiveMixin:
+    """
+    DataManager의 보관 작업 부분 (오래된 로그, 지난 연도 종료 주문).
+    보관할 행은 트랜잭션 안에서 임시 파일에만 기록하고, 커밋이 성공한 뒤에 보관소에 게시합니다.
+    """
+
+    # [NEW] 로그 보관 (Log / Memo Log 시트의 오래된 항목을 연도별 보관 파일로 이동)
+    def clean_old_logs(self, days=None):
+        """
+        보관 기간(days, 기본 log_retention_days일)보다 오래된 Log / Memo Log 항목을 저장소 옆 보관 폴더의
+        연도별 압축 파일로 옮기고 시트에서 지웁니다. 보관된 항목은 search_archived_logs()로 찾을 수 있습니다.
+        반환: (success, msg) - msg에 이동 건수와 파일 크기/로그 시트 읽기 시간 변화를 담음
+        """
+        days = days or self.log_retention_days
+        cutoff = datetime.now() - timedelta(days=days)
+        keys = LOG_ARCHIVE_SHEETS
+        size_before, read_before = self._storage_size(), self._time_read(keys)
+
+        moved = {}
+        def summary(): return ", ".join(f"{Config.SHEET_SCHEMAS[k][0]} {n:,}건" for k, n in moved.items())
+
+        def update_logic(dfs, batch):
+            moved.clear()
+            for key in keys:
+                old, keep = split_by_age(dfs[key], cutoff)
+                if old.empty: continue
+                batch.stage(key, old)
+                dfs[key] = keep.reset_index(drop=True)
+                moved[key] = len(old)
+            if not moved: return False, f"{days}일보다 오래된 로그가 없습니다."
+            self.append_log(dfs, "로그 정리", f"{cutoff:%Y-%m-%d} 이전 항목 보관: {summary()} {batch.tag}")
+            return True, "", list(moved)
+
+        success, msg = self._execute_archiving(update_logic)
+        if not success: return False, msg
+
+        size_after, read_after = self._storage_size(), self._time_read(keys)
+        return True, (f"{cutoff:%Y-%m-%d} 이전 로그를 보관했습니다. ({summary()})\n"
+                      f"파일 크기: {size_before / 1048576:.1f}MB → {size_after / 1048576:.1f}MB "
+                      f"(보관 파일 {SheetArchive(self.storage.path).total_bytes() / 1048576:.1f}MB)\n"
+                      f"로그 시트 읽기: {read_before:.2f}초 → {read_after:.2f}초")
+
+    def _execute_archiving(self, update_logic_func):
+        """
+        [NEW] 시트 행을 보관소로 옮기는 트랜잭션. update_logic_func(dfs, batch)는 옮길 행을 batch.stage()로 임시 파일에만 기록하고
+        batch.tag를 Log 항목에 남기며, 워크북 커밋이 성공한 뒤에만 보관 파일/색인에 게시합니다. (재시도 전/실패 시 임시 파일 삭제)
+        """
+        self.recover_archive()
+        batch = SheetArchive(self.storage.path).batch()
+
+        def update_logic(dfs):
+            batch.discard() # 충돌로 다시 실행되면 이전 시도의 임시 파일은 버림
+            return update_logic_func(dfs, batch)
+
+        try:
+            success, msg = self._execute_transaction(update_logic)
+        except Exception:
+            batch.discard()
+            raise
+        if not success:
+            batch.discard()
+            return False, msg
+        try:
+            batch.publish()
+        except Exception as e:
+            return False, (f"시트에서는 옮겼으나 보관 파일 기록에 실패했습니다. 임시 파일이 {batch.archive.dir}에 남아 있으며 "
+                           f"다음에 보관소를 열 때 다시 게시합니다.\n{e}")
+        return True, msg
+
+    def recover_archive(self):
+        """
+        [NEW] 커밋과 게시 사이에 중단되어 남은 보관 임시 파일(.staged)을 정리합니다.
+        저장소 Log에 묶음 표시(batch.tag)가 있으면 커밋된 묶음이므로 게시하고(이미 게시된 묶음은 색인의 묶음 id로 건너뜀),
+        표시 없이 STALE_STAGE_SECONDS보다 오래된 묶음은 커밋되지 않은 것으로 보고 지웁니다. 반환: 게시한 행 수
+        """
+        pending = SheetArchive(self.storage.path).pending_batches()
+        if not pending: return 0
+        details = self.storage.read_frames(["log"])["log"]["상세내용"].astype(str)
+        recovered = 0
+        for batch in pending.values():
+            if details.str.contains(batch.tag, regex=False).any(): recovered += batch.publish()
+            elif batch.age() > STALE_STAGE_SECONDS: batch.discard()
+        return recovered
+
+    def open_archive(self):
+        """[NEW] 남은 임시 파일을 먼저 정리한 뒤 현재 저장소의 보관소를 엽니다. (정리에 실패해도 게시된 항목은 읽을 수 있음)"""
+        try: self.recover_archive()
+        except Exception: pass
+        return SheetArchive(self.storage.path)
+
+    def search_archived_logs(self, keyword="", start=None, end=None, key="log"):
+        """보관된 로그(key: "log" / "memo_log")를 기간('YYYY-MM-DD')과 검색어로 찾습니다. 반환: DataFrame"""
+        return self.open_archive().search(key, keyword, start, end)
+
+    # ==========================================================================
+    # [NEW] 주문 보관 (Data 시트 hot/cold 분리)
+    # ==========================================================================
+    def archive_closed_orders(self):
+        """
+        지난 연도에 끝난(Config.ARCHIVE_CLOSED_STATUS) 주문을 저장소 옆 보관 폴더의 연도별 파일로 옮기고 Data 시트에서 지웁니다.
+        관리번호의 모든 행이 종료 상태일 때만 옮기며, 연도는 그 주문의 가장 늦은 날짜 기준입니다.
+        보관된 주문은 archived_data() / get_rows(include_archive=True)로 필요할 때만 읽습니다.
+        반환: (success, msg) - msg에 연도별 건수와 파일 크기/Data 시트 읽기 시간 변화를 담음
+        """
+        this_year = datetime.now().year
+        size_before, read_before = self._storage_size(), self._time_read(["data"])
+
+        moved = {}
+        def summary(): return ", ".join(f"{year}년 {n:,}건" for year, n in sorted(moved.items()))
+
+        def update_logic(dfs, batch):
+            moved.clear()
+            years = closed_order_years(dfs["data"], Config.ARCHIVE_CLOSED_STATUS, this_year)
+            target = years.notna().to_numpy()
+            if not target.any(): return False, "보관할 지난 연도 종료 주문이 없습니다."
+            batch.stage("data", dfs["data"][target], years[target])
+            mgmt_nos = dfs["data"].loc[target, "관리번호"].astype(str)
+            moved.update(mgmt_nos.groupby(years[target].astype(int).to_numpy()).nunique().to_dict())
+            dfs["data"] = dfs["data"][~target].reset_index(drop=True)
+            self.append_log(dfs, "주문 보관", f"{this_year}년 이전 종료 주문 보관: {summary()} {batch.tag}")
+            return True, "", ["data"]
+
+        success, msg = self._execute_archiving(update_logic)
+        if not success: return False, msg
+
+        size_after, read_after = self._storage_size(), self._time_read(["data"])
+        return True, (f"지난 연도 종료 주문을 보관했습니다. ({summary()})\n"
+                      f"파일 크기: {size_before / 1048576:.1f}MB → {size_after / 1048576:.1f}MB\n"
+                      f"Data 시트 읽기: {read_before:.2f}초 → {read_after:.2f}초")
+
+    def archived_data(self, years=None):
+        """
+        보관된 주문(years: 연도 목록, 생략 시 전체)을 읽어 전처리한 DataFrame을 반환합니다. (Data 시트와 같은 컬럼)
+        연도 파일은 처음 요청될 때만 읽고, 색인의 파일 크기가 바뀔 때까지 메모리에 두고 재사용합니다.
+        """
+        archive = self.open_archive()
+        index = archive.read_index().get("data", {})
+        frames = []
+        for year in (archive.years("data") if years is None else years):
+            entry = index.get(str(year))
+            if entry is None: continue
+            key = (self.storage.path, int(year))
+            cached = self._archived_data.get(key)
+            if cached is None or cached[0] != entry.get("bytes"):
+                cached = (entry.get("bytes"), preprocess_frames({"data": archive.read_frame("data", year)})["data"])
+                self._archived_data[key] = cached
+            frames.append(cached[1])
+        if not frames: return pd.DataFrame(columns=Config.DATA_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def _storage_size(self):
+        try: return os.path.getsize(self.storage.path)
+        except OSError: return 0
+
+    def _time_read(self, keys):
+        start = time.perf_counter()
+        try: self.storage.read_frames(keys)
+        except Exception: pass
+        return time.perf_counter() - start
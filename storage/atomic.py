@@ -0,0 +1,44 @@
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+
+REPLACE_RETRIES = 10   # Windows에서 다른 프로세스가 대상 파일을 잠깐 열고 있으면 교체가 거부되므로 재시도
+REPLACE_DELAY = 0.1
+
+
+def replace_file(src, dst):
+    """os.replace (같은 폴더 안에서 원자적). 대상이 잠시 열려 있어 PermissionError가 나면 짧게 재시도합니다."""
+    for attempt in range(REPLACE_RETRIES):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if attempt == REPLACE_RETRIES - 1: raise
+            time.sleep(REPLACE_DELAY)
+
+
+@contextmanager
+def atomic_write(path):
+    """
+    같은 폴더의 임시 파일에 쓴 뒤 원본과 원자적으로 교체하는 바이너리 파일 객체를 제공합니다.
+    다른 사용자는 항상 이전 파일이나 완성된 새 파일 중 하나만 보게 되며, 쓰다 실패하면 원본은 그대로 남습니다.
+
+        with atomic_write(path) as f:
+            f.write(content)
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    tmp = os.path.join(folder, f".~{os.path.basename(path)}.{uuid.uuid4().hex[:8]}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path): shutil.copymode(path, tmp)  # 기존 파일의 권한 유지
+        replace_file(tmp, path)
+    except BaseException:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
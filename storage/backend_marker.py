@@ -0,0 +1,49 @@
+import getpass
+import json
+import os
+from datetime import datetime
+
+from storage.atomic import atomic_write
+
+MARKER_SUFFIX = ".backend.json"  # 워크북 옆 '<파일명>.backend.json'
+
+
+def marker_path(workbook_path):
+    return os.path.splitext(workbook_path)[0] + MARKER_SUFFIX
+
+
+def read_backend_marker(workbook_path):
+    """데이터 파일 옆에 기록된 저장소 백엔드 이름. 기록이 없으면 None"""
+    try:
+        with open(marker_path(workbook_path), "r", encoding="utf-8") as f:
+            return json.load(f).get("backend")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _marker_bytes(name):
+    try: user = getpass.getuser()
+    except Exception: user = "Unknown"
+    info = {"backend": name, "changed_by": user, "changed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+    return json.dumps(info, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def claim_backend_marker(workbook_path, name):
+    """
+    [NEW] 기록이 없으면 name을 이 데이터의 백엔드로 기록합니다. (O_EXCL로 만들어 동시에 처음 연 사용자 중 한 명만 기록)
+    반환: 기록된 백엔드 이름 (이미 있으면 기존 값)
+    """
+    path = marker_path(workbook_path)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+    except FileExistsError:
+        return read_backend_marker(workbook_path) or name
+    with os.fdopen(fd, "wb") as f:
+        f.write(_marker_bytes(name))
+    return name
+
+
+def write_backend_marker(workbook_path, name):
+    """백엔드 전환 시 기록을 바꿉니다. (다른 사용자는 설정을 같은 백엔드로 바꿀 때까지 열지 못함)"""
+    with atomic_write(marker_path(workbook_path)) as f:
+        f.write(_marker_bytes(name))
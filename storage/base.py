@@ -0,0 +1,108 @@
+import os
+import shutil
+
+import pandas as pd
+
+from config import Config
+from storage.change_detector import file_signature
+
+
+def empty_frames():
+    """모든 시트에 대해 스키마 컬럼만 있는 빈 DataFrame 딕셔너리를 만듭니다."""
+    return {key: pd.DataFrame(columns=cols) for key, (_, cols) in Config.SHEET_SCHEMAS.items()}
+
+
+def normalize_frames(frames, keys=None):
+    """
+    트랜잭션/로드 공통 컬럼 보정 (헤더 공백 제거, 누락 컬럼 추가, 결측치 '-' 처리)
+    keys를 주면 해당 시트만 보정합니다. (일부 시트만 다시 읽은 경우)
+    """
+    if keys is None: keys = Config.SHEET_SCHEMAS.keys()
+    for key in keys:
+        df = frames.get(key)
+        if df is None:
+            frames[key] = pd.DataFrame(columns=Config.SHEET_SCHEMAS[key][1])
+            continue
+        df.columns = df.columns.astype(str).str.strip()
+
+    if "data" in keys:
+        for col in Config.DATA_COLUMNS:
+            if col not in frames["data"].columns: frames["data"][col] = "-"
+        frames["data"] = frames["data"].fillna("-")
+    if "clients" in keys:
+        frames["clients"] = frames["clients"].fillna("-")
+
+    # [수정] Delivery 시트 컬럼 보정 (출고번호 추가 대응)
+    if "delivery" in keys:
+        for col in Config.DELIVERY_COLUMNS:
+            if col not in frames["delivery"].columns: frames["delivery"][col] = "-"
+        frames["delivery"] = frames["delivery"].fillna("-")
+    return frames
+
+
+class StorageBackend:
+    """
+    DataManager가 사용하는 저장소 인터페이스.
+    시트 키("clients", "data", ...)와 DataFrame의 딕셔너리 단위로 읽고 씁니다.
+
+    트랜잭션은 begin() -> (frames, token) / commit(frames, token, dirty) / rollback(token) 순서로 사용합니다.
+    token은 백엔드 전용 상태(원본 행 해시, DB 연결 등)이며 호출자는 내용을 알 필요가 없습니다.
+    dirty는 변경된 시트 키 집합이며, None이면 백엔드가 원본과 비교하여 직접 계산합니다.
+    begin() 이후 다른 사용자가 먼저 커밋했다면 commit()은 lock.ConflictError를 던지며, 호출자가 다시 시작합니다.
+    """
+    name = "base"
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def get_signature(self):
+        """
+        변경 감지용 서명 {size, mtime, digest}. 백엔드는 파일 일부만 읽는 digest를 제공합니다.
+        비교는 change_detector.signature_changed()로 합니다.
+        """
+        return file_signature(self.path)
+
+    def read_frames(self, keys=None):
+        """
+        시트들을 읽어 normalize_frames()로 보정된 딕셔너리를 반환합니다.
+        keys를 주면 해당 시트만 읽어 그 키만 담아 반환합니다.
+        """
+        raise NotImplementedError("Subclasses must implement read_frames")
+
+    def changed_sheets(self, old_signature, new_signature):
+        """두 서명 사이에 내용이 바뀐 시트 키 집합. 시트 단위로 판단할 수 없으면 None (전체 재로드)."""
+        return None
+
+    def replay_journal(self, base_signature, base_frames, target_signature):
+        """저널로 base 상태의 시트에 변경을 이어 적용할 수 있으면 {시트 키: DataFrame}, 아니면 None (시트를 다시 읽음)"""
+        return None
+
+    def recover(self):
+        """중단된 커밋을 마무리합니다. 반환: (복구 여부, 메시지)"""
+        return False, ""
+
+    def write_frames(self, frames):
+        """모든 시트를 통째로 덮어씁니다. (가져오기/내보내기, 전체 저장용)"""
+        raise NotImplementedError("Subclasses must implement write_frames")
+
+    def backup(self, target):
+        """[NEW] 저장소 파일을 target에 복사합니다. (쓰는 도중의 파일을 복사하지 않도록 백엔드가 필요한 잠금을 잡음)"""
+        shutil.copy2(self.path, target)
+
+    def begin(self):
+        return self.read_frames(), None
+
+    def begin_signature(self, token):
+        """begin() 시점의 저장소 서명. 알 수 없으면 None (로컬 캐시를 시트 단위로 갱신하지 않고 전체를 씀)"""
+        return token.get("signature") if isinstance(token, dict) else None
+
+    def commit(self, frames, token, dirty=None):
+        """변경 내용을 기록하고 기록 직후의 서명을 반환합니다."""
+        self.write_frames(frames)
+        return self.get_signature()
+
+    def rollback(self, token):
+        pass
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+
+from config import Config
+from storage.change_detector import signature_changed
+
+CACHE_FORMAT = 1
+
+
+class FrameCache:
+    """
+    전처리가 끝난 시트 DataFrame을 로컬(APP_DIR/cache)에 시트별 pickle로 보관합니다.
+    원본 파일의 서명(stamp)과 함께 저장하여, 재시작 시 네트워크 드라이브를 읽지 않고 바로 화면을 띄웁니다.
+    """
+
+    def __init__(self, source_path):
+        key = hashlib.sha1(os.path.abspath(source_path).encode("utf-8")).hexdigest()[:16]
+        self.cache_dir = os.path.join(Config.CACHE_DIR, key)
+        self.meta_path = os.path.join(self.cache_dir, "meta.json")
+        self._lock = threading.Lock() # 백그라운드 로더와 UI 스레드(커밋 후 갱신)의 동시 저장 방지
+
+    def _sheet_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def load(self, stamp=None):
+        """캐시된 (frames, stamp)를 반환합니다. stamp를 주면 일치할 때만 반환합니다."""
+        with self._lock:
+            return self._load(stamp)
+
+    def _load(self, stamp):
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("format") != CACHE_FORMAT or meta.get("app_version") != Config.APP_VERSION:
+                return None
+            if stamp is not None and meta.get("stamp") != stamp:
+                return None
+            frames = {key: pd.read_pickle(self._sheet_path(key)) for key in Config.SHEET_SCHEMAS}
+            return frames, meta["stamp"]
+        except Exception:
+            return None
+
+    def save(self, frames, stamp, keys=None, base_stamp=None):
+        """
+        keys를 주면 해당 시트 파일만 다시 씁니다. 캐시가 base_stamp 상태일 때만 가능하며, 아니면 전체를 씁니다.
+        """
+        with self._lock:
+            self._save(frames, stamp, keys, base_stamp)
+
+    def _read_stamp(self):
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("stamp")
+        except Exception:
+            return None
+
+    def _save(self, frames, stamp, keys, base_stamp):
+        try:
+            if keys is not None and (base_stamp is None or signature_changed(self._read_stamp(), base_stamp)): keys = None
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # 메타를 먼저 지워 저장 도중 중단되어도 불완전한 캐시를 읽지 않도록 함
+            if os.path.exists(self.meta_path): os.remove(self.meta_path)
+            for key in Config.SHEET_SCHEMAS:
+                if keys is not None and key not in keys: continue
+                frames[key].to_pickle(self._sheet_path(key))
+            meta = {"format": CACHE_FORMAT, "app_version": Config.APP_VERSION, "stamp": stamp}
+            with open(self.meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"캐시 저장 실패: {e}")
+
+    def clear(self):
+        try:
+            if os.path.exists(self.meta_path): os.remove(self.meta_path)
+        except OSError:
+            pass
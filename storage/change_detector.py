@@ -0,0 +1,83 @@
+import hashlib
+import os
+import struct
+
+# 파일 끝 64KB (+EOCD 22바이트) 안에 중앙 디렉터리가 들어가는 것이 일반적 (시트 수십 개 규모)
+TAIL_SIZE = 65536 + 22
+EOCD_SIG = b"PK\x05\x06"
+CD_SIG = b"PK\x01\x02"
+SQLITE_HEADER_SIZE = 100
+
+
+def _digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _read_tail(f, size, length):
+    start = max(0, size - length)
+    f.seek(start)
+    return start, f.read(size - start)
+
+
+def parse_zip_directory(directory):
+    """중앙 디렉터리 바이트에서 {파트 경로: CRC32}를 추출합니다."""
+    parts = {}
+    pos = 0
+    while directory.startswith(CD_SIG, pos) and pos + 46 <= len(directory):
+        crc, = struct.unpack("<I", directory[pos + 16:pos + 20])
+        name_len, extra_len, comment_len = struct.unpack("<HHH", directory[pos + 28:pos + 34])
+        name = directory[pos + 46:pos + 46 + name_len].decode("utf-8", "replace")
+        parts[name] = crc
+        pos += 46 + name_len + extra_len + comment_len
+    return parts
+
+
+def zip_directory_probe(path, size):
+    """
+    zip(xlsx)의 중앙 디렉터리 해시와 파트별 CRC. 모든 파트의 CRC/크기가 들어 있으므로 내용이 바뀌면 반드시 달라집니다.
+    보통 파일 끝 한 번 읽기로 끝나며, 구조를 해석할 수 없으면(저장 중 등) 꼬리 바이트 자체를 해시합니다.
+    """
+    with open(path, "rb") as f:
+        start, tail = _read_tail(f, size, TAIL_SIZE)
+        pos = tail.rfind(EOCD_SIG)
+        if pos < 0 or len(tail) - pos < 22: return {"digest": _digest(tail), "parts": None}
+
+        cd_size, cd_offset = struct.unpack("<II", tail[pos + 12:pos + 20])
+        if cd_offset == 0xFFFFFFFF or cd_offset + cd_size > start + pos:
+            return {"digest": _digest(tail), "parts": None}  # Zip64 또는 손상
+        if cd_offset >= start:
+            directory = tail[cd_offset - start:pos]
+        else:
+            f.seek(cd_offset)
+            directory = f.read(cd_size)
+        return {"digest": _digest(directory + tail[pos:]), "parts": parse_zip_directory(directory)}
+
+
+def sqlite_header_probe(path, size):
+    """
+    SQLite 헤더 해시. 오프셋 24의 파일 변경 카운터는 커밋마다 증가하므로 헤더 100바이트로 충분합니다.
+    """
+    with open(path, "rb") as f:
+        return {"digest": _digest(f.read(SQLITE_HEADER_SIZE))}
+
+
+def file_signature(path, probe=None):
+    """
+    {size, mtime, digest, ...} 서명을 반환합니다. probe(path, size)가 돌려준 항목이 더해지며, 없으면 digest는 None입니다.
+    """
+    st = os.stat(path)
+    signature = {"size": st.st_size, "mtime": st.st_mtime, "digest": None}
+    if probe: signature.update(probe(path, st.st_size))
+    return signature
+
+
+def signature_changed(old, new):
+    """
+    내용 변경 여부. digest가 있으면 mtime은 무시합니다.
+    (네트워크 드라이브의 mtime 정밀도/시계 차이로 인한 누락·오탐 방지)
+    """
+    if old is None: return True
+    if old.get("size") != new.get("size"): return True
+    if old.get("digest") is not None and new.get("digest") is not None:
+        return old["digest"] != new["digest"]
+    return old.get("mtime") != new.get("mtime")
@@ -0,0 +1,279 @@
+import getpass
+import os
+import zipfile
+from xml.etree.ElementTree import ParseError
+
+import pandas as pd
+
+from config import Config
+from storage.atomic import atomic_write
+from storage.base import StorageBackend, empty_frames, normalize_frames
+from storage.change_detector import file_signature, signature_changed, zip_directory_probe
+from storage.journal import Journal, apply_changes, committed_transactions, sheet_changes
+from storage.lock import ConflictError, FileLease
+from storage.preprocess import NUMERIC_DATA_COLUMNS
+from storage.row_diff import row_hashes
+from storage.xlsx_reader import read_xlsx_sheets
+from storage.xlsx_parts import (CALC_CHAIN_PART, SHARED_STRINGS_PART, append_sheet_rows, patch_sheet_xml,
+                                read_sheet_part_map, rebuild_workbook, sheet_rels_part)
+from storage.xlsx_styles import STYLES_PART, CellStyles
+
+
+RECOVERY_LOCK_TIMEOUT = 3  # 초. 복구는 다른 사용자가 저장 중이면 다음 로드로 미룸
+
+# 모든 시트의 해석에 영향을 주는 파트
+WORKBOOK_LEVEL_PARTS = (SHARED_STRINGS_PART, STYLES_PART, "xl/workbook.xml", "xl/_rels/workbook.xml.rels")
+
+
+class ExcelBackend(StorageBackend):
+    """
+    SalesList.xlsx 워크북 백엔드 (시트 하나 = DataFrame 하나)
+    커밋 시 변경된(dirty) 시트의 XML만 새로 만들고, 나머지 시트 파트는 원본 그대로 복사합니다.
+    """
+    name = "excel"
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.journal = Journal(path)
+        self._journal_pos = None # {"digest", "checkpoint", "offset"}: 저널을 어디까지 반영했는지 (재로드 시 이어 읽기)
+
+    def get_signature(self):
+        # 중앙 디렉터리(파트별 CRC)만 읽음
+        return file_signature(self.path, zip_directory_probe)
+
+    def read_frames(self, keys=None, path=None):
+        frames = empty_frames() if keys is None else {}
+        wanted = {sheet: key for key, (sheet, _) in Config.SHEET_SCHEMAS.items() if keys is None or key in keys}
+        sheets = read_xlsx_sheets(path or self.path, wanted, {Config.SHEET_DATA: NUMERIC_DATA_COLUMNS})
+        for sheet, df in sheets.items():
+            frames[wanted[sheet]] = df
+        return normalize_frames(frames, keys)
+
+    def changed_sheets(self, old_signature, new_signature):
+        """
+        시트 파트의 CRC가 바뀐 시트 키 집합을 반환합니다.
+        공유 문자열/스타일/워크북 구조 파트가 바뀌었으면 모든 시트 해석이 달라질 수 있으므로 None을 반환합니다.
+        (앱의 부분 저장은 inlineStr로 기록하여 공유 문자열을 건드리지 않음)
+        """
+        old_parts = (old_signature or {}).get("parts")
+        new_parts = new_signature.get("parts")
+        if not old_parts or not new_parts: return None
+        if any(old_parts.get(p) != new_parts.get(p) for p in WORKBOOK_LEVEL_PARTS): return None
+
+        try:
+            with zipfile.ZipFile(self.path) as zf:
+                part_map = read_sheet_part_map(zf)
+        except (zipfile.BadZipFile, KeyError, OSError):
+            return None
+
+        # workbook.xml이 같으므로 시트 구성도 같음 (없는 시트는 계속 없음)
+        changed = set()
+        for key, (sheet, _) in Config.SHEET_SCHEMAS.items():
+            part = part_map.get(sheet)
+            if part is not None and old_parts.get(part) != new_parts.get(part):
+                changed.add(key)
+        return changed
+
+    def write_frames(self, frames):
+        with FileLease(self.path):
+            self._write_all(frames)
+
+    def backup(self, target):
+        # 커밋 중인 워크북을 복사하지 않도록 잠금을 잡고 복사
+        with FileLease(self.path):
+            super().backup(target)
+
+    def _write_all(self, frames):
+        with atomic_write(self.path) as f, pd.ExcelWriter(f, engine="openpyxl") as writer:
+            for key, (sheet, cols) in Config.SHEET_SCHEMAS.items():
+                df = frames.get(key)
+                if df is None: df = pd.DataFrame(columns=cols)
+                df.to_excel(writer, sheet_name=sheet, index=False)
+
+    def begin(self):
+        # 읽기 전에 서명을 기록 (읽는 도중 바뀌었다면 커밋 때 충돌로 판정되어 다시 읽음)
+        signature = self.get_signature()
+        try:
+            frames = self.read_frames()
+        except Exception:
+            # 다른 사용자가 기록하는 도중이라 파일이 불완전했던 경우는 충돌로 보고 다시 시작하게 함
+            if FileLease(self.path).is_held() or signature_changed(signature, self.get_signature()):
+                raise ConflictError()
+            raise
+        token = {
+            "signature": signature,
+            "columns": {k: list(df.columns) for k, df in frames.items()},
+            "hashes": {k: row_hashes(df) for k, df in frames.items()},
+        }
+        return frames, token
+
+    def commit(self, frames, token, dirty=None):
+        """
+        잠금 파일(FileLease)을 잡은 상태에서 begin() 이후 워크북이 바뀌지 않았는지 확인하고 기록합니다.
+        다른 사용자가 먼저 커밋했으면 ConflictError (호출자가 다시 읽고 재시도). 반환: 기록 직후 서명
+        """
+        if dirty is None: dirty = self.find_dirty(frames, token)
+        if not dirty: return token["signature"]
+        with FileLease(self.path):
+            # 중앙 디렉터리 해시가 버전 역할 (어떤 파트든 바뀌면 CRC/크기가 달라짐)
+            current = self.get_signature()
+            if signature_changed(token["signature"], current):
+                raise ConflictError()
+
+            # [NEW] 선기록: 워크북을 쓰기 전에 시트별 논리적 변경을 저널에 남김
+            if self.journal.needs_checkpoint(current["digest"]):
+                self.journal.checkpoint(self.path, current)
+            changes = {key: sheet_changes(frames[key], token["hashes"][key], token["columns"][key]) for key in dirty}
+            txid = self.journal.log_begin(current["digest"], changes, _current_user())
+            try:
+                if not self._patch_sheets(frames, dirty, token):
+                    self._write_all(frames)
+            except Exception:
+                # 워크북이 그대로면 중단으로 기록, 일부라도 쓰였으면 미완료로 남겨 recover()가 마저 적용
+                if not self._written_since(current): self.journal.log_abort(txid)
+                raise
+
+            stamp = self.get_signature()
+            self.journal.log_commit(txid, stamp["digest"])
+            self._remember_journal_pos(stamp)
+            return stamp
+
+    def _written_since(self, signature):
+        try: return signature_changed(signature, self.get_signature())
+        except OSError: return True
+
+    def _remember_journal_pos(self, signature):
+        header = self.journal.read_checkpoint() or {}
+        try: offset = os.path.getsize(self.journal.path)
+        except OSError: return
+        self._journal_pos = {"digest": signature.get("digest"), "checkpoint": header.get("id"), "offset": offset}
+
+    def replay_journal(self, base_signature, base_frames, target_signature):
+        """
+        base_signature 상태의 메모리 시트(base_frames)에 저널의 커밋 기록을 이어 적용하여 target_signature 상태를 만듭니다.
+        워크북을 다시 파싱하지 않고 바뀐 행만 반영하며, 저널로 이어지지 않으면(외부 편집, 기준점 교체 등) None을 반환합니다.
+        반환: {시트 키: 새 DataFrame} (바뀐 시트만)
+        """
+        base_digest = (base_signature or {}).get("digest")
+        if not base_digest or not target_signature.get("digest"): return None
+        pos = self._journal_pos if self._journal_pos and self._journal_pos["digest"] == base_digest else None
+        checkpoint_id, records, end = self.journal.read(pos["offset"] if pos else 0)
+        if pos and checkpoint_id != pos["checkpoint"]:
+            checkpoint_id, records, end = self.journal.read(0)
+        if checkpoint_id is None: return None
+
+        digest, chain = base_digest, []
+        for tx in committed_transactions(records)[0]:
+            if tx["base"] == digest:
+                chain.append(tx)
+                digest = tx["stamp"]
+            elif chain:
+                return None
+        if not chain or digest != target_signature["digest"]: return None
+
+        frames = {}
+        try:
+            for tx in chain:
+                for key, change in tx["changes"].items():
+                    frames[key] = apply_changes(frames.get(key, base_frames[key]), change)
+        except (KeyError, ValueError):
+            return None
+        self._journal_pos = {"digest": digest, "checkpoint": checkpoint_id, "offset": end}
+        return frames
+
+    def recover(self):
+        """
+        저널에 커밋 기록 없이 남은 마지막 트랜잭션(워크북을 쓰는 도중 앱이 종료됨)을 마무리합니다.
+        워크북이 손상되었으면 기준점 사본에 커밋된 트랜잭션을 순서대로 다시 적용하여 복원합니다.
+        반환: (복구 여부, 메시지)
+        """
+        if committed_transactions(self.journal.read()[1])[1] is None: return False, ""
+        with FileLease(self.path, timeout=RECOVERY_LOCK_TIMEOUT):
+            _, records, _ = self.journal.read()
+            done, pending = committed_transactions(records)
+            if pending is None: return False, ""
+            try:
+                frames, current = self.read_frames(), self.get_signature()
+            except Exception:
+                frames = None
+
+            if frames is not None and current["digest"] != pending["base"]:
+                # 워크북 기록은 끝났고 커밋 기록만 남기지 못한 경우
+                self.journal.log_commit(pending["txid"], current["digest"])
+                return True, "마지막 저장 기록을 확인했습니다."
+
+            if frames is None:
+                frames = self.read_frames(path=self.journal.checkpoint_path)
+                for tx in done:
+                    frames = _replay(frames, tx["changes"])
+            frames = _replay(frames, pending["changes"])
+            self._write_all(frames)
+            self.journal.log_commit(pending["txid"], self.get_signature()["digest"])
+            return True, f"중단된 저장({pending.get('user', '-')}, {pending.get('ts', '-')})을 복구했습니다."
+
+    def find_dirty(self, frames, token):
+        """트랜잭션 시작 시점 대비 내용이 바뀐 시트 키 집합을 계산합니다."""
+        dirty = set()
+        for key, df in frames.items():
+            if list(df.columns) != token["columns"].get(key):
+                dirty.add(key)
+                continue
+            base = token["hashes"].get(key)
+            new = row_hashes(df)
+            if base is None or len(base) != len(new) or (base != new).any():
+                dirty.add(key)
+        return dirty
+
+    def _patch_sheets(self, frames, dirty, token=None):
+        """
+        dirty 시트만 교체한 워크북을 기록합니다. 안전하게 부분 교체할 수 없는 구조
+        (시트 누락, 수식 계산 체인, 시트별 관계 파일)면 False를 반환하여 전체 저장으로 대체합니다.
+        트랜잭션 시작 시점 행들 뒤에 행만 추가된 시트(Log 등)는 새 행의 XML만 이어 붙입니다.
+        셀 서식은 원래 셀의 것을 유지하고, 날짜 서식이 없던 셀에 날짜를 쓸 때만 styles.xml에 서식을 추가합니다.
+        """
+        try:
+            with zipfile.ZipFile(self.path) as zf:
+                names = set(zf.namelist())
+                if CALC_CHAIN_PART in names: return False
+                part_map = read_sheet_part_map(zf)
+                cell_styles = CellStyles(zf.read(STYLES_PART)) if STYLES_PART in names else None
+
+                replacements = {}
+                for key in dirty:
+                    sheet = Config.SHEET_SCHEMAS[key][0]
+                    part = part_map.get(sheet)
+                    if part not in names or sheet_rels_part(part) in names: return False
+                    original = zf.read(part)
+                    appended = _appended_from(frames[key], token, key)
+                    patched = append_sheet_rows(original, frames[key], appended, cell_styles) if appended is not None else None
+                    if patched is None: patched = patch_sheet_xml(original, frames[key], cell_styles)
+                    if patched is None: return False
+                    replacements[part] = patched
+                if cell_styles is not None and cell_styles.changed: replacements[STYLES_PART] = cell_styles.xml
+        except (zipfile.BadZipFile, KeyError, ValueError, ParseError):
+            return False
+
+        content = rebuild_workbook(self.path, replacements)
+        with atomic_write(self.path) as f:
+            f.write(content)
+        return True
+
+
+def _appended_from(df, token, key):
+    # 시작 시점 행들이 그대로이고 뒤에 행만 추가되었으면 시작 시점 행 수, 아니면 None
+    if not token or list(df.columns) != token["columns"].get(key): return None
+    base = token["hashes"].get(key)
+    if base is None or len(df) <= len(base): return None
+    return len(base) if (row_hashes(df.iloc[:len(base)]) == base).all() else None
+
+
+def _replay(frames, changes):
+    frames = dict(frames)
+    for key, change in changes.items():
+        frames[key] = apply_changes(frames[key], change)
+    return frames
+
+
+def _current_user():
+    try: return getpass.getuser()
+    except Exception: return "Unknown"
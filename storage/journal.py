@@ -0,0 +1,179 @@
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from storage.atomic import atomic_write
+from storage.row_diff import diff_rows, row_hashes
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+CHECKPOINT_SUFFIX = ".checkpoint.xlsx"
+CHECKPOINT_EVERY = 200  # 커밋 기록이 이만큼 쌓이면 워크북 사본을 새 기준점으로 만들고 저널을 비움
+
+
+def _json_default(val):
+    if isinstance(val, np.integer): return int(val)
+    if isinstance(val, np.floating): return float(val)
+    if isinstance(val, np.bool_): return bool(val)
+    return str(val)  # Timestamp/datetime -> 'YYYY-MM-DD HH:MM:SS'
+
+
+def _records(df):
+    # 행을 컬럼 순서대로의 값 리스트로 (결측치 -> null)
+    return df.astype(object).where(df.notna(), None).values.tolist()
+
+
+def sheet_changes(new_df, base_hashes, base_columns):
+    """
+    트랜잭션 시작 시점(행 해시/컬럼) 대비 시트의 논리적 변경을 JSON으로 기록할 수 있는 dict로 만듭니다.
+    행 단위 opcode(row_diff)와 바뀐 구간의 새 행 값만 담으며, 컬럼 구성이 바뀌었으면 시트 전체를 담습니다.
+    """
+    if list(new_df.columns) != list(base_columns):
+        return {"columns": [str(c) for c in new_df.columns], "rows": _records(new_df)}
+    ops = diff_rows(base_hashes, row_hashes(new_df))
+    return {"base_rows": len(base_hashes),
+            "ops": [[i1, i2, _records(new_df.iloc[j1:j2])] for tag, i1, i2, j1, j2 in ops if tag != "equal"]}
+
+
+def apply_changes(df, change):
+    """sheet_changes() 결과를 기준 시트(df)에 적용한 새 DataFrame. 기준 행 수가 다르면 ValueError."""
+    if "rows" in change:
+        return pd.DataFrame(change["rows"], columns=change["columns"])
+    if len(df) != change["base_rows"]:
+        raise ValueError("저널 기준 시트와 행 수가 다릅니다.")
+    pieces, prev = [], 0
+    for i1, i2, rows in change["ops"]:
+        pieces.append(df.iloc[prev:i1])
+        if rows: pieces.append(pd.DataFrame(rows, columns=df.columns))
+        prev = i2
+    pieces.append(df.iloc[prev:])
+    return pd.concat(pieces, ignore_index=True)
+
+
+def committed_transactions(records):
+    """
+    저널 기록을 트랜잭션 단위로 묶습니다. 반환: (커밋된 트랜잭션 목록, 커밋/중단 기록이 없는 마지막 트랜잭션 또는 None)
+    트랜잭션: {"txid", "base", "stamp", "changes"} (base/stamp: 커밋 전후 워크북 서명 digest)
+    """
+    begun, done, order = {}, [], []
+    for rec in records:
+        kind, txid = rec.get("type"), rec.get("txid")
+        if kind == "begin":
+            begun[txid] = rec
+            order.append(txid)
+        elif kind == "commit" and txid in begun:
+            done.append({**begun.pop(txid), "stamp": rec["stamp"]})
+        elif kind == "abort":
+            begun.pop(txid, None)
+    pending = [begun[t] for t in order if t in begun]
+    return done, (pending[-1] if pending else None)
+
+
+class Journal:
+    """
+    워크북 옆의 '<파일>.journal.jsonl' 선기록(write-ahead) 저널. 모든 기록은 저장소 잠금(FileLease) 안에서 추가합니다.
+
+    첫 줄은 기준점(checkpoint) 기록이며 같은 폴더의 워크북 사본 '<파일>.checkpoint.xlsx'와 그 서명을 가리킵니다.
+    이후 트랜잭션마다 워크북에 쓰기 전 {"type": "begin", 변경 내용}을, 쓴 뒤 {"type": "commit", 새 서명}을 추가합니다.
+    """
+
+    def __init__(self, workbook_path):
+        self.path = workbook_path + JOURNAL_SUFFIX
+        self.checkpoint_path = workbook_path + CHECKPOINT_SUFFIX
+        self._tail = None # {"checkpoint", "offset", "stamp", "commits"}: 기준점 이후 어디까지 읽었고 커밋이 몇 개인지
+
+    def _append(self, record):
+        line = (json.dumps(record, ensure_ascii=False, default=_json_default) + "\n").encode("utf-8")
+        with open(self.path, "ab") as f:
+            start = f.tell()
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            end = f.tell()
+        tail = self._tail
+        if tail and tail["offset"] == start:  # 읽은 위치 바로 뒤에 쓴 기록은 다시 읽지 않도록 바로 반영
+            tail["offset"] = end
+            if record["type"] == "commit": tail.update(stamp=record["stamp"], commits=tail["commits"] + 1)
+
+    def read(self, offset=0):
+        """
+        offset 바이트 위치부터 완전한 줄만 읽습니다. (쓰는 도중 잘린 마지막 줄은 제외)
+        반환: (기준점 id, 기록 목록, 다음 offset) / 저널이 없으면 (None, [], 0)
+        """
+        try:
+            with open(self.path, "rb") as f:
+                header = f.readline()
+                f.seek(max(offset, len(header)))
+                data = f.read()
+        except OSError:
+            return None, [], 0
+        if not header.endswith(b"\n"): return None, [], 0
+        checkpoint_id = json.loads(header).get("id")
+        end = data.rfind(b"\n") + 1
+        records = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+        return checkpoint_id, records, max(offset, len(header)) + end
+
+    def read_checkpoint(self):
+        try:
+            with open(self.path, "rb") as f:
+                return json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+
+    def needs_checkpoint(self, digest):
+        """
+        새 기준점이 필요한지: 저널이 없거나, 커밋이 CHECKPOINT_EVERY개 쌓였거나,
+        마지막 기록 이후 워크북이 저널 밖에서 바뀐 경우(엑셀에서 직접 편집, 전체 저장 등)
+        """
+        tail = self._read_tail()
+        if tail is None: return True
+        return tail["stamp"] != digest or tail["commits"] >= CHECKPOINT_EVERY
+
+    def _read_tail(self):
+        """
+        [수정] 기준점 이후 커밋 수와 마지막 커밋 서명. 지난번에 읽은 위치 이후 추가된 기록만 읽습니다.
+        (다른 사용자가 기준점을 새로 만들었으면 처음부터 다시 읽음) 저널이 없으면 None
+        """
+        tail = self._tail
+        checkpoint_id, records, end = self.read(tail["offset"] if tail else 0)
+        if tail and checkpoint_id != tail["checkpoint"]:
+            tail = None
+            checkpoint_id, records, end = self.read(0)
+        if checkpoint_id is None:
+            self._tail = None
+            return None
+        if tail is None:
+            header = self.read_checkpoint() or {}
+            tail = {"checkpoint": checkpoint_id, "stamp": header.get("stamp"), "commits": 0}
+        commits = [rec for rec in records if rec.get("type") == "commit"]
+        tail["offset"] = end
+        if commits: tail.update(stamp=commits[-1]["stamp"], commits=tail["commits"] + len(commits))
+        self._tail = tail
+        return tail
+
+    def checkpoint(self, workbook_path, signature):
+        """현재 워크북을 기준점 사본으로 복사하고 저널을 그 기준점 기록 한 줄로 새로 시작합니다."""
+        with open(workbook_path, "rb") as src, atomic_write(self.checkpoint_path) as f:
+            shutil.copyfileobj(src, f)
+        header = {"type": "checkpoint", "id": uuid.uuid4().hex, "stamp": signature.get("digest"),
+                  "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        line = (json.dumps(header, ensure_ascii=False) + "\n").encode("utf-8")
+        with atomic_write(self.path) as f:
+            f.write(line)
+        self._tail = {"checkpoint": header["id"], "offset": len(line), "stamp": header["stamp"], "commits": 0}
+
+    def log_begin(self, base_digest, changes, user):
+        txid = uuid.uuid4().hex
+        self._append({"type": "begin", "txid": txid, "base": base_digest, "user": user,
+                      "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "changes": changes})
+        return txid
+
+    def log_commit(self, txid, digest):
+        self._append({"type": "commit", "txid": txid, "stamp": digest})
+
+    def log_abort(self, txid):
+        self._append({"type": "abort", "txid": txid})
@@ -0,0 +1,90 @@
+import re
+import threading
+import unicodedata
+import weakref
+
+import numpy as np
+import pandas as pd
+
+MGMT_COL = "관리번호"
+CLIENT_COL = "업체명"
+MAX_CACHED = 32
+
+_CORP_MARKS = re.compile(r"\(주\)|㈜|주식회사|\bco\.?,?\s*ltd\.?|\binc\.?|\bcorp\.?")
+_NAME_NOISE = re.compile(r"[\s\.,\-_()&'\"]+")
+
+
+def normalize_name(name):
+    """
+    업체명 비교용 키. 전각/반각, 대소문자, 공백·구두점, 법인 표기((주), 주식회사, Co., Ltd. 등) 차이를 무시합니다.
+    """
+    text = unicodedata.normalize("NFKC", str(name)).lower()
+    return _NAME_NOISE.sub("", _CORP_MARKS.sub("", text))
+
+
+class KeyIndex:
+    """
+    DataFrame별 {키 문자열: 행 위치 배열} 해시 인덱스.
+    DataFrame 객체(와 행 수)가 같으면 재사용하고, 다시 읽거나 커밋하여 객체가 바뀐 시트만 새로 만듭니다.
+    (부분 재로드 시 바뀌지 않은 시트는 같은 객체이므로 인덱스도 그대로 유지됨)
+    """
+
+    def __init__(self, column=MGMT_COL, normalize=None):
+        self.column = column
+        self.normalize = normalize  # 키 정규화 함수 (없으면 문자열 그대로 비교)
+        self._cache = {}  # id(df) -> (weakref, 행 수, {키: 위치 배열})
+        self._lock = threading.Lock()
+
+    def _build(self, df):
+        if df.empty or self.column not in df.columns: return {}
+        keys = df[self.column].astype(str)
+        if self.normalize: keys = keys.map(self.normalize)
+        keys = keys.to_numpy()
+        return pd.Series(np.arange(len(df))).groupby(keys, sort=False).indices
+
+    def _get(self, df):
+        with self._lock:
+            entry = self._cache.get(id(df))
+            if entry and entry[0]() is df and entry[1] == len(df):
+                return entry[2]
+            index = self._build(df)
+            if len(self._cache) >= MAX_CACHED:
+                self._cache = {k: v for k, v in self._cache.items() if v[0]() is not None}
+            self._cache[id(df)] = (weakref.ref(df), len(df), index)
+            return index
+
+    def _key(self, value):
+        return self.normalize(str(value)) if self.normalize else str(value)
+
+    def positions(self, df, keys):
+        """keys(값 하나 또는 목록)에 해당하는 행 위치 배열 (원래 행 순서)"""
+        index = self._get(df)
+        if isinstance(keys, (list, tuple, set, np.ndarray, pd.Series)):
+            found = [index[k] for k in dict.fromkeys(map(self._key, keys)) if k in index]
+            if not found: return np.zeros(0, dtype=np.intp)
+            return np.sort(np.concatenate(found)) if len(found) > 1 else found[0]
+        return index.get(self._key(keys), np.zeros(0, dtype=np.intp))
+
+    def rows(self, df, keys):
+        """keys에 해당하는 행들 (인덱스 라벨 유지, 전체 스캔 없음)"""
+        return df.iloc[self.positions(df, keys)]
+
+    def contains(self, df, key):
+        return self._key(key) in self._get(df)
+
+
+mgmt_index = KeyIndex(MGMT_COL)
+client_index = KeyIndex(CLIENT_COL)
+client_name_index = KeyIndex(CLIENT_COL, normalize=normalize_name)
+
+
+def find_client(df_clients, name, fuzzy=False):
+    """
+    업체명으로 고객 행(Series)을 찾습니다. 없으면 None.
+    fuzzy=True이면 정확히 일치하는 업체가 없을 때 정규화된 이름으로 찾되, 서로 다른 업체가 겹치면 None을 반환합니다.
+    """
+    pos = client_index.positions(df_clients, name)
+    if not len(pos) and fuzzy and normalize_name(name):
+        pos = client_name_index.positions(df_clients, name)
+        if len(pos) and df_clients[CLIENT_COL].iloc[pos].astype(str).nunique() > 1: return None
+    return df_clients.iloc[pos[0]] if len(pos) else None
@@ -0,0 +1,106 @@
+import getpass
+import json
+import os
+import random
+import socket
+import time
+import uuid
+
+LOCK_SUFFIX = ".lock"
+LEASE_TTL = 120        # 초. 이보다 오래된 잠금 파일은 비정상 종료로 남은 것으로 보고 회수
+ACQUIRE_TIMEOUT = 15   # 초. 잠금을 기다리는 최대 시간
+
+
+class LockTimeout(Exception):
+    """다른 사용자가 저장 중이어서 잠금을 얻지 못함 (owner: 잠금 보유자 설명)"""
+
+    def __init__(self, owner):
+        super().__init__(owner)
+        self.owner = owner
+
+
+class ConflictError(Exception):
+    """트랜잭션을 시작한 뒤 다른 사용자가 먼저 커밋하여 저장소 버전이 바뀜 (다시 읽고 재시도 필요)"""
+
+
+def backoff(attempt, base=0.05, cap=2.0):
+    """재시도 대기 시간 (지수 증가 + 지터, 동시에 깨어난 사용자끼리 다시 부딪히지 않도록 함)"""
+    return min(cap, base * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+
+class FileLease:
+    """
+    공유 폴더의 저장소 파일 옆에 '<파일>.lock'을 만들어 쓰는 동안 다른 프로세스의 쓰기를 막는 임대(lease) 잠금.
+    파일 생성은 O_CREAT|O_EXCL로 원자적으로 하며, LEASE_TTL보다 오래된 잠금은 보유자가 죽은 것으로 보고 회수합니다.
+
+        with FileLease(path):
+            ... 저장 ...
+    """
+
+    def __init__(self, path, ttl=LEASE_TTL, timeout=ACQUIRE_TIMEOUT):
+        self.lock_path = path + LOCK_SUFFIX
+        self.ttl = ttl
+        self.timeout = timeout
+        self.token = None
+
+    def _owner_info(self):
+        try: user = getpass.getuser()
+        except Exception: user = "Unknown"
+        return {"token": self.token, "user": user, "host": socket.gethostname(), "pid": os.getpid(),
+                "acquired": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+    def read_owner(self):
+        try:
+            with open(self.lock_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _try_create(self):
+        try:
+            fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._owner_info(), f, ensure_ascii=False)
+        return True
+
+    def _break_if_stale(self):
+        stale = self.read_owner()
+        try:
+            if time.time() - os.stat(self.lock_path).st_mtime <= self.ttl: return
+            # 지우기 직전에 다시 읽어, 그 사이 다른 사용자가 회수 후 새로 잡은 잠금은 지우지 않음
+            if self.read_owner() == stale: os.remove(self.lock_path)
+        except OSError:
+            pass
+
+    def is_held(self):
+        """다른 프로세스가 잠금을 잡고 있는지 (회수 대상인 오래된 잠금은 제외)"""
+        try: return time.time() - os.stat(self.lock_path).st_mtime <= self.ttl
+        except OSError: return False
+
+    def acquire(self):
+        self.token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.timeout
+        attempt = 0
+        while True:
+            if self._try_create(): return self
+            self._break_if_stale()
+            if time.monotonic() >= deadline:
+                owner = self.read_owner() or {}
+                raise LockTimeout(f"{owner.get('user', '알 수 없음')}@{owner.get('host', '?')} ({owner.get('acquired', '-')})")
+            time.sleep(backoff(attempt, base=0.1, cap=1.0))
+            attempt += 1
+
+    def release(self):
+        owner = self.read_owner()
+        if owner is not None and owner.get("token") == self.token:
+            try: os.remove(self.lock_path)
+            except OSError: pass
+        self.token = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
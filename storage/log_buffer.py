@@ -0,0 +1,74 @@
+import pandas as pd
+
+
+class TransactionFrames(dict):
+    """
+    트랜잭션 작업 함수가 받는 시트 묶음(dfs). 일반 dict와 같이 쓰며, 로그 행은 logs에 모아 두었다가
+    flush_logs()로 트랜잭션마다 한 번만 Log 시트에 붙입니다. (행마다 pd.concat으로 Log 전체를 복사하지 않음)
+
+    savepoint() 이후에는 작업이 처음 꺼내거나(dfs[key], dfs.get(key)) 바꾸는(dfs[key] = ...) 시트만 원본을 기억하고
+    꺼낸 시트는 사본을 주므로, rollback()으로 그 작업의 변경만 되돌릴 수 있습니다. (건드리지 않은 시트, 특히 Log는 복사하지 않음)
+
+    stored는 저장소에서 읽어 기록할 트랜잭션의 시트인지 여부입니다. (False: 화면에만 반영하는 낙관적 적용)
+    작업 함수는 이 값으로 실제로 기록된 번호 등을 구분할 수 있습니다.
+    """
+
+    def __init__(self, frames=(), logs=None, stored=False):
+        super().__init__(frames)
+        self.logs = [] if logs is None else logs
+        self.stored = stored
+        self._saved = None # savepoint 이후 처음 꺼내거나 바꾼 시트의 원본 {키: DataFrame 또는 None(없던 시트)}
+        self._logged = 0
+
+    def __getitem__(self, key):
+        df = super().__getitem__(key)
+        if self._saved is not None and key not in self._saved:
+            self._saved[key] = df
+            df = df.copy()
+            super().__setitem__(key, df)
+        return df
+
+    def __setitem__(self, key, df):
+        if self._saved is not None and key not in self._saved:
+            self._saved[key] = super().get(key)
+        super().__setitem__(key, df)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def savepoint(self):
+        """이후 변경을 rollback()으로 되돌릴 수 있게 기록을 시작합니다."""
+        self._saved, self._logged = {}, len(self.logs)
+
+    def rollback(self):
+        """savepoint() 이후 꺼내거나 바꾼 시트와 추가된 로그를 되돌립니다."""
+        for key, df in self._saved.items():
+            if df is None: super().pop(key, None)
+            else: super().__setitem__(key, df)
+        del self.logs[self._logged:]
+        self._saved = None
+
+    def release(self):
+        """savepoint() 이후 변경을 확정합니다. (기록 중지)"""
+        self._saved = None
+
+
+def append_rows(df, rows):
+    """dict 행 목록을 df 끝에 한 번의 concat으로 붙인 새 DataFrame"""
+    if not rows: return df
+    new_df = pd.DataFrame(rows)
+    if df.empty: return new_df.reindex(columns=list(dict.fromkeys([*df.columns, *new_df.columns])))
+    # 한쪽이 전부 빈 값인 컬럼은 양쪽을 object로 맞춰 붙임 (pandas의 빈 값 concat FutureWarning 방지)
+    na_cols = [c for c in new_df.columns.intersection(df.columns) if new_df[c].isna().all() or df[c].isna().all()]
+    if na_cols:
+        df, new_df = df.astype(dict.fromkeys(na_cols, object)), new_df.astype(dict.fromkeys(na_cols, object))
+    return pd.concat([df, new_df], ignore_index=True)
+
+
+def flush_logs(dfs, key="log"):
+    """모아 둔 로그 행을 dfs[key]에 붙이고 비웁니다. 붙인 행이 있으면 True"""
+    logs = getattr(dfs, "logs", None)
+    if not logs: return False
+    dfs[key] = append_rows(dfs[key], logs)
+    logs.clear()
+    return True
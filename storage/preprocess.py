@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from config import Config
+
+NUMERIC_DATA_COLUMNS = ["수량", "단가", "환율", "세율(%)", "공급가액", "세액", "합계금액", "기수금액", "미수금액"]
+DATE_DATA_COLUMNS = ["견적일", "수주일", "출고예정일", "출고일", "선적일", "입금완료일", "세금계산서발행일"]
+
+# Data 시트 타입 스키마 (나머지 컬럼은 문자열)
+DATA_SCHEMA = {**{col: "number" for col in NUMERIC_DATA_COLUMNS}, **{col: "date" for col in DATE_DATA_COLUMNS}}
+EMPTY_VALUES = ["-", ""]
+
+
+def parse_dates(values):
+    """
+    날짜 컬럼을 datetime64로 변환합니다.
+    ISO 형식(YYYY-MM-DD[ HH:MM:SS], 셀의 datetime 값 포함)은 C 파서로 한 번에 처리하고,
+    실패한 값만 format='mixed'(값마다 형식 추론, 가장 느린 경로)로 다시 파싱합니다.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values): return values
+    blank = values.isna() | values.isin(EMPTY_VALUES)
+    parsed = pd.to_datetime(values.where(~blank), errors='coerce', format='ISO8601')
+    failed = parsed.isna() & ~blank
+    if failed.any():
+        parsed[failed] = pd.to_datetime(values[failed], errors='coerce', format='mixed')
+    return parsed
+
+
+def format_dates(parsed):
+    """datetime64 컬럼을 화면 표시용 'YYYY-MM-DD' 문자열로 변환합니다. (NaT -> '-')"""
+    days = parsed.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    # 날짜는 중복이 많으므로 고유값만 문자열로 만든 뒤 코드로 펼침 (NaT의 코드 -1 -> 마지막 '-')
+    codes, uniques = pd.factorize(days)
+    labels = np.append(np.datetime_as_string(uniques, unit="D").astype(object), "-")
+    return pd.Series(labels[codes], index=parsed.index)
+
+
+def preprocess_frames(frames):
+    """
+    화면 표시용 전처리 (숫자 컬럼 숫자화, 날짜 컬럼 YYYY-MM-DD 문자열화)
+    입력 딕셔너리의 DataFrame을 직접 수정하지 않고 새 딕셔너리를 반환하므로 작업 스레드에서 호출해도 안전합니다.
+    딕셔너리에 들어 있는 시트만 처리합니다. (일부 시트만 다시 읽은 경우)
+    """
+    frames = dict(frames)
+    if "data" in frames: frames["data"] = _preprocess_data(frames["data"])
+    if "clients" in frames: frames["clients"] = frames["clients"].fillna("-")
+
+    # [수정] Delivery 데이터프레임 전처리
+    if "delivery" in frames:
+        df_delivery = frames["delivery"]
+        if "출고번호" not in df_delivery.columns:
+            df_delivery = df_delivery.assign(출고번호="-")
+        frames["delivery"] = df_delivery.fillna("-")
+    return frames
+
+
+def _preprocess_data(df_data):
+    df_data = df_data.fillna("-")  # 새 DataFrame (입력은 수정하지 않음)
+    for col in Config.DATA_COLUMNS:
+        if col not in df_data.columns: df_data[col] = "-"
+
+    for col, kind in DATA_SCHEMA.items():
+        if col not in df_data.columns: continue
+        if kind == "number":
+            df_data[col] = pd.to_numeric(df_data[col], errors='coerce').fillna(0)
+        else:
+            df_data[col] = format_dates(parse_dates(df_data[col]))
+    return df_data
+
+
+def typed_data_frame(df_data):
+    """
+    전처리된 Data 시트(날짜는 'YYYY-MM-DD' 문자열)에서 날짜 컬럼을 datetime64로 바꾼 새 DataFrame을 만듭니다.
+    전처리 결과는 ISO 형식이므로 모두 빠른 경로로 파싱됩니다.
+    """
+    return df_data.assign(**{col: parse_dates(df_data[col]) for col in DATE_DATA_COLUMNS if col in df_data.columns})
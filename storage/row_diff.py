@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+
+def row_hashes(df):
+    """행 단위 해시 배열을 계산합니다. (값을 문자열로 정규화하여 타입 차이를 흡수)"""
+    if df is None or df.empty:
+        return np.zeros(0, dtype=np.uint64)
+    normalized = df.astype(str)
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+def _common_prefix(a, b):
+    n = min(len(a), len(b))
+    if n == 0: return 0
+    diff = np.nonzero(a[:n] != b[:n])[0]
+    return int(diff[0]) if len(diff) else n
+
+
+def diff_rows(base_hashes, new_hashes):
+    """
+    두 해시 배열의 차이를 difflib 스타일 opcode 리스트로 반환합니다.
+    [(tag, i1, i2, j1, j2), ...]  tag: 'equal' | 'replace' | 'delete' | 'insert'
+
+    공통 접두/접미를 먼저 잘라낸 뒤, 가운데 구간만 해시 위치 사전으로 탐욕 매칭합니다.
+    (append, 제자리 수정, 삭제 후 끝에 재추가 등 실제 트랜잭션 패턴에서 O(rows))
+    """
+    base_hashes = np.asarray(base_hashes)
+    new_hashes = np.asarray(new_hashes)
+    nb, nn = len(base_hashes), len(new_hashes)
+
+    p = _common_prefix(base_hashes, new_hashes)
+    s = _common_prefix(base_hashes[p:][::-1], new_hashes[p:][::-1])
+
+    ops = []
+    if p: ops.append(("equal", 0, p, 0, p))
+
+    b_lo, b_hi = p, nb - s
+    n_lo, n_hi = p, nn - s
+
+    positions = {}
+    for k in range(b_lo, b_hi):
+        positions.setdefault(base_hashes[k], []).append(k)
+    cursors = {h: 0 for h in positions}
+
+    i = b_lo
+    pend_i, pend_j = b_lo, n_lo
+
+    def flush(i_stop, j_stop):
+        if i_stop > pend_i and j_stop > pend_j: ops.append(("replace", pend_i, i_stop, pend_j, j_stop))
+        elif i_stop > pend_i: ops.append(("delete", pend_i, i_stop, pend_j, pend_j))
+        elif j_stop > pend_j: ops.append(("insert", pend_i, pend_i, pend_j, j_stop))
+
+    for j in range(n_lo, n_hi):
+        h = new_hashes[j]
+        plist = positions.get(h)
+        k = None
+        if plist is not None:
+            c = cursors[h]
+            while c < len(plist) and plist[c] < i: c += 1
+            cursors[h] = c
+            if c < len(plist): k = plist[c]
+        if k is None:
+            continue
+
+        flush(k, j)
+        cursors[h] += 1
+        if ops and ops[-1][0] == "equal" and ops[-1][2] == k and ops[-1][4] == j:
+            _, i1, _, j1, _ = ops.pop()
+            ops.append(("equal", i1, k + 1, j1, j + 1))
+        else:
+            ops.append(("equal", k, k + 1, j, j + 1))
+        i = k + 1
+        pend_i, pend_j = i, j + 1
+
+    flush(b_hi, n_hi)
+
+    if s:
+        if ops and ops[-1][0] == "equal" and ops[-1][2] == b_hi and ops[-1][4] == n_hi:
+            _, i1, _, j1, _ = ops.pop()
+            ops.append(("equal", i1, nb, j1, nn))
+        else:
+            ops.append(("equal", b_hi, nb, n_hi, nn))
+    return ops
+
+
+def is_unchanged(ops):
+    return all(tag == "equal" for tag, *_ in ops)
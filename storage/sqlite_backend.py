@@ -0,0 +1,192 @@
+import sqlite3
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from storage.base import StorageBackend, empty_frames, normalize_frames
+from storage.change_detector import file_signature, sqlite_header_probe
+from storage.row_diff import diff_rows, is_unchanged, row_hashes
+
+ROWID_COL = "_rowid"
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _to_sql_value(val):
+    if val is None or val is pd.NA: return None
+    if isinstance(val, float) and np.isnan(val): return None
+    if isinstance(val, (pd.Timestamp, datetime)):
+        if pd.isna(val): return None
+        return val.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(val, date): return val.strftime("%Y-%m-%d")
+    if isinstance(val, np.generic): return val.item()
+    return val
+
+
+def _to_records(df):
+    return [tuple(_to_sql_value(v) for v in row) for row in df.itertuples(index=False, name=None)]
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    SQLite 백엔드. Config.SHEET_SCHEMAS의 시트 키마다 테이블 하나를 둡니다.
+    커밋 시 트랜잭션 시작 시점의 행 해시와 비교하여 변경된 행만 UPDATE/INSERT/DELETE 합니다.
+    (행 순서는 _rowid 순서이며, 새 행은 항상 테이블 끝에 추가됩니다)
+    """
+    name = "sqlite"
+
+    def get_signature(self):
+        # 헤더의 파일 변경 카운터만 읽음
+        return file_signature(self.path, sqlite_header_probe)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        return conn
+
+    def backup(self, target):
+        """[NEW] SQLite 온라인 백업 API로 복사합니다. (다른 사용자가 쓰는 중이어도 일관된 시점의 사본)"""
+        src, dst = self._connect(), sqlite3.connect(target)
+        try: src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+
+    def _ensure_table(self, conn, key, columns):
+        cols = [str(c) for c in columns]
+        exists = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (key,)).fetchone()
+        if not exists:
+            col_defs = ", ".join([f"{ROWID_COL} INTEGER PRIMARY KEY"] + [_quote(c) for c in cols])
+            conn.execute(f"CREATE TABLE {_quote(key)} ({col_defs})")
+            return
+        current = [r[1] for r in conn.execute(f"PRAGMA table_info({_quote(key)})")]
+        for c in cols:
+            if c not in current:
+                conn.execute(f"ALTER TABLE {_quote(key)} ADD COLUMN {_quote(c)}")
+
+    def _read_table(self, conn, key, schema_cols):
+        exists = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (key,)).fetchone()
+        if not exists:
+            return pd.DataFrame(columns=schema_cols), np.zeros(0, dtype=np.int64)
+        df = pd.read_sql_query(f"SELECT * FROM {_quote(key)} ORDER BY {ROWID_COL}", conn)
+        rowids = df.pop(ROWID_COL).to_numpy(dtype=np.int64)
+        return df, rowids
+
+    def _read_all(self, conn):
+        frames = empty_frames()
+        rowids = {}
+        for key, (_, cols) in Config.SHEET_SCHEMAS.items():
+            frames[key], rowids[key] = self._read_table(conn, key, cols)
+        return normalize_frames(frames), rowids
+
+    def read_frames(self, keys=None):
+        conn = self._connect()
+        try:
+            if keys is None:
+                frames, _ = self._read_all(conn)
+                return frames
+            frames = {key: self._read_table(conn, key, Config.SHEET_SCHEMAS[key][1])[0] for key in keys}
+            return normalize_frames(frames, keys)
+        finally:
+            conn.close()
+
+    def write_frames(self, frames):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for key, (_, cols) in Config.SHEET_SCHEMAS.items():
+                df = frames.get(key)
+                if df is None: df = pd.DataFrame(columns=cols)
+                conn.execute(f"DROP TABLE IF EXISTS {_quote(key)}")
+                self._ensure_table(conn, key, df.columns)
+                self._insert_rows(conn, key, df)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def begin(self):
+        conn = self._connect()
+        try:
+            # 쓰기 예약 잠금: 다른 사용자의 동시 커밋은 대기합니다.
+            conn.execute("BEGIN IMMEDIATE")
+            frames, rowids = self._read_all(conn)
+        except Exception:
+            conn.close()
+            raise
+        token = {
+            "conn": conn,
+            "signature": self.get_signature(), # 쓰기 예약 잠금 안에서 읽으므로 커밋 전까지 그대로
+            "rowids": rowids,
+            "columns": {k: list(df.columns) for k, df in frames.items()},
+            "hashes": {k: row_hashes(df) for k, df in frames.items()},
+        }
+        return frames, token
+
+    def commit(self, frames, token, dirty=None):
+        conn = token["conn"]
+        try:
+            for key in Config.SHEET_SCHEMAS:
+                if dirty is not None and key not in dirty: continue
+                self._commit_table(conn, key, frames[key], token)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        # BEGIN IMMEDIATE로 begin()부터 쓰기 잠금을 잡고 있으므로 충돌(ConflictError)은 생기지 않음
+        return self.get_signature()
+
+    def rollback(self, token):
+        if not token: return
+        conn = token["conn"]
+        try: conn.execute("ROLLBACK")
+        finally: conn.close()
+
+    def _insert_rows(self, conn, key, df):
+        if df.empty: return
+        cols = ", ".join(_quote(c) for c in df.columns)
+        marks = ", ".join("?" for _ in df.columns)
+        conn.executemany(f"INSERT INTO {_quote(key)} ({cols}) VALUES ({marks})", _to_records(df))
+
+    def _commit_table(self, conn, key, df, token):
+        base_cols = token["columns"][key]
+        base_rowids = token["rowids"][key]
+        self._ensure_table(conn, key, df.columns)
+
+        if list(df.columns) != base_cols:
+            # 컬럼 구성이 바뀐 경우 테이블 전체를 다시 씁니다.
+            conn.execute(f"DELETE FROM {_quote(key)}")
+            self._insert_rows(conn, key, df)
+            return
+
+        ops = diff_rows(token["hashes"][key], row_hashes(df))
+        if is_unchanged(ops): return
+
+        table = _quote(key)
+        set_clause = ", ".join(f"{_quote(c)} = ?" for c in df.columns)
+        delete_ids, updates, insert_pos = [], [], []
+
+        for tag, i1, i2, j1, j2 in ops:
+            if tag == "equal": continue
+            paired = min(i2 - i1, j2 - j1)
+            for off in range(paired):
+                updates.append((j1 + off, int(base_rowids[i1 + off])))
+            delete_ids.extend(int(r) for r in base_rowids[i1 + paired:i2])
+            insert_pos.extend(range(j1 + paired, j2))
+
+        if delete_ids:
+            conn.executemany(f"DELETE FROM {table} WHERE {ROWID_COL} = ?", [(r,) for r in delete_ids])
+        if updates:
+            rows = _to_records(df.iloc[[pos for pos, _ in updates]])
+            conn.executemany(f"UPDATE {table} SET {set_clause} WHERE {ROWID_COL} = ?",
+                             [row + (rid,) for row, (_, rid) in zip(rows, updates)])
+        if insert_pos:
+            self._insert_rows(conn, key, df.iloc[insert_pos])
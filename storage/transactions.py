@@ -0,0 +1,222 @@
+import time
+
+import pandas as pd
+
+from storage.change_detector import signature_changed
+from storage.lock import ConflictError, LockTimeout, backoff
+from storage.log_buffer import TransactionFrames, flush_logs
+from storage.preprocess import preprocess_frames
+
+MAX_TRANSACTION_RETRIES = 8 # 동시 저장 충돌 시 다시 읽고 재적용하는 최대 횟수
+
+
+class TransactionMixin:
+    """
+    DataManager의 저장 트랜잭션 / 쓰기 큐 / 낙관적 갱신 부분.
+    사용하는 쪽은 storage, cache, write_queue, sequences, _confirmed, _pending_ops, data_version 속성과
+    _get_frames(), _set_frames(), _check_backend()를 제공합니다.
+    """
+
+    def _prepare_frames(self, frames, stamp, keys=None, base_stamp=None):
+        """
+        커밋한 시트들을 전처리하고 로컬 캐시를 갱신합니다. 메모리 데이터는 바꾸지 않으므로 작업 스레드에서도 호출할 수 있으며,
+        교체는 _swap_frames()로 합니다.
+        keys(커밋한 시트)와 base_stamp(트랜잭션 시작 시점 서명)를 주면 캐시가 그 상태일 때 해당 시트 파일만 다시 씁니다.
+        이때 커밋하지 않았고 메모리 확정본 이후 저장소에서도 바뀌지 않은 시트는 확정본 객체를 그대로 써서
+        그 시트의 관리번호 인덱스/번호 캐시(객체 기준)를 다시 만들지 않게 합니다.
+        """
+        kept = self._unchanged_frames(keys, base_stamp)
+        # 재로드 결과와 동일하도록 인덱스를 0..n-1로 맞춤 (팝업이 행 인덱스로 트랜잭션 대상을 지정함)
+        frames = preprocess_frames({key: _range_indexed(df) for key, df in frames.items() if key not in kept})
+        frames.update(kept)
+        self.cache.save(frames, stamp, keys, base_stamp)
+        return frames
+
+    def _unchanged_frames(self, keys, base_stamp):
+        # {시트 키: 확정본 DataFrame} - 이번 커밋(keys)에도, 확정본 서명 이후 저장소에도 변경이 없는 시트
+        confirmed, confirmed_stamp = self._confirmed
+        if keys is None or base_stamp is None or confirmed_stamp is None: return {}
+        if signature_changed(confirmed_stamp, base_stamp):
+            changed = self.storage.changed_sheets(confirmed_stamp, base_stamp)
+            if changed is None: return {}
+        else:
+            changed = set()
+        return {key: df for key, df in confirmed.items() if key not in keys and key not in changed}
+
+    def _swap_frames(self, frames, stamp):
+        """저장소 상태의 시트들로 교체합니다. 기록 대기 중인 낙관적 변경이 있으면 그 위에 다시 적용하여 표시합니다. (UI 스레드 전용)"""
+        # 작업 스레드(read_snapshot)는 이 튜플만 읽으므로 시트들과 서명을 한 번에 교체
+        self._confirmed = (frames, stamp)
+        self.last_signature = stamp
+        if self._pending_ops: frames = self._apply_pending(frames)
+        self._show_frames(frames)
+
+    def _show_frames(self, frames):
+        self._set_frames(frames)
+        self.data_version += 1
+        self.sequences.observe(frames)
+
+    def _confirmed_frames(self):
+        """last_signature 시점의 저장소 상태 시트들 (낙관적 변경 제외)"""
+        return self._confirmed[0]
+
+    def _apply_pending(self, frames):
+        # 작업마다 savepoint를 두므로 작업이 건드린 시트만 사본에 적용됨 (작업이 모두 실패하면 원본 그대로)
+        dfs = TransactionFrames(frames)
+        results, dirty = self._apply_ops(self._pending_ops, dfs, isolate=True)
+        if not any(ok for ok, _ in results): return frames
+        keys = dfs.keys() if dirty is None else dirty
+        return {**dfs, **preprocess_frames({key: _range_indexed(dfs[key]) for key in keys})}
+
+
+    def _execute_transaction(self, update_logic_func):
+        """
+        저장소에서 최신 시트를 읽어 update_logic_func(dfs)를 적용한 뒤 변경된 시트만 기록합니다.
+        update_logic_func는 (success, msg) 또는 (success, msg, 변경한 시트 키 목록)을 반환합니다.
+        시트 키 목록을 주지 않으면 원본과 비교하여 변경된 시트를 계산합니다.
+        커밋 직전에 다른 사용자가 먼저 저장한 것이 확인되면 최신 시트를 다시 읽어 update_logic_func를
+        다시 적용(rebase)합니다. 따라서 update_logic_func는 dfs 외의 상태에 누적되는 부작용이 없어야 합니다.
+        """
+        success, msg, committed = self._run_transaction(update_logic_func)
+        # 기록한 dfs를 그대로 메모리 데이터로 승격 (재로드 생략)
+        if committed is not None: self._swap_frames(*committed)
+        return success, msg
+
+    def _run_transaction(self, update_logic_func):
+        """
+        _execute_transaction()의 본체. 메모리 데이터는 바꾸지 않으므로 작업 스레드에서 호출할 수 있습니다.
+        반환: (success, msg, (전처리된 frames, stamp) 또는 None)
+        """
+        if not self.storage.exists():
+            return False, "엑셀 파일이 존재하지 않습니다.", None
+        mismatch = self._check_backend(self.storage)
+        if mismatch: return False, mismatch, None
+
+        for attempt in range(MAX_TRANSACTION_RETRIES):
+            token = None
+            try:
+                dfs, token = self.storage.begin()
+                dfs = TransactionFrames(dfs, stored=True)
+
+                result = update_logic_func(dfs)
+                success, msg = result[0], result[1]
+                if not success:
+                    self.storage.rollback(token)
+                    return False, msg, None
+
+                dirty = set(result[2]) if len(result) > 2 else None
+                # [NEW] 작업 중 append_log()로 모은 로그를 한 번에 붙임
+                if flush_logs(dfs) and dirty is not None: dirty.add("log")
+                base_stamp = self.storage.begin_signature(token)
+                stamp = self.storage.commit(dfs, token, dirty)
+                token = None
+
+                return True, "저장되었습니다.", (self._prepare_frames(dfs, stamp, dirty, base_stamp), stamp)
+
+            except ConflictError:
+                # [NEW] 다른 사용자의 커밋이 먼저 반영됨: 잠시 기다린 뒤 최신 데이터로 다시 적용
+                self._rollback_quietly(token)
+                time.sleep(backoff(attempt))
+            except LockTimeout as e:
+                self._rollback_quietly(token)
+                return False, f"다른 사용자가 저장 중입니다. 잠시 후 다시 시도해주세요.\n(사용 중: {e.owner})", None
+            except PermissionError:
+                self._rollback_quietly(token)
+                return False, "엑셀 파일이 열려있습니다. 파일을 닫고 다시 시도해주세요.", None
+            except Exception as e:
+                self._rollback_quietly(token)
+                return False, f"트랜잭션 오류: {e}", None
+
+        return False, "다른 사용자의 저장과 계속 충돌하여 저장하지 못했습니다. 잠시 후 다시 시도해주세요.", None
+
+    # ==========================================================================
+    # [NEW] 쓰기 큐 (연속 편집을 한 트랜잭션으로 묶어 작업 스레드에서 기록)
+    # ==========================================================================
+    def process_write_results(self):
+        """UI 스레드에서 주기적으로 호출: 끝난 쓰기 배치를 메모리 데이터에 반영하고 콜백을 호출합니다."""
+        batches = self.write_queue.drain()
+        for committed, items, ops in batches:
+            # 기록이 끝난 낙관적 작업은 대기 목록에서 제외 (실패한 작업은 이로써 화면에서도 되돌려짐)
+            pending = [op for op in self._pending_ops if not any(op is done for done in ops)]
+            settled = len(pending) != len(self._pending_ops)
+            self._pending_ops = pending
+            if committed is not None: self._swap_frames(*committed)
+            elif settled: self._swap_frames(*self._confirmed)
+            for callback, (success, msg) in items:
+                if callback: callback(success, msg)
+        return bool(batches)
+
+    def _apply_ops(self, ops, dfs, isolate=None):
+        """
+        작업들을 차례로 dfs(TransactionFrames)에 적용합니다. 모아 둔 로그는 마지막에 한 번만 Log 시트에 붙입니다.
+        isolate=True(기본: 작업이 여러 개일 때)이면 작업마다 savepoint를 두어, 작업이 건드린 시트만 복사하고
+        실패한 작업의 변경만 되돌립니다. (원본 시트는 수정되지 않음)
+        반환: ([작업별 (success, msg)], 변경한 시트 키 집합 또는 None(알 수 없음))
+        """
+        if isolate is None: isolate = len(ops) > 1
+        results, dirty = [], set()
+        for op in ops:
+            if isolate: dfs.savepoint()
+            try: result = op(dfs)
+            except Exception as e: result = (False, f"트랜잭션 오류: {e}")
+            if result[0]:
+                dirty = dirty | set(result[2]) if dirty is not None and len(result) > 2 else None
+                if isolate: dfs.release()
+            elif isolate:
+                dfs.rollback()
+            results.append((result[0], result[1]))
+        if any(ok for ok, _ in results) and flush_logs(dfs) and dirty is not None: dirty.add("log")
+        return results, dirty
+
+    # [NEW] 비동기 저장: 화면에는 바로 반영하고 기록은 쓰기 큐에서
+    def save_async(self, update_logic_func, on_failure=None, on_success=None):
+        """
+        update_logic_func를 메모리 데이터 사본에 먼저 적용하여 화면에 바로 반영(낙관적 갱신)하고,
+        저장소 기록은 쓰기 큐에서 진행합니다. 함수는 기록 시 최신 데이터로 다시 실행되므로 _execute_transaction()과 같은 규칙을 따릅니다.
+        메모리 사본에서 실패하면 아무것도 반영/기록하지 않고 (False, msg)를 반환합니다.
+        기록이 실패하면 낙관적 변경을 되돌리고 on_failure(msg)를, 기록되면 on_success()를 UI 스레드에서 호출합니다.
+        (함수는 여러 번 실행될 수 있으므로 파일 복사/위젯 상태 변경 같은 부수 효과는 on_success에서 처리)
+        """
+        dfs = TransactionFrames(self._get_frames())
+        results, dirty = self._apply_ops([update_logic_func], dfs, isolate=True)
+        success, msg = results[0]
+        if not success: return False, msg
+
+        keys = dfs.keys() if dirty is None else dirty
+        self._pending_ops.append(update_logic_func)
+        self._show_frames({**dfs, **preprocess_frames({key: dfs[key].reset_index(drop=True) for key in keys})})
+
+        def on_saved(success, msg):
+            if success and on_success: on_success()
+            elif not success and on_failure: on_failure(msg)
+        self.write_queue.submit(update_logic_func, on_saved)
+        return True, "저장 중입니다."
+
+    def _run_batch(self, ops):
+        """
+        작업 스레드: 여러 작업을 한 트랜잭션으로 적용합니다. 실패한 작업은 그 작업의 변경만 되돌리고 나머지는 기록합니다.
+        반환: ([작업별 (success, msg)], 커밋 결과 또는 None)
+        """
+        results = []
+
+        def batch_logic(dfs):
+            results[:], dirty = self._apply_ops(ops, dfs)
+            if not any(ok for ok, _ in results): return False, results[-1][1]
+            return (True, "") if dirty is None else (True, "", dirty)
+
+        success, msg, committed = self._run_transaction(batch_logic)
+        if not results: return [(False, msg)] * len(ops), None
+        # 기록 자체가 실패했으면 성공했던 작업도 실패로 보고
+        return [(ok and success, (msg if ok else m)) for ok, m in results], committed
+
+    def _rollback_quietly(self, token):
+        try: self.storage.rollback(token)
+        except Exception: pass
+
+
+def _range_indexed(df):
+    """인덱스가 이미 0..n-1이면 그대로, 아니면 reset_index(drop=True)한 DataFrame"""
+    index = df.index
+    if isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1: return df
+    return df.reset_index(drop=True)
+
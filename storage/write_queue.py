@@ -0,0 +1,56 @@
+import threading
+import time
+from collections import deque
+
+COALESCE_WINDOW = 0.3  # 초. 첫 작업 이후 이 시간 안에 들어온 작업을 한 트랜잭션으로 묶음
+
+
+class WriteQueue:
+    """
+    짧은 시간(window) 안에 연달아 들어온 쓰기 작업을 모아 작업 스레드에서 한 번의 읽기-수정-쓰기로 실행합니다.
+    run_batch(ops)는 작업 스레드에서 호출되며 ([작업별 (success, msg)], 커밋 결과 또는 None)을 반환합니다.
+    결과는 UI 스레드가 drain()으로 꺼내 처리합니다. (Tk 위젯은 UI 스레드에서만 다뤄야 하므로 콜백을 직접 부르지 않음)
+    """
+
+    def __init__(self, run_batch, window=COALESCE_WINDOW):
+        self.run_batch = run_batch
+        self.window = window
+        self._pending = []
+        self._done = deque()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, op, callback=None):
+        """op(dfs) -> (success, msg[, 변경한 시트 키 목록]) 작업을 예약합니다. callback(success, msg)은 drain() 때 호출됩니다."""
+        with self._lock:
+            self._pending.append((op, callback))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="data-writer", daemon=True)
+                self._thread.start()
+
+    def _worker(self):
+        while True:
+            time.sleep(self.window)
+            with self._lock:
+                batch, self._pending = self._pending, []
+                if not batch:
+                    self._thread = None
+                    return
+            try:
+                results, committed = self.run_batch([op for op, _ in batch])
+            except Exception as e:
+                results, committed = [(False, f"트랜잭션 오류: {e}")] * len(batch), None
+            self._done.append((committed, [(callback, result) for (_, callback), result in zip(batch, results)],
+                               [op for op, _ in batch]))
+
+    def drain(self):
+        """끝난 배치들의 [(커밋 결과, [(callback, (success, msg)), ...], [op, ...]), ...] (UI 스레드에서 호출)"""
+        batches = []
+        while self._done:
+            batches.append(self._done.popleft())
+        return batches
+
+    def join(self, timeout=None):
+        """남은 작업이 모두 기록될 때까지 기다립니다. (종료 시)"""
+        thread = self._thread
+        if thread is not None: thread.join(timeout)
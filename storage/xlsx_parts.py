@@ -0,0 +1,219 @@
+import copy
+import io
+import math
+import posixpath
+import re
+import struct
+import zipfile
+from datetime import date, datetime
+from xml.etree import ElementTree as ET
+
+import numpy as np
+import pandas as pd
+
+from storage.xlsx_styles import excel_serial, has_time, is_date_value
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+CALC_CHAIN_PART = "xl/calcChain.xml"
+SHARED_STRINGS_PART = "xl/sharedStrings.xml"
+
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_SHEET_DATA_RE = re.compile(rb"<sheetData\s*/>|<sheetData>.*</sheetData>", re.S)
+_DIMENSION_RE = re.compile(rb"<dimension\b[^>]*/>")
+_ROW_NUMBER_RE = re.compile(rb'<row\b[^>]*?\br="(\d+)"')
+_CELL_TAG_RE = re.compile(rb"<c\b([^>]*)>")
+_CELL_REF_RE = re.compile(rb'\br="([A-Z]+)(\d+)"')
+_CELL_STYLE_RE = re.compile(rb'\bs="(\d+)"')
+
+
+def read_sheet_part_map(zf):
+    """워크북의 {시트명: 파트 경로} 매핑을 반환합니다. (예: {"Data": "xl/worksheets/sheet2.xml"})"""
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {}
+    for rel in rels.findall(f"{{{NS_PKG_REL}}}Relationship"):
+        target = rel.get("Target", "")
+        if target.startswith("/"): target = target[1:]
+        else: target = posixpath.normpath(posixpath.join("xl", target))
+        targets[rel.get("Id")] = target
+
+    part_map = {}
+    for sheet in workbook.iter(f"{{{NS_MAIN}}}sheet"):
+        rid = sheet.get(f"{{{NS_REL}}}id")
+        if rid in targets: part_map[sheet.get("name")] = targets[rid]
+    return part_map
+
+
+def sheet_rels_part(part):
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, "_rels", name + ".rels")
+
+
+def column_letter(idx):
+    """0부터 시작하는 열 번호를 엑셀 열 문자로 변환합니다. (0 -> A)"""
+    letters = ""
+    idx += 1
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def column_index(letters):
+    """엑셀 열 문자를 0부터 시작하는 열 번호로 변환합니다. (A -> 0)"""
+    idx = 0
+    for ch in letters:
+        idx = idx * 26 + ord(ch) - 64
+    return idx - 1
+
+
+def sheet_cell_styles(xml):
+    """[NEW] 시트 XML에서 셀 서식(s=)이 있는 셀의 {행 번호: {열 번호: 서식 번호}}를 읽습니다."""
+    styles = {}
+    for attrs in _CELL_TAG_RE.findall(xml):
+        style = _CELL_STYLE_RE.search(attrs)
+        ref = _CELL_REF_RE.search(attrs) if style else None
+        if ref: styles.setdefault(int(ref.group(2)), {})[column_index(ref.group(1).decode())] = int(style.group(1))
+    return styles
+
+
+class RowStyles:
+    """
+    [NEW] 다시 쓰는 행의 셀 서식: 원본에 있던 행은 같은 위치 셀의 서식을 그대로 쓰고,
+    원본보다 아래에 새로 생기는 행은 원본 마지막 데이터 행의 서식을 이어 씁니다. (헤더 서식은 데이터 행에 넘기지 않음)
+    """
+
+    def __init__(self, xml, last_row):
+        self.styles = sheet_cell_styles(xml)
+        self.last_row = last_row
+        self.template = self.styles.get(last_row, {}) if last_row > 1 else {}
+
+    def __call__(self, row):
+        return self.styles.get(row, {}) if row <= self.last_row else self.template
+
+
+def _last_row_number(xml, end):
+    last = xml.rfind(b"<row", 0, end)
+    match = _ROW_NUMBER_RE.match(xml, last) if last >= 0 else None
+    return int(match.group(1)) if match else 0
+
+
+def _escape(text):
+    text = _ILLEGAL_XML_CHARS.sub("", text)
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _cell_xml(ref, val, style=None, cell_styles=None):
+    attr = "" if style is None else f' s="{style}"'
+    if val is None or val is pd.NA or val is pd.NaT: return f'<c r="{ref}"{attr}/>' if attr else ""
+    if isinstance(val, (bool, np.bool_)):
+        return f'<c r="{ref}"{attr} t="b"><v>{int(val)}</v></c>'
+    if isinstance(val, (int, float, np.integer, np.floating)):
+        if isinstance(val, (float, np.floating)) and not math.isfinite(val): return f'<c r="{ref}"{attr}/>' if attr else ""
+        return f'<c r="{ref}"{attr}><v>{repr(float(val)) if isinstance(val, (float, np.floating)) else int(val)}</v></c>'
+    if is_date_value(val) and cell_styles is not None:
+        # [수정] 날짜는 날짜 서식을 지정한 일련번호로 기록 (문자열로 바뀌지 않도록)
+        return f'<c r="{ref}" s="{cell_styles.date_style(style, has_time(val))}"><v>{excel_serial(val)}</v></c>'
+    if isinstance(val, (pd.Timestamp, datetime)):
+        text = val.strftime("%Y-%m-%d %H:%M:%S") if has_time(val) else val.strftime("%Y-%m-%d")
+    elif isinstance(val, date):
+        text = val.strftime("%Y-%m-%d")
+    else:
+        text = str(val)
+    space = ' xml:space="preserve"' if text != text.strip() else ""
+    return f'<c r="{ref}"{attr} t="inlineStr"><is><t{space}>{_escape(text)}</t></is></c>'
+
+
+def render_rows_xml(df, start_row, row_styles=None, cell_styles=None):
+    """
+    DataFrame 행들을 <row> XML 조각으로 변환합니다. (문자열은 공유 문자열 대신 inlineStr 사용)
+    row_styles(행 번호) -> {열 번호: 서식 번호}로 셀 서식을 유지하고, cell_styles(CellStyles)가 있으면 날짜를 일련번호로 씁니다.
+    """
+    letters = [column_letter(i) for i in range(len(df.columns))]
+    parts = []
+    for r, values in enumerate(df.itertuples(index=False, name=None), start=start_row):
+        styles = row_styles(r) if row_styles else {}
+        cells = "".join(_cell_xml(f"{letters[c]}{r}", v, styles.get(c), cell_styles) for c, v in enumerate(values))
+        parts.append(f'<row r="{r}">{cells}</row>')
+    return "".join(parts).encode("utf-8")
+
+
+def render_sheet_data(df, row_styles=None, cell_styles=None):
+    header = pd.DataFrame([list(map(str, df.columns))])
+    body = render_rows_xml(header, 1, row_styles) + render_rows_xml(df, 2, row_styles, cell_styles)
+    return b"<sheetData>" + body + b"</sheetData>"
+
+
+def dimension_xml(df):
+    last_col = column_letter(max(len(df.columns), 1) - 1)
+    return f'<dimension ref="A1:{last_col}{len(df) + 1}"/>'.encode("utf-8")
+
+
+def patch_sheet_xml(original, df, cell_styles=None):
+    """
+    기존 시트 XML에서 <sheetData>와 <dimension>만 교체합니다.
+    열 너비, 틀 고정 등 sheetData 밖의 설정과 셀 서식(헤더 굵게, 표시 형식 등)은 그대로 유지됩니다.
+    """
+    match = _SHEET_DATA_RE.search(original)
+    if not match: return None
+    row_styles = RowStyles(match.group(0), _last_row_number(match.group(0), len(match.group(0))))
+    patched = _SHEET_DATA_RE.sub(lambda _: render_sheet_data(df, row_styles, cell_styles), original, count=1)
+    if _DIMENSION_RE.search(patched):
+        patched = _DIMENSION_RE.sub(lambda _: dimension_xml(df), patched, count=1)
+    return patched
+
+
+def append_sheet_rows(original, df, start, cell_styles=None):
+    """
+    [NEW] 기존 시트 XML의 </sheetData> 앞에 df의 start번째 행부터만 이어 붙이고 <dimension>을 갱신합니다.
+    앞쪽 행이 그대로인 추가 전용 변경(Log 등)에서 기존 행 XML을 다시 만들지 않기 위한 것이며,
+    시트의 마지막 행 번호가 start + 1(헤더 포함)이 아니면 안전하게 붙일 수 없으므로 None을 반환합니다.
+    """
+    end = original.rfind(b"</sheetData>")
+    if end < 0: return None
+    if _last_row_number(original, end) != start + 1: return None
+
+    # 새 행은 마지막 행의 셀 서식을 이어 씀 (마지막 행만 읽음)
+    row_styles = RowStyles(original[original.rfind(b"<row", 0, end):end], start + 1)
+    patched = original[:end] + render_rows_xml(df.iloc[start:], start + 2, row_styles, cell_styles) + original[end:]
+    if _DIMENSION_RE.search(patched):
+        patched = _DIMENSION_RE.sub(lambda _: dimension_xml(df), patched, count=1)
+    return patched
+
+
+def _copy_raw_part(zin, zout, info):
+    """압축된 파트 바이트를 풀거나 다시 압축하지 않고 그대로 옮깁니다. (CRC/크기는 원본 값 사용)"""
+    zin.fp.seek(info.header_offset)
+    header = zin.fp.read(zipfile.sizeFileHeader)
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    zin.fp.seek(name_len + extra_len, 1)
+    raw = zin.fp.read(info.compress_size)
+
+    copied = copy.copy(info)
+    copied.flag_bits &= ~0x08  # CRC/크기를 로컬 헤더에 바로 기록 (data descriptor 없이)
+    copied.header_offset = zout.fp.tell()
+    zout.fp.write(copied.FileHeader())
+    zout.fp.write(raw)
+    zout.filelist.append(copied)
+    zout.NameToInfo[copied.filename] = copied
+    zout.start_dir = zout.fp.tell()
+    zout._didModify = True
+
+
+def rebuild_workbook(path, replacements):
+    """
+    원본 xlsx의 파트를 복사하면서 replacements({파트 경로: bytes})만 교체한 새 워크북 바이트를 만듭니다.
+    [수정] 바뀌지 않은 파트는 압축된 바이트를 그대로 복사 (커밋마다 전체 파트를 풀고 다시 압축하지 않음)
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(path) as zin, zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zout:
+        for info in zin.infolist():
+            data = replacements.get(info.filename)
+            if data is None:
+                _copy_raw_part(zin, zout, info)
+                continue
+            zout.writestr(info, data, compress_type=zipfile.ZIP_DEFLATED)
+    return buffer.getvalue()
@@ -0,0 +1,129 @@
+from datetime import date, datetime
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+# 선택 설치 (requirements.txt에 없음): pip install python-calamine
+# 설치되어 있으면 Rust 파서로 약 8배 빠르게 읽고, 없으면 openpyxl 스트리밍으로 같은 결과를 만듭니다.
+try:
+    from python_calamine import CalamineWorkbook
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+
+def _is_blank(val):
+    return val is None or val == ""
+
+
+def _mangle_names(header):
+    """헤더를 pandas.read_excel과 같은 규칙으로 컬럼명으로 만듭니다. (빈 헤더 -> 'Unnamed: n', 중복 -> 'X.1')"""
+    names, seen = [], {}
+    for i, val in enumerate(header):
+        name = f"Unnamed: {i}" if _is_blank(val) else val
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _typed_column(values, numeric):
+    """
+    열 값 리스트를 배열로 변환합니다. 스키마상 숫자 컬럼은 float64(정수뿐이면 int64)로 바로 채우고,
+    문자열 등이 섞여 있으면 다른 컬럼과 같이 pandas 추론에 맡깁니다. (원본 값은 바꾸지 않음)
+    """
+    if numeric:
+        try:
+            arr = np.array(values, dtype=np.float64)
+            if not np.isnan(arr).any() and (arr == np.floor(arr)).all() and np.abs(arr).max(initial=0) < 2 ** 53:
+                return arr.astype(np.int64)
+            return arr
+        except (TypeError, ValueError):
+            pass
+    # 빈 셀은 read_excel과 같이 NaN
+    return [np.nan if v is None else v for v in values]
+
+
+def rows_to_frame(rows, numeric_columns=()):
+    """
+    (헤더 행, 데이터 행...) 이터러블을 DataFrame으로 만듭니다.
+    행을 모아두지 않고 열별 리스트에 바로 쌓은 뒤, 열 단위로 타입을 정해 배열로 바꿉니다.
+    pandas.read_excel과 같이 완전히 빈 행과 끝쪽의 빈 열은 버립니다.
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None: return pd.DataFrame()
+
+    header = list(header)
+    columns = [[] for _ in header]
+    n_rows = 0
+    for row in rows:
+        if all(_is_blank(v) for v in row): continue
+        while len(columns) < len(row):
+            header.append(None)
+            columns.append([None] * n_rows)
+        for col, val in zip(columns, row):
+            col.append(val)
+        for col in columns[len(row):]:
+            col.append(None)
+        n_rows += 1
+
+    # 헤더도 값도 없는 끝쪽 열 제거
+    while columns and _is_blank(header[len(columns) - 1]) and all(_is_blank(v) for v in columns[-1]):
+        columns.pop()
+    if not columns: return pd.DataFrame()
+    names = _mangle_names(header[:len(columns)])
+    if not n_rows: return pd.DataFrame(columns=names)
+
+    numeric_columns = set(numeric_columns)
+    data = {}
+    for i, name in enumerate(names):
+        data[i] = _typed_column(columns[i], name in numeric_columns)
+        columns[i] = None  # 변환한 열의 원본 리스트는 바로 해제
+    return pd.DataFrame(data).set_axis(names, axis=1)
+
+
+def _calamine_value(val):
+    # calamine은 빈 셀을 "", 모든 숫자를 float, 시간 없는 날짜를 date로 돌려주므로 openpyxl과 같은 값으로 맞춤
+    if val == "": return None
+    if isinstance(val, float) and val.is_integer(): return int(val)
+    if type(val) is date: return datetime(val.year, val.month, val.day)
+    return val
+
+
+def _iter_calamine_sheets(path, sheets):
+    wb = CalamineWorkbook.from_path(path)
+    for name in sheets:
+        if name not in wb.sheet_names: continue
+        rows = wb.get_sheet_by_name(name).to_python(skip_empty_area=False)
+        yield name, ([_calamine_value(v) for v in row] for row in rows)
+
+
+def _iter_openpyxl_sheets(path, sheets):
+    # read_only + values_only: 셀 객체 없이 XML을 스트리밍하며 값 튜플만 생성
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for name in sheets:
+            if name not in wb.sheetnames: continue
+            ws = wb[name]
+            ws.reset_dimensions()  # 잘못 기록된 <dimension> 때문에 행이 잘리지 않도록 함
+            yield name, ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def read_xlsx_sheets(path, sheets, numeric_columns=None, engine=None):
+    """
+    워크북에서 sheets에 있는 시트만 읽어 {시트명: DataFrame}을 반환합니다. (없는 시트는 제외)
+    numeric_columns: {시트명: 숫자 컬럼 목록} (Config 스키마 기반 타입 지정)
+    engine: "calamine" | "openpyxl" | None(설치되어 있으면 calamine)
+    """
+    numeric_columns = numeric_columns or {}
+    if engine is None: engine = "calamine" if CALAMINE_AVAILABLE else "openpyxl"
+    iter_sheets = _iter_calamine_sheets if engine == "calamine" else _iter_openpyxl_sheets
+    return {name: rows_to_frame(rows, numeric_columns.get(name, ()))
+            for name, rows in iter_sheets(path, sheets)}
@@ -0,0 +1,116 @@
+import re
+from datetime import date, datetime
+from xml.etree import ElementTree as ET
+
+import pandas as pd
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format
+
+STYLES_PART = "xl/styles.xml"
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+DATE_FORMAT = "yyyy-mm-dd"
+DATETIME_FORMAT = "yyyy-mm-dd hh:mm:ss"
+FIRST_CUSTOM_NUMFMT = 164
+# 한국어 로캘에서 날짜/시간으로 표시되는 기본 서식 번호 (BUILTIN_FORMATS에는 없음)
+LOCALE_DATE_NUMFMTS = set(range(27, 37)) | set(range(50, 59))
+EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+
+_CELL_XFS_RE = re.compile(rb"<cellXfs\b[^>]*>(.*?)</cellXfs>", re.S)
+_XF_RE = re.compile(rb"<xf\b[^>]*?(?:/>|>.*?</xf>)", re.S)
+_NUMFMTS_RE = re.compile(rb"<numFmts\b[^>]*>.*?</numFmts>", re.S)
+_STYLESHEET_OPEN_RE = re.compile(rb"<styleSheet\b[^>]*>")
+_COUNT_RE = re.compile(rb'\bcount="\d+"')
+
+
+def excel_serial(val):
+    """datetime/date 값을 엑셀 날짜 일련번호(1899-12-30 기준 일수)로 변환합니다."""
+    ts = pd.Timestamp(val)
+    if ts.tzinfo is not None: ts = ts.tz_localize(None)
+    days = (ts - EXCEL_EPOCH) / pd.Timedelta(days=1)
+    return int(days) if days == int(days) else days
+
+
+def has_time(val):
+    if isinstance(val, (pd.Timestamp, datetime)):
+        return (val.hour, val.minute, val.second, val.microsecond) != (0, 0, 0, 0)
+    return False
+
+
+def is_date_value(val):
+    return isinstance(val, (pd.Timestamp, datetime, date)) and val is not pd.NaT
+
+
+def _set_attr(xml, name, value):
+    pattern = re.compile(rb"\b" + name + rb'="[^"]*"')
+    attr = name + b'="' + value + b'"'
+    if pattern.search(xml): return pattern.sub(attr, xml, count=1)
+    return xml.replace(b"<xf", b"<xf " + attr, 1)
+
+
+class CellStyles:
+    """
+    [NEW] styles.xml의 셀 서식(cellXfs)을 읽어 날짜 서식 여부를 판별하고, 날짜 셀에 쓸 서식 번호를 정합니다.
+    날짜 서식이 없는 셀 서식은 글꼴/테두리 등은 그대로 두고 표시 형식만 날짜로 바꾼 서식을 추가합니다.
+    (같은 서식이 이미 있으면 재사용하므로 커밋을 반복해도 서식이 늘어나지 않음)
+    ElementTree로 다시 직렬화하면 네임스페이스 선언이 바뀌어 엑셀이 파일을 복구하려 하므로, 추가는 원본 바이트에 직접 합니다.
+    """
+
+    def __init__(self, xml):
+        self.xml = xml
+        self.changed = False
+        self._date_styles = {}
+        root = ET.fromstring(xml)
+        self.formats = {int(f.get("numFmtId")): f.get("formatCode", "")
+                        for f in root.iter(f"{{{NS_MAIN}}}numFmt")}
+        match = _CELL_XFS_RE.search(xml)
+        self.xfs = _XF_RE.findall(match.group(1)) if match else []
+        cell_xfs = root.find(f"{{{NS_MAIN}}}cellXfs")
+        self._xf_numfmts = [] if cell_xfs is None else [int(xf.get("numFmtId", 0)) for xf in cell_xfs]
+
+    def is_date(self, style):
+        """셀 서식 번호가 날짜/시간 표시 형식인지"""
+        if style is None or not 0 <= style < len(self._xf_numfmts): return False
+        fmt_id = self._xf_numfmts[style]
+        if fmt_id in LOCALE_DATE_NUMFMTS: return True
+        code = self.formats.get(fmt_id, BUILTIN_FORMATS.get(fmt_id))
+        return bool(code) and is_date_format(code)
+
+    def date_style(self, style, with_time):
+        """날짜 값을 쓸 셀의 서식 번호 (원래 서식이 날짜 형식이면 그대로, 아니면 날짜 형식으로 바꾼 서식)"""
+        if self.is_date(style): return style
+        cache_key = (style, with_time)
+        if cache_key not in self._date_styles:
+            fmt_id = self._numfmt_id(DATETIME_FORMAT if with_time else DATE_FORMAT)
+            base = self.xfs[style] if style is not None and 0 <= style < len(self.xfs) else (self.xfs[0] if self.xfs else b"<xf/>")
+            xf = _set_attr(_set_attr(base, b"numFmtId", str(fmt_id).encode()), b"applyNumberFormat", b"1")
+            self._date_styles[cache_key] = self.xfs.index(xf) if xf in self.xfs else self._add_xf(xf, fmt_id)
+        return self._date_styles[cache_key]
+
+    def _numfmt_id(self, code):
+        for fmt_id, existing in self.formats.items():
+            if existing == code: return fmt_id
+        fmt_id = max([FIRST_CUSTOM_NUMFMT - 1, *self.formats]) + 1
+        entry = f'<numFmt numFmtId="{fmt_id}" formatCode="{code}"/>'.encode()
+        match = _NUMFMTS_RE.search(self.xml)
+        if match:
+            block = match.group(0).replace(b"</numFmts>", entry + b"</numFmts>")
+            block = _COUNT_RE.sub(f'count="{len(self.formats) + 1}"'.encode(), block, count=1)
+            self.xml = self.xml[:match.start()] + block + self.xml[match.end():]
+        else:
+            opening = _STYLESHEET_OPEN_RE.search(self.xml)
+            block = b'<numFmts count="1">' + entry + b"</numFmts>"
+            self.xml = self.xml[:opening.end()] + block + self.xml[opening.end():]
+        self.formats[fmt_id] = code
+        self.changed = True
+        return fmt_id
+
+    def _add_xf(self, xf, fmt_id):
+        match = _CELL_XFS_RE.search(self.xml)
+        if not match: raise ValueError("styles.xml에 cellXfs가 없습니다.")
+        block = match.group(0).replace(b"</cellXfs>", xf + b"</cellXfs>")
+        block = _COUNT_RE.sub(f'count="{len(self.xfs) + 1}"'.encode(), block, count=1)
+        self.xml = self.xml[:match.start()] + block + self.xml[match.end():]
+        self.xfs.append(xf)
+        self._xf_numfmts.append(fmt_id)
+        self.changed = True
+        return len(self.xfs) - 1
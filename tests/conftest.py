@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+
+
+@pytest.fixture
+def make_dm(tmp_path, monkeypatch):
+    """임시 폴더의 저장소를 쓰는 DataManager를 만듭니다. (사용자 설정/캐시 폴더는 건드리지 않음)"""
+    monkeypatch.setattr(Config, "CONFIG_FILENAME", str(tmp_path / "config.json"))
+    monkeypatch.setattr(Config, "CACHE_DIR", str(tmp_path / "cache"))
+    from data_manager import DataManager
+
+    def make(frames=None, backend="excel", name="SalesList"):
+        dm = DataManager()
+        dm.save_config(new_path=str(tmp_path / f"{name}.xlsx"), new_backend=backend)
+        if frames is not None:
+            dm.storage.write_frames(frames)
+            dm.load_data()
+        return dm
+    return make
+
+
+def data_rows(mgmt_nos, **values):
+    """관리번호 목록으로 Data 시트 행을 만듭니다. (나머지 컬럼은 '-')"""
+    rows = pd.DataFrame({col: ["-"] * len(mgmt_nos) for col in Config.DATA_COLUMNS})
+    rows["관리번호"] = list(mgmt_nos)
+    for col, val in values.items(): rows[col] = val
+    return rows
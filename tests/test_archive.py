@@ -0,0 +1,122 @@
+import glob
+import os
+
+import pandas as pd
+
+from config import Config
+from storage import ConflictError, SheetArchive
+from storage.archive import STALE_STAGE_SECONDS, ArchiveBatch
+from conftest import data_rows
+
+
+def _log(n, start="2020-01-01"):
+    ts = pd.date_range(start, periods=n, freq="D").strftime("%Y-%m-%d %H:%M:%S")
+    return pd.DataFrame({"일시": ts, "작업자": "u", "구분": "x", "상세내용": [f"항목 {i}" for i in range(n)]})
+
+
+def _archived_rows(dm, key="log"):
+    archive = SheetArchive(dm.storage.path)
+    return sum(len(archive.read_year(key, year)) for year in archive.years(key))
+
+
+def test_failed_commit_leaves_no_archive(make_dm, monkeypatch):
+    dm = make_dm({"data": data_rows(["Q-1"]), "log": _log(10)})
+
+    def fail(*args, **kwargs): raise OSError("disk full")
+    monkeypatch.setattr(dm.storage, "commit", fail)
+
+    success, _ = dm.clean_old_logs(days=30)
+
+    assert not success
+    archive = SheetArchive(dm.storage.path)
+    assert archive.read_index() == {} and _archived_rows(dm) == 0
+    assert not glob.glob(os.path.join(archive.dir, "*"))  # 임시 파일도 남지 않음
+    assert len(dm.storage.read_frames(["log"])["log"]) == 10
+
+
+def test_conflict_retry_archives_rows_once(make_dm, monkeypatch):
+    dm = make_dm({"data": data_rows(["Q-1"]), "log": _log(10)})
+    commit, calls = dm.storage.commit, []
+
+    def conflict_once(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1: raise ConflictError()
+        return commit(*args, **kwargs)
+    monkeypatch.setattr(dm.storage, "commit", conflict_once)
+
+    success, _ = dm.clean_old_logs(days=30)
+
+    assert success and len(calls) == 2
+    assert _archived_rows(dm) == 10
+    assert not glob.glob(os.path.join(SheetArchive(dm.storage.path).dir, "*.staged"))
+    assert dm.search_archived_logs("항목 3")["상세내용"].tolist() == ["항목 3"]
+
+
+def _crash_before_publish(monkeypatch):
+    # 워크북 커밋 직후 게시 전에 앱이 죽은 것처럼 (임시 파일만 남음)
+    def crash(self): raise OSError("app closed")
+    monkeypatch.setattr(ArchiveBatch, "publish", crash)
+
+
+def test_committed_staged_logs_are_recovered(make_dm, monkeypatch):
+    dm = make_dm({"data": data_rows(["Q-1"]), "log": _log(10)})
+    with monkeypatch.context() as m:
+        _crash_before_publish(m)
+        assert not dm.clean_old_logs(days=30)[0]
+    archive = SheetArchive(dm.storage.path)
+    assert archive.pending_batches() and _archived_rows(dm) == 0
+
+    assert dm.search_archived_logs("항목 3")["상세내용"].tolist() == ["항목 3"]
+    assert _archived_rows(dm) == 10 and not archive.pending_batches()
+    assert dm.recover_archive() == 0  # 다시 열어도 두 번 게시하지 않음
+
+
+def test_uncommitted_staged_logs_are_discarded_when_stale(make_dm):
+    dm = make_dm({"data": data_rows(["Q-1"]), "log": _log(10)})
+    archive = SheetArchive(dm.storage.path)
+    batch = archive.batch()
+    batch.stage("log", _log(5))  # 커밋 전에 중단된 묶음 (Log에 표시 없음)
+
+    assert dm.recover_archive() == 0 and archive.pending_batches()  # 진행 중일 수 있으므로 바로 지우지 않음
+    old = os.path.getmtime(batch.staged[0][2]) - STALE_STAGE_SECONDS - 60
+    os.utime(batch.staged[0][2], (old, old))
+    assert dm.recover_archive() == 0
+    assert not archive.pending_batches() and _archived_rows(dm) == 0
+
+
+def test_identical_log_rows_are_both_kept(make_dm):
+    # 같은 초에 같은 내용으로 남은 로그도 서로 다른 행이므로 하나로 합치지 않음
+    log = pd.concat([_log(3), _log(1)], ignore_index=True)
+    dm = make_dm({"data": data_rows(["Q-1"]), "log": log})
+    assert dm.clean_old_logs(days=30)[0]
+    assert _archived_rows(dm) == 4
+
+
+def test_rearchived_order_replaces_previous_rows(make_dm):
+    closed = Config.ARCHIVE_CLOSED_STATUS[0]
+    dm = make_dm({"data": data_rows(["Q-1", "Q-2"], Status=closed, 수주일="2020-03-01")})
+    assert dm.archive_closed_orders()[0]
+
+    # 같은 관리번호가 다시 들어와 다른 연도로 보관되면 보관소에는 새 행만 남음
+    def restore(dfs):
+        dfs["data"] = pd.concat([dfs["data"], data_rows(["Q-1"], Status=closed, 수주일="2021-05-01")], ignore_index=True)
+        return True, "", ["data"]
+    assert dm._execute_transaction(restore)[0]
+    assert dm.archive_closed_orders()[0]
+
+    archived = dm.archived_data()
+    assert sorted(archived["관리번호"]) == ["Q-1", "Q-2"]
+    assert SheetArchive(dm.storage.path).years("data", "Q-1") == [2021]
+
+
+def test_committed_staged_orders_are_recovered(make_dm, monkeypatch):
+    closed = Config.ARCHIVE_CLOSED_STATUS[0]
+    dm = make_dm({"data": data_rows(["Q-1", "Q-2"], Status=closed, 수주일="2020-03-01")})
+    with monkeypatch.context() as m:
+        _crash_before_publish(m)
+        assert not dm.archive_closed_orders()[0]
+    assert dm.storage.read_frames(["data"])["data"].empty
+
+    # 다음에 보관 주문을 찾을 때 커밋된 묶음을 게시해서 주문이 사라지지 않음
+    assert sorted(dm.get_rows("data", ["Q-1", "Q-2"], include_archive=True)["관리번호"]) == ["Q-1", "Q-2"]
+    assert not SheetArchive(dm.storage.path).pending_batches()
@@ -0,0 +1,39 @@
+import glob
+import os
+import sqlite3
+
+import pandas as pd
+
+from conftest import data_rows
+
+
+def test_backup_copies_current_storage(make_dm):
+    dm = make_dm({"data": data_rows(["Q-1", "Q-2"])}, backend="sqlite")
+    success, _ = dm.create_backup()
+    assert success
+
+    backups = glob.glob(os.path.join(os.path.dirname(dm.storage.path), "backup", "SalesList.db_*.bak"))
+    assert len(backups) == 1
+    conn = sqlite3.connect(backups[0])
+    try: assert conn.execute('SELECT COUNT(*) FROM "data"').fetchone()[0] == 2
+    finally: conn.close()
+
+
+def test_mismatched_backend_is_refused(make_dm):
+    excel_dm = make_dm({"data": data_rows(["Q-1"])})
+    other = make_dm(backend="sqlite")
+
+    success, msg = other.load_data()
+    assert not success and "excel" in msg
+    assert not os.path.exists(other.storage.path)  # 엑셀 내용을 몰래 이관하지 않음
+
+    # 전환하면 엑셀 쪽 사용자는 더 이상 저장하지 못함
+    assert other.switch_backend("sqlite")[0]
+    assert other.load_data()[0] and other.df_data["관리번호"].tolist() == ["Q-1"]
+
+    def touch(dfs):
+        dfs["data"] = pd.concat([dfs["data"], data_rows(["Q-2"])], ignore_index=True)
+        return True, "", ["data"]
+    success, msg = excel_dm._execute_transaction(touch)
+    assert not success and "sqlite" in msg
+    assert excel_dm.storage.read_frames(["data"])["data"]["관리번호"].tolist() == ["Q-1"]
@@ -0,0 +1,34 @@
+import pandas as pd
+
+from conftest import data_rows
+
+
+def _add_qty(mgmt_no, runs=None):
+    def op(dfs):
+        if runs is not None: runs.append(1)
+        data = dfs["data"]
+        mask = data["관리번호"] == mgmt_no
+        data.loc[mask, "수량"] = pd.to_numeric(data.loc[mask, "수량"]) + 1
+        return True, "", ["data"]
+    return op
+
+
+def test_stale_transaction_is_retried_on_latest_data(make_dm):
+    dm = make_dm({"data": data_rows(["Q-1", "Q-2"], 수량=1)})
+    other = make_dm()
+    other.load_data()
+
+    begin, runs = dm.storage.begin, []
+
+    def begin_then_other_commits():
+        frames, token = begin()
+        if not runs: assert other._execute_transaction(_add_qty("Q-1"))[0]  # 읽은 직후 다른 사용자가 먼저 저장
+        return frames, token
+    dm.storage.begin = begin_then_other_commits
+
+    success, _ = dm._execute_transaction(_add_qty("Q-1", runs))
+
+    assert success and len(runs) == 2  # 충돌 후 최신 데이터로 다시 적용
+    data = dm.storage.read_frames(["data"])["data"]
+    assert data["수량"].tolist() == [3, 1]
+    assert dm.df_data["수량"].tolist() == [3, 1]
@@ -0,0 +1,139 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from engines import apply_deliveries, item_keys
+from conftest import data_rows
+
+SHIPPED = {"출고일": "2024-03-01", "송장번호": "INV-1", "운송방법": "택배", "운송장경로": "-"}
+RECORD = {"일시": "2024-03-01 10:00:00", "출고번호": "C240301-001", "출고일": "2024-03-01", "송장번호": "INV-1",
+          "운송방법": "택배", "작업자": "tester", "비고": "일괄 납품 처리"}
+NUMERIC = ["수량", "단가", "세율(%)", "공급가액", "세액", "합계금액", "미수금액"]
+
+
+def _legacy_deliver(dfs, update_requests):
+    # 일괄 적용 이전 DeliveryPopup.save의 품목 단위 루프 (비교 기준, 입력값은 위 상수로 고정)
+    new_delivery_records = []
+    for req in update_requests:
+        idx = req["idx"]
+        if idx not in dfs["data"].index: continue
+
+        row_data = dfs["data"].loc[idx]
+        db_qty = float(str(row_data["수량"]).replace(",", "") or 0)
+        deliver_qty = min(req["deliver_qty"], db_qty)
+
+        new_delivery_records.append({
+            **RECORD, "관리번호": row_data.get("관리번호", ""), "품목명": row_data.get("품목명", ""),
+            "시리얼번호": req["serial_no"], "출고수량": deliver_qty,
+        })
+
+        is_full = abs(deliver_qty - db_qty) < 0.000001
+        new_status = "완료" if row_data.get("Status") == "납품대기/입금완료" else "납품완료/입금대기"
+        price = float(str(row_data.get("단가", 0)).replace(",", "") or 0)
+        tax_rate = float(str(row_data.get("세율(%)", 0)).replace(",", "") or 0) / 100
+
+        if is_full:
+            dfs["data"].at[idx, "Status"] = new_status
+            for col, val in SHIPPED.items(): dfs["data"].at[idx, col] = val
+            dfs["data"].at[idx, "미수금액"] = float(str(row_data.get("합계금액", 0)).replace(",", ""))
+        else:
+            remain_qty = db_qty - deliver_qty
+            supply = remain_qty * price
+            tax = supply * tax_rate
+            dfs["data"].at[idx, "수량"] = remain_qty
+            dfs["data"].at[idx, "공급가액"] = supply
+            dfs["data"].at[idx, "세액"] = tax
+            dfs["data"].at[idx, "합계금액"] = supply + tax
+            dfs["data"].at[idx, "미수금액"] = supply + tax
+
+            new_supply = deliver_qty * price
+            new_tax = new_supply * tax_rate
+            new_row = row_data.copy()
+            new_row.update({"수량": deliver_qty, "공급가액": new_supply, "세액": new_tax, "합계금액": new_supply + new_tax,
+                            "미수금액": new_supply + new_tax, "Status": new_status, **SHIPPED})
+            dfs["data"] = pd.concat([dfs["data"], pd.DataFrame([new_row])], ignore_index=True)
+
+    if new_delivery_records:
+        dfs["delivery"] = pd.concat([dfs["delivery"], pd.DataFrame(new_delivery_records)], ignore_index=True)
+
+
+def _book():
+    # A: 같은 품목명 여러 행 (B-1/B-2는 키 컬럼 값까지 같은 행), C: 다른 주문, 수량/단가에 천 단위 구분 문자열
+    data = data_rows(["A", "A", "A", "B", "B", "C"],
+                     품목명=["밸브", "밸브", "펌프", "센서", "센서", "밸브"],
+                     모델명=["V-1", "V-2", "P-1", "S-1", "S-1", "V-1"],
+                     수량=[10, "1,200", 3, 5, 5, 2], 단가=[100, 5, "2,000", 30, 30, 100], 세율=0,
+                     Status=["납품대기/입금완료", "주문", "납품대기", "주문", "주문", "납품대기/입금완료"])
+    data["세율(%)"] = [10, 10, 0, 10, 10, 10]
+    data = data.drop(columns="세율")
+    supply = pd.to_numeric(data["수량"].astype(str).str.replace(",", "")) * pd.to_numeric(data["단가"].astype(str).str.replace(",", ""))
+    data["공급가액"] = supply
+    data["세액"] = supply * data["세율(%)"] / 100
+    data["합계금액"] = data["공급가액"] + data["세액"]
+    data["미수금액"] = 0
+    return {"data": data, "delivery": pd.DataFrame(columns=Config.DELIVERY_COLUMNS)}
+
+
+def _run_both(picks):
+    """picks: [(행 라벨, 출고수량, 시리얼)] -> (기존 루프 결과, 일괄 적용 결과, 처리된 품목)"""
+    legacy, batch = _book(), _book()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)  # 기존 루프의 빈 Delivery 시트 concat 경고
+        _legacy_deliver(legacy, [{"idx": idx, "deliver_qty": qty, "serial_no": sn} for idx, qty, sn in picks])
+
+    keys = item_keys(batch["data"])
+    requests = [{"key": keys[idx], "deliver_qty": qty, "serial_no": sn} for idx, qty, sn in picks]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        success, msg, delivered = apply_deliveries(batch, requests, SHIPPED, RECORD)
+    assert success, msg
+    return legacy, batch, delivered
+
+
+def _assert_same(legacy, batch):
+    for key, columns in (("data", Config.DATA_COLUMNS), ("delivery", Config.DELIVERY_COLUMNS)):
+        expected, actual = legacy[key].reindex(columns=columns), batch[key].reindex(columns=columns)
+        assert len(expected) == len(actual), key
+        for col in columns:
+            if col in NUMERIC or col == "출고수량":
+                np.testing.assert_allclose(pd.to_numeric(expected[col].astype(str).str.replace(",", "")).astype(float),
+                                           pd.to_numeric(actual[col].astype(str).str.replace(",", "")).astype(float),
+                                           err_msg=f"{key}.{col}")
+            else:
+                assert expected[col].astype(str).tolist() == actual[col].astype(str).tolist(), f"{key}.{col}"
+
+
+def test_full_and_partial_deliveries_match_item_loop():
+    # 완전 출고, 부분 출고, 잔여보다 많이 요청(잔여만큼 완전 출고)이 섞인 요청
+    picks = [(1, 200, "SN-1"), (0, 10, "SN-2"), (5, 5, "SN-3"), (2, 1.5, "-")]
+    legacy, batch, delivered = _run_both(picks)
+    _assert_same(legacy, batch)
+
+    # 부분 출고분은 요청 순서대로 끝에 새 행으로 추가
+    assert batch["data"]["수량"].tolist()[6:] == [200, 1.5]
+    assert delivered["출고수량"].tolist() == [200, 10, 2, 1.5]
+
+
+def test_repeated_item_rows_are_delivered_separately():
+    # 키 컬럼 값이 같은 두 행도 순번으로 구분되어 각각 처리
+    legacy, batch, delivered = _run_both([(4, 2, "SN-B2"), (3, 5, "SN-B1")])
+    _assert_same(legacy, batch)
+    assert delivered["시리얼번호"].tolist() == ["SN-B2", "SN-B1"]
+    assert batch["data"].loc[[3, 4], "Status"].tolist() == ["납품완료/입금대기", "주문"]
+    assert batch["data"].loc[4, "수량"] == 3
+
+
+def test_changed_target_row_is_refused():
+    dfs = _book()
+    keys = item_keys(dfs["data"])
+    dfs["data"].loc[3, "Status"] = "납품완료/입금대기"  # 다른 사용자가 먼저 납품 처리
+    before = dfs["data"].copy()
+
+    success, msg, delivered = apply_deliveries(dfs, [{"key": keys[4], "deliver_qty": 1, "serial_no": "-"}], SHIPPED, RECORD)
+
+    # 값이 같던 B-2 행은 이제 순번이 0이 되어 키가 달라지므로 거부하고 아무것도 바꾸지 않음
+    assert not success and msg and delivered is None
+    pd.testing.assert_frame_equal(dfs["data"], before)
+    assert dfs["delivery"].empty
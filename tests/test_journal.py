@@ -0,0 +1,69 @@
+import pandas as pd
+
+from config import Config
+import storage.journal as journal_module
+from storage.journal import committed_transactions
+from conftest import data_rows
+
+
+def _set_qty(dm, qty):
+    def op(dfs):
+        dfs["data"]["수량"] = qty
+        return True, "", ["data"]
+    assert dm._execute_transaction(op)[0]
+
+
+def test_checkpoint_check_reads_only_new_records(make_dm, monkeypatch):
+    monkeypatch.setattr(journal_module, "CHECKPOINT_EVERY", 3)
+    dm = make_dm({"data": data_rows(["Q-1"], 수량=1)})
+    other = make_dm()
+    other.load_data()
+    journal = dm.storage.journal
+
+    _set_qty(dm, 2)
+    checkpoint_id = journal.read_checkpoint()["id"]
+    _set_qty(other, 3)  # 다른 사용자의 커밋은 다음 점검 때 이어 읽음
+
+    offsets, read = [], journal.read
+    monkeypatch.setattr(journal, "read", lambda offset=0: offsets.append(offset) or read(offset))
+    digest = dm.storage.get_signature()["digest"]
+    assert not journal.needs_checkpoint(digest)
+    assert offsets and min(offsets) > 0
+    done, _ = committed_transactions(read()[1])
+    assert (journal._tail["commits"], journal._tail["stamp"]) == (len(done), done[-1]["stamp"]) == (2, digest)
+
+    # 저널 밖에서 워크북이 바뀌면 새 기준점
+    assert journal.needs_checkpoint("edited-in-excel")
+
+    _set_qty(dm, 4)
+    _set_qty(dm, 5)  # 커밋이 CHECKPOINT_EVERY개 쌓여 새 기준점에서 시작
+    header = journal.read_checkpoint()
+    assert header["id"] != checkpoint_id
+    assert len(committed_transactions(read()[1])[0]) == journal._tail["commits"] == 1
+    assert pd.to_numeric(dm.storage.read_frames(["data"])["data"]["수량"]).tolist() == [5]
+
+
+def test_journal_replay_matches_full_reload(make_dm):
+    dm = make_dm({"data": data_rows(["Q-1", "Q-2", "Q-3"], 수량=1, 수주일="2024-01-05")})
+    other = make_dm()
+    other.load_data()
+
+    def edit(dfs):
+        data = dfs["data"]
+        data.loc[data["관리번호"] == "Q-2", ["Status", "출고일"]] = ["완료", "2024-02-01"]
+        data = data[data["관리번호"] != "Q-1"]
+        dfs["data"] = pd.concat([data, data_rows(["Q-4"], 수량=5)], ignore_index=True)
+        dm.append_log(dfs, "수정", "변경")
+        return True, "", ["data"]
+    assert dm._execute_transaction(edit)[0]
+
+    # 저널로 이어 적용하는 경로만 쓰도록 시트 재파싱을 막음
+    def no_reread(*args, **kwargs): raise AssertionError("sheet re-read")
+    read_frames, other.storage.read_frames = other.storage.read_frames, no_reread
+    success, _, replayed = other.read_snapshot(full=False)
+    other.storage.read_frames = read_frames
+    assert success and replayed["keys"] == {"data", "log"}
+
+    _, _, reloaded = other.read_snapshot(full=True)
+    for key in Config.SHEET_SCHEMAS:
+        pd.testing.assert_frame_equal(replayed["frames"][key], reloaded["frames"][key])
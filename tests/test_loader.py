@@ -0,0 +1,37 @@
+import os
+
+import pandas as pd
+
+from data_manager import STALE_SNAPSHOT_MSG
+from storage import ExcelBackend
+from conftest import data_rows
+
+
+def test_snapshot_reader_leaves_first_import_to_prepare_storage(make_dm, tmp_path):
+    ExcelBackend(str(tmp_path / "SalesList.xlsx")).write_frames({"data": data_rows(["Q-1"])})
+    dm = make_dm(backend="sqlite")
+
+    # 로더 스레드에서 부르는 read_snapshot은 저장소를 만들거나 쓰지 않음
+    success, _, _ = dm.read_snapshot()
+    assert not success and not os.path.exists(dm.storage.path)
+
+    assert dm.prepare_storage() == (True, "")
+    success, _, snapshot = dm.read_snapshot()
+    assert success and snapshot["frames"]["data"]["관리번호"].tolist() == ["Q-1"]
+
+
+def test_load_reports_snapshot_discarded_as_stale(make_dm, monkeypatch):
+    dm = make_dm({"data": data_rows(["Q-1"])})
+    read_snapshot = dm.read_snapshot
+
+    def read_then_commit(full=True):
+        result = read_snapshot(full)
+        def add(dfs):
+            dfs["data"] = pd.concat([dfs["data"], data_rows(["Q-2"])], ignore_index=True)
+            return True, "", ["data"]
+        assert dm._execute_transaction(add)[0]  # 읽는 동안 커밋되어 스냅샷이 오래됨
+        return result
+    monkeypatch.setattr(dm, "read_snapshot", read_then_commit)
+
+    assert dm.load_data() == (False, STALE_SNAPSHOT_MSG)
+    assert dm.df_data["관리번호"].tolist() == ["Q-1", "Q-2"]
@@ -0,0 +1,62 @@
+import openpyxl
+import pandas as pd
+import pytest
+
+from config import Config
+from conftest import data_rows
+
+
+def _frames():
+    payment = pd.DataFrame({"일시": ["2024-01-05 10:00:00"], "관리번호": ["Q-1"], "입금액": [100]})
+    return {"data": data_rows(["Q-1", "Q-2"], 수량=1), "payment": payment.reindex(columns=Config.PAYMENT_COLUMNS)}
+
+
+def _set_qty(dfs):
+    dfs["data"].loc[dfs["data"]["관리번호"] == "Q-2", "수량"] = 7
+    return True, "", ["data"]
+
+
+@pytest.mark.parametrize("backend", ["excel", "sqlite"])
+def test_commit_keeps_untouched_frame_objects(make_dm, backend):
+    dm = make_dm(_frames(), backend=backend)
+    payment, memo, data = dm.df_payment, dm.df_memo, dm.df_data
+
+    assert dm._execute_transaction(_set_qty)[0]
+
+    # 커밋한 시트만 새 객체, 나머지는 그대로 (객체 기준 인덱스/번호 캐시 유지)
+    assert dm.df_data is not data and dm.df_data["수량"].tolist() == [1, 7]
+    assert dm.df_payment is payment and dm.df_memo is memo
+
+
+def test_commit_replaces_sheets_changed_by_others(make_dm):
+    dm = make_dm(_frames())
+    other = make_dm()
+    other.load_data()
+    payment = dm.df_payment
+
+    def add_payment(dfs):
+        dfs["payment"] = pd.concat([dfs["payment"], dfs["payment"]], ignore_index=True)
+        return True, "", ["payment"]
+    assert other._execute_transaction(add_payment)[0]
+    assert dm._execute_transaction(_set_qty)[0]
+
+    assert dm.df_payment is not payment and len(dm.df_payment) == 2
+
+
+def test_production_dates_are_applied_to_a_copy(make_dm, tmp_path):
+    dm = make_dm(_frames())
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    ws.append(["관리번호"] + ["-"] * 8)
+    ws.append(["Q-2"] + ["-"] * 7 + ["2024-06-30"])
+    wb.save(tmp_path / "prod.xlsx")
+    dm.production_request_path = str(tmp_path / "prod.xlsx")
+    confirmed, version = dm._confirmed_frames()["data"], dm.data_version
+
+    dm.sync_production_dates()
+
+    # 작업 스레드가 읽는 확정본은 그대로 두고 새 객체로 교체
+    assert dm.df_data is not confirmed and dm.data_version == version + 1
+    assert dm.df_data["출고예정일"].tolist() == ["-", "2024-06-30"]
+    assert confirmed["출고예정일"].tolist() == ["-", "-"]
@@ -0,0 +1,145 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from engines import apply_payment_plan, plan_payment, plan_records, recalc_payment_status_bulk
+from conftest import data_rows
+
+
+def _legacy_recalc(dfs, mgmt_no):
+    # 일괄 계산 이전의 행 단위 recalc_payment_status (비교 기준)
+    pay_df = dfs["payment"]
+    if pay_df.empty:
+        total_paid = 0
+        last_pay_date = "-"
+    else:
+        target_pays = pay_df[pay_df["관리번호"].astype(str) == str(mgmt_no)]
+        if not target_pays.empty:
+            target_pays = target_pays.sort_values(by="일시", ascending=False)
+            last_pay_date = target_pays.iloc[0]["일시"].split(" ")[0]
+        else:
+            last_pay_date = "-"
+        paid_series = target_pays["입금액"].astype(str).str.replace(",", "").replace("nan", "0")
+        total_paid = pd.to_numeric(paid_series, errors='coerce').sum()
+
+    data_df = dfs["data"]
+    indices = data_df[data_df["관리번호"] == mgmt_no].index
+    remaining_to_allocate = total_paid
+    for idx in indices:
+        val_str = str(data_df.at[idx, "합계금액"]).replace(",", "")
+        try: row_total = float(val_str)
+        except ValueError: row_total = 0
+
+        if remaining_to_allocate >= row_total:
+            allocated = row_total
+        else:
+            allocated = remaining_to_allocate
+            if allocated < 0: allocated = 0
+
+        data_df.at[idx, "기수금액"] = allocated
+        data_df.at[idx, "미수금액"] = row_total - allocated
+        remaining_to_allocate -= allocated
+
+        current_status = str(data_df.at[idx, "Status"])
+        if row_total - allocated < 1:
+            new_status = "완료" if "납품" in current_status or "완료" in current_status else "납품대기/입금완료"
+            data_df.at[idx, "입금완료일"] = last_pay_date
+        else:
+            new_status = "납품완료/입금완료" if current_status == "완료" else current_status
+        data_df.at[idx, "Status"] = new_status
+
+
+def _ledger():
+    # 다품목 주문, 음수(할인/반품) 행, 통화가 섞인 주문과 입금/환불 이력
+    data = data_rows(["A", "A", "A", "B", "B", "C", "D", "D", "E", "F"],
+                     통화=["KRW", "KRW", "KRW", "USD", "USD", "KRW", "USD", "KRW", "KRW", "EUR"],
+                     합계금액=["1,000", 2000, 500, 300.5, -50, 700, 100, 100, 400, 250],
+                     Status=["주문", "납품완료/입금대기", "완료", "납품대기", "주문",
+                             "완료", "납품대기/입금완료", "납품완료/입금대기", "완료", "주문"])
+    data[["기수금액", "미수금액"]] = 0.0
+    payment = pd.DataFrame({
+        "일시": ["2024-01-05 10:00:00", "2024-02-01 09:00:00", "2024-01-10 12:00:00", "2024-03-01 08:00:00",
+               "2024-01-15 11:00:00", "2024-01-20 11:00:00", "2024-04-02 15:00:00", "2024-02-11 10:00:00"],
+        "관리번호": ["A", "A", "B", "C", "C", "D", "D", "F"],
+        "구분": ["입금"] * 8,
+        "입금액": [1500, "1,200", 250.5, 900, -200, 80, 120, 100],
+        "통화": ["KRW", "KRW", "USD", "KRW", "KRW", "USD", "KRW", "EUR"],
+    })
+    return {"data": data, "payment": payment}
+
+
+def _compare(expected, actual):
+    cols = ["기수금액", "미수금액"]
+    np.testing.assert_allclose(expected[cols].astype(float), actual[cols].astype(float))
+    for col in ["Status", "입금완료일"]:
+        assert expected[col].astype(str).tolist() == actual[col].astype(str).tolist(), col
+
+
+def test_bulk_recalc_matches_row_loop():
+    legacy, bulk = _ledger(), _ledger()
+    mgmt_nos = ["A", "B", "C", "D", "E", "F"]
+    for mgmt_no in mgmt_nos: _legacy_recalc(legacy, mgmt_no)
+    recalc_payment_status_bulk(bulk, mgmt_nos)
+    _compare(legacy["data"], bulk["data"])
+
+
+def test_bulk_recalc_only_touches_requested_numbers():
+    legacy, bulk = _ledger(), _ledger()
+    _legacy_recalc(legacy, "B")
+    _legacy_recalc(legacy, "D")
+    recalc_payment_status_bulk(bulk, ["D", "B"])
+    _compare(legacy["data"], bulk["data"])
+
+
+def test_payment_plan_appends_records_without_concat_warning():
+    dfs = _ledger()
+    dfs["payment"] = dfs["payment"].iloc[0:0].assign(비고=None)  # 입금 이력이 없는 새 장부
+    plan = plan_payment(dfs, ["E"], 400)
+    records = [dict(r, 일시="2024-05-01 10:00:00", 비고=None) for r in plan_records(plan)]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        assert apply_payment_plan(dfs, plan, records) == (True, "")
+        assert apply_payment_plan(dfs, plan_payment(dfs, ["A"], 800),
+                                  [{"관리번호": "A", "입금액": 800, "일시": "2024-05-02 10:00:00", "비고": "x"}])[0]
+
+    assert dfs["payment"]["관리번호"].tolist() == ["E", "A"]
+    row = dfs["data"][dfs["data"]["관리번호"] == "E"].iloc[0]
+    assert row["미수금액"] == 0 and row["입금완료일"] == "2024-05-01"
+
+
+def _reconcile_book():
+    # OLD: Payment 시트 도입 전에 끝난 주문 (입금 이력 없음), NEW: 입금 이력이 있는 주문
+    data = data_rows(["OLD", "NEW", "NEW"], 합계금액=[1000, 300, 200], 기수금액=[1000, 300, 200],
+                     미수금액=[0, 0, 0], 입금완료일="2019-05-01", Status=["완료", "완료", "완료"])
+    payment = pd.DataFrame({"일시": ["2024-01-05 10:00:00"], "관리번호": ["NEW"], "구분": ["입금"], "입금액": [300]})
+    return {"data": data, "payment": payment.reindex(columns=Config.PAYMENT_COLUMNS),
+            "log": pd.DataFrame(columns=Config.LOG_COLUMNS)}
+
+
+def test_reconcile_skips_orders_without_payment_history(make_dm):
+    dm = make_dm(_reconcile_book())
+
+    success, msg, report = dm.reconcile_payments()
+    assert success and "OLD" in msg
+    assert set(report["관리번호"]) == {"NEW"}
+
+    success, msg, report = dm.reconcile_payments(apply=True)
+    assert success and "OLD" in msg
+    data = dm.storage.read_frames(["data"])["data"]
+    old = data[data["관리번호"] == "OLD"].iloc[0]
+    assert (old["Status"], float(old["미수금액"]), str(old["입금완료일"])) == ("완료", 0, "2019-05-01")
+    # 미수금이 남은 완료 건은 납품완료/입금대기로 되돌리고, 다시 점검하면 불일치가 없음
+    assert data.loc[data["관리번호"] == "NEW", "Status"].tolist() == ["완료", "납품완료/입금대기"]
+    assert dm.reconcile_payments()[2].empty
+
+
+def test_payment_save_keeps_status_rules():
+    # 입금 저장(재계산)은 정합성 점검용 규칙이 아니라 기존 규칙을 그대로 따름
+    dfs = _reconcile_book()
+    dfs["data"]["Status"] = ["완료", "완료", "납품대기/입금완료"]
+    dfs["payment"].loc[0, "입금액"] = 500
+    recalc_payment_status_bulk(dfs, ["OLD", "NEW"])
+    assert dfs["data"]["Status"].tolist() == ["납품완료/입금완료", "완료", "완료"]
@@ -0,0 +1,33 @@
+import pandas as pd
+
+from conftest import data_rows
+
+
+def test_stored_run_sees_number_claimed_at_commit(make_dm):
+    dm = make_dm({"data": data_rows(["Q240101-001"])})
+    other = make_dm()
+    other.load_data()
+    dm.write_queue.window = 1.0  # 기록 전에 다른 사용자가 먼저 저장할 시간을 둠
+    wanted = dm.generate_mgmt_no("Q")
+    claimed, saved = {}, []
+
+    def register(dfs):
+        mgmt_no = dm.claim_id(dfs, "data", wanted)
+        if dfs.stored: claimed["stored"] = mgmt_no
+        else: claimed.setdefault("shown", mgmt_no)
+        dfs["data"] = pd.concat([dfs["data"], data_rows([mgmt_no])], ignore_index=True)
+        return True, "", ["data"]
+
+    def add_same_number(dfs):
+        dfs["data"] = pd.concat([dfs["data"], data_rows([wanted])], ignore_index=True)
+        return True, "", ["data"]
+
+    assert dm.save_async(register, on_success=lambda: saved.append(1))[0]
+    assert claimed == {"shown": wanted}  # 화면에만 반영한 낙관적 실행
+    assert other._execute_transaction(add_same_number)[0]
+    dm.write_queue.join(timeout=30)
+    dm.process_write_results()
+
+    # 기록 시점에는 다른 사용자가 쓴 번호를 피해 다음 번호로 확정됨
+    assert saved and claimed["stored"] != wanted
+    assert sorted(dm.df_data["관리번호"]) == sorted(["Q240101-001", wanted, claimed["stored"]])
@@ -0,0 +1,96 @@
+import zipfile
+from datetime import datetime
+
+import openpyxl
+import pandas as pd
+from openpyxl.styles import Font
+
+from config import Config
+from storage import ExcelBackend
+
+
+def _make_workbook(path):
+    backend = ExcelBackend(str(path))
+    data = pd.DataFrame({col: ["-", "-"] for col in Config.DATA_COLUMNS})
+    data["관리번호"] = ["Q-1", "Q-2"]
+    data["수량"] = [1, 2]
+    data["수주일"] = [datetime(2024, 1, 5), datetime(2024, 2, 6)]
+    backend.write_frames({"data": data})
+
+    # 헤더는 굵게, 수량은 천 단위 구분, 수주일은 날짜 서식
+    wb = openpyxl.load_workbook(path)
+    ws = wb[Config.SHEET_DATA]
+    qty_col = Config.DATA_COLUMNS.index("수량") + 1
+    date_col = Config.DATA_COLUMNS.index("수주일") + 1
+    for cell in ws[1]: cell.font = Font(bold=True)
+    for row in (2, 3):
+        ws.cell(row, qty_col).number_format = "#,##0"
+        ws.cell(row, date_col).number_format = "yyyy/mm/dd"
+    wb.save(path)
+    return backend, qty_col, date_col
+
+
+def test_patch_keeps_cell_types_and_formats(tmp_path):
+    path = tmp_path / "SalesList.xlsx"
+    backend, qty_col, date_col = _make_workbook(path)
+
+    frames, token = backend.begin()
+    data = frames["data"]
+    data.loc[0, "수량"] = 5
+    data.loc[0, "출고일"] = pd.Timestamp("2024-03-01 14:30:00")  # 날짜 서식이 없던 셀
+    new_row = data.iloc[[1]].assign(관리번호="Q-3", 수량=7, 수주일=pd.Timestamp("2024-04-07"))
+    frames["data"] = pd.concat([data, new_row], ignore_index=True)
+    backend.commit(frames, token, {"data"})
+
+    ws = openpyxl.load_workbook(path)[Config.SHEET_DATA]
+    assert all(cell.font.bold for cell in ws[1] if cell.value is not None)
+    assert ws.cell(2, qty_col).value == 5 and ws.cell(2, qty_col).number_format == "#,##0"
+
+    for row, expected in ((2, datetime(2024, 1, 5)), (4, datetime(2024, 4, 7))):
+        cell = ws.cell(row, date_col)
+        assert cell.is_date and cell.value == expected and cell.number_format == "yyyy/mm/dd"
+
+    # 새 행은 마지막 행의 서식을 이어 씀 (헤더의 굵은 글꼴은 넘어가지 않음)
+    assert ws.cell(4, qty_col).number_format == "#,##0" and not ws.cell(4, qty_col).font.bold
+
+    shipped = ws.cell(2, Config.DATA_COLUMNS.index("출고일") + 1)
+    assert shipped.is_date and shipped.value == datetime(2024, 3, 1, 14, 30)
+
+    # 다시 읽어도 날짜는 날짜, 숫자는 숫자
+    reloaded = backend.read_frames(["data"])["data"]
+    assert reloaded["수주일"].tolist()[:3] == [pd.Timestamp("2024-01-05"), pd.Timestamp("2024-02-06"), pd.Timestamp("2024-04-07")]
+    assert reloaded["수량"].tolist() == [5, 2, 7]
+
+
+def test_repeated_commits_reuse_added_date_style(tmp_path):
+    path = tmp_path / "SalesList.xlsx"
+    backend, _, _ = _make_workbook(path)
+    style_counts = []
+    for day in (1, 2):
+        frames, token = backend.begin()
+        frames["data"].loc[0, "출고일"] = pd.Timestamp(f"2024-03-0{day} 09:00:00")
+        backend.commit(frames, token, {"data"})
+        with zipfile.ZipFile(path) as zf:
+            style_counts.append(zf.read("xl/styles.xml").count(b"<xf "))
+    assert style_counts[0] == style_counts[1]
+
+
+def test_commit_copies_untouched_parts_without_recompressing(tmp_path):
+    path = tmp_path / "SalesList.xlsx"
+    backend, _, _ = _make_workbook(path)
+    with zipfile.ZipFile(path) as zf:
+        before = {info.filename: (info.CRC, info.compress_size) for info in zf.infolist()}
+
+    frames, token = backend.begin()
+    frames["data"].loc[0, "수량"] = 9
+    backend.commit(frames, token, {"data"})
+
+    with zipfile.ZipFile(path) as zf:
+        assert zf.testzip() is None
+        after = {info.filename: (info.CRC, info.compress_size) for info in zf.infolist()}
+        data_part = next(name for name in after if after[name] != before[name])
+        assert b"<sheetData" in zf.read(data_part)
+    # 바뀐 시트 파트 하나만 새로 압축되고 나머지는 원본 압축 바이트 그대로
+    assert list(after) == list(before)
+    assert [name for name in after if after[name] != before[name]] == [data_part]
+    assert backend.read_frames(["data"])["data"]["수량"].tolist() == [9, 2]
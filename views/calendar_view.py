@@ -253,12 +253,16 @@ class CalendarView(ctk.CTkFrame):
 
             if target_date and mgmt_no and target_date != origin_date:
                 # 날짜 업데이트
-                df = self.dm.df_data
-                mask = df["관리번호"] == mgmt_no
-                if mask.any():
-                    self.dm.df_data.loc[mask, "출고예정일"] = target_date
-                    # 사이드바에서 드래그했다면 상태 변경 (납품대기 -> 생산중 등) 고려 가능하나 여기선 날짜만
-                    self.dm.save_to_excel()
+                # 사이드바에서 드래그했다면 상태 변경 (납품대기 -> 생산중 등) 고려 가능하나 여기선 날짜만
+                def update_logic(dfs):
+                    mask = dfs["data"]["관리번호"] == mgmt_no
+                    if not mask.any(): return False, "데이터 없음"
+                    dfs["data"].loc[mask, "출고예정일"] = target_date
+                    return True, "", ["data"]
+
+                # [수정] 일정은 바로 옮기고 기록은 쓰기 큐에서 (연속 드래그는 한 번에 기록, 실패하면 되돌림)
+                success, _ = self.dm.save_async(update_logic, lambda msg: messagebox.showerror("저장 실패", f"번호 [{mgmt_no}] 일정 변경을 저장하지 못해 되돌렸습니다.\n{msg}"))
+                if success:
                     self.refresh_data()
         
         self.drag_started = False
@@ -86,10 +86,10 @@ class DashboardView(ctk.CTkFrame):
         self.list_scroll.pack(fill="both", expand=True, padx=10, pady=(0, 10))
 
     def refresh_data(self):
-        # [Fix] 원본 데이터 보존을 위해 copy() 사용
-        df = self.dm.df_data.copy() if not self.dm.df_data.empty else None
+        # 읽기 전용으로만 사용 (날짜 계산은 dm.typed_data() 사용)
+        df = self.dm.df_data
 
-        if df is None or df.empty:
+        if df.empty:
             self._update_empty_state()
             return
 
@@ -107,13 +107,10 @@ class DashboardView(ctk.CTkFrame):
     def _update_kpi_cards(self, df):
         now = datetime.now()
         
-        # [Fix] '입금완료일' 컬럼이 있는지 확인
-        if '입금완료일' not in df.columns:
-            df['입금완료일'] = pd.NaT
-            
-        df['입금완료일_dt'] = pd.to_datetime(df['입금완료일'], errors='coerce', format='mixed')
+        # 데이터 버전별로 한 번만 파싱된 날짜 컬럼 사용
+        paid_date = self.dm.typed_data()['입금완료일']
         
-        mask_month = (df['입금완료일_dt'].dt.year == now.year) & (df['입금완료일_dt'].dt.month == now.month)
+        mask_month = (paid_date.dt.year == now.year) & (paid_date.dt.month == now.month)
         mask_complete = df['Status'].astype(str).str.contains("완료")
         
         revenue_df = df[mask_month & mask_complete]
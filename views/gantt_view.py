@@ -38,23 +38,17 @@ class GanttView(ctk.CTkFrame):
             self.canvas.get_tk_widget().destroy()
             self.canvas = None
 
-        df = self.dm.df_data
-        if df.empty: return
+        # [수정] 공유 typed_data()를 사용하고 dm.df_data는 수정하지 않음
+        typed = self.dm.typed_data()
+        if typed.empty: return
 
-        # 날짜 데이터 전처리
-        # [수정] format='mixed' 추가하여 경고 해결
-        df['start'] = pd.to_datetime(df['수주일'], errors='coerce', format='mixed')
         # 수주일이 없으면 견적일로 대체
-        df['start'] = df['start'].fillna(pd.to_datetime(df['견적일'], errors='coerce', format='mixed'))
-        
-        # [수정] format='mixed' 추가
-        df['end'] = pd.to_datetime(df['출고예정일'], errors='coerce', format='mixed')
+        start = typed['수주일'].fillna(typed['견적일'])
         
         # 유효한 날짜가 있는 데이터만 필터링 (완료/취소 제외하고 진행중인 것 위주)
-        mask = df['start'].notna() & (~df['Status'].isin(['완료', '취소', '보류']))
-        target_df = df[mask].copy()
-        
-        if target_df.empty: return
+        mask = start.notna() & (~typed['Status'].isin(['완료', '취소', '보류']))
+        if not mask.any(): return
+        target_df = typed[mask].assign(start=start[mask], end=typed.loc[mask, '출고예정일'])
         
         # 종료일 없는 경우 임시 채움
         mask_no_end = target_df['end'].isna()
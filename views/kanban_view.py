@@ -1,7 +1,7 @@
 import tkinter as tk
+from tkinter import messagebox
 
 import customtkinter as ctk
-import pandas as pd
 
 from styles import COLORS, FONT_FAMILY, FONTS
 
@@ -184,12 +184,12 @@ class KanbanView(ctk.CTkFrame):
                     mask = dfs["data"]["관리번호"] == mgmt_no
                     if mask.any():
                         dfs["data"].loc[mask, "Status"] = new_status
-                        new_log = self.dm._create_log_entry(f"상태변경({new_status})", f"번호 [{mgmt_no}] - 칸반 이동")
-                        dfs["log"] = pd.concat([dfs["log"], pd.DataFrame([new_log])], ignore_index=True)
-                        return True, ""
+                        self.dm.append_log(dfs, f"상태변경({new_status})", f"번호 [{mgmt_no}] - 칸반 이동")
+                        return True, "", ["data", "log"]
                     return False, "데이터 없음"
 
-                success, _ = self.dm._execute_transaction(update_logic)
+                # [수정] 카드는 바로 옮기고 기록은 쓰기 큐에서 (연속 드래그는 한 번에 기록, 실패하면 되돌림)
+                success, _ = self.dm.save_async(update_logic, lambda msg: messagebox.showerror("저장 실패", f"번호 [{mgmt_no}] 상태 변경을 저장하지 못해 되돌렸습니다.\n{msg}"))
                 if success:
                     self.refresh_data()
         
@@ -1,7 +1,6 @@
 import tkinter as tk
 from datetime import datetime
 from tkinter import messagebox, simpledialog, ttk
-import pandas as pd
 
 import customtkinter as ctk
 
@@ -172,8 +171,7 @@ class OrderView(ctk.CTkFrame):
                     
                     dfs["data"].loc[mask, "Status"] = new_status
                     
-                    new_log = self.dm._create_log_entry(f"상태변경({new_status})", f"번호 [{mgmt_no}] - 일괄 처리")
-                    dfs["log"] = pd.concat([dfs["log"], pd.DataFrame([new_log])], ignore_index=True)
+                    self.dm.append_log(dfs, f"상태변경({new_status})", f"번호 [{mgmt_no}] - 일괄 처리")
                     return True, ""
                 return False, "데이터를 찾을 수 없습니다."
 
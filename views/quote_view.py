@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import messagebox, ttk
 from datetime import datetime
 
-import pandas as pd
 import customtkinter as ctk
 
 from config import Config
@@ -206,8 +205,7 @@ class QuoteView(ctk.CTkFrame):
                 dfs["data"].loc[mask, "수주일"] = datetime.now().strftime("%Y-%m-%d")
                 
                 log_msg = f"주문 확정: 번호 [{mgmt_no}] (견적 -> 주문)"
-                new_log = self.dm._create_log_entry("상태변경", log_msg)
-                dfs["log"] = pd.concat([dfs["log"], pd.DataFrame([new_log])], ignore_index=True)
+                self.dm.append_log(dfs, "상태변경", log_msg)
                 return True, ""
             return False, "데이터를 찾을 수 없습니다."
 
@@ -219,8 +217,7 @@ class QuoteView(ctk.CTkFrame):
             if mask.any():
                 dfs["data"].loc[mask, "Status"] = new_status
                 log_msg = f"견적 상태변경({new_status}): 번호 [{mgmt_no}]"
-                new_log = self.dm._create_log_entry("상태변경", log_msg)
-                dfs["log"] = pd.concat([dfs["log"], pd.DataFrame([new_log])], ignore_index=True)
+                self.dm.append_log(dfs, "상태변경", log_msg)
                 return True, ""
             return False, "데이터를 찾을 수 없습니다."
 
@@ -122,6 +122,11 @@ class TableView(ctk.CTkFrame):
             width=200
         )
         self.status_filter.pack(side="left", padx=5)
+
+        # [NEW] 보관된(지난 연도 종료) 주문 포함 - 체크할 때만 보관 파일을 읽음
+        self.archive_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(header_frame, text="보관 주문 포함", variable=self.archive_var, command=self.refresh_data,
+                        font=FONTS["main"], text_color=COLORS["text"]).pack(side="left", padx=10)
         
         ctk.CTkButton(header_frame, text="새로고침", command=self.refresh_data, width=80, 
                       fg_color=COLORS["bg_medium"], hover_color=COLORS["bg_light"], text_color=COLORS["text"], font=FONTS["main"]).pack(side="right")
@@ -174,6 +179,12 @@ class TableView(ctk.CTkFrame):
             self.tree.delete(item)
             
         df = self.dm.df_data
+        self.archived_nos = set()
+        if self.archive_var.get():
+            archived = self.dm.archived_data()
+            if not archived.empty:
+                self.archived_nos = set(archived["관리번호"].astype(str))
+                df = pd.concat([df, archived], ignore_index=True)
         if df.empty: return
         
         selected_statuses = self.status_filter.get_selected()
@@ -211,8 +222,8 @@ class TableView(ctk.CTkFrame):
         mgmt_no = values[0]
         status = values[5] # Status 컬럼
         
-        # [수정] 상태별 팝업 분기 처리
-        if status == "완료":
+        # [수정] 상태별 팝업 분기 처리 (보관된 주문은 조회만 가능)
+        if status == "완료" or mgmt_no in self.archived_nos:
             self.pm.open_complete_popup(mgmt_no)
         elif str(mgmt_no).startswith("Q"):
             self.pm.open_quote_popup(mgmt_no)